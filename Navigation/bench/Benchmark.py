@@ -0,0 +1,222 @@
+import argparse
+from datetime import datetime
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+benchDirectory = os.path.dirname(os.path.abspath(__file__))
+prodDirectory = os.path.join(os.path.dirname(benchDirectory), "prod")
+for directory in (benchDirectory, prodDirectory):
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+
+import Ephemeris as Ephemeris
+import Fix as Fix
+import Instrumentation as Instrumentation
+import ReducedSighting as ReducedSighting
+import SightingReader as SightingReader
+import SyntheticData as SyntheticData
+
+# Stages timed by runStages, in pipeline order.
+STAGES = ("load", "parse", "lookup", "reduce", "sort", "log", "fix")
+# Default baseline file, next to this module.
+BASELINE_FILE = os.path.join(benchDirectory, "baseline.json")
+
+
+# measure function calls stage() and returns (result, seconds, peak bytes).
+# The peak is measured with tracemalloc when memory is True, otherwise it is None;
+# tracemalloc slows allocation down, so timings and peaks are taken in separate passes.
+def measure(stage, memory=False):
+    if memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        result = stage()
+        seconds = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1] if memory else None
+    finally:
+        if memory:
+            tracemalloc.stop()
+    return (result, seconds, peak)
+
+
+# lookupSighting function receives a parsed sighting record and the loaded tables.
+# It does only the star and aries lookups of Fix.reduceSighting and returns True when both match.
+def lookupSighting(record, starCatalog, ariesEphemeris):
+    if record["body"] is None or record["date"] is None or record["time"] is None:
+        return False
+    convertedDate = datetime.strptime(record["date"], "%Y-%m-%d").strftime("%m/%d/%y")
+    h, m, s = record["time"].split(":")
+    return starCatalog.get(record["body"], convertedDate) is not None and \
+        ariesEphemeris.getGHA(convertedDate, int(h), int(m) * 60 + int(s)) is not None
+
+
+# runStages function times every stage of getSightings separately on the generated files:
+#   load    parse the star and aries files
+#   parse   read every sighting record
+#   lookup  star and aries lookups of every record
+#   reduce  Fix.reduceSightingsBatch of every record, as getSightings reduces them (lookups included)
+#   sort    sort the reduced sightings
+#   log     write the log lines
+#   fix     fix the approximate position
+# Returns a dictionary from stage to {"seconds", "items", "throughput", "peakMemory"}.
+def runStages(files, logFile, memory=False):
+    stages = {}
+
+    def record(name, stage, items):
+        result, seconds, peak = measure(stage, memory)
+        count = items(result) if callable(items) else items
+        stages[name] = {"seconds": seconds, "items": count,
+                        "throughput": count / seconds if seconds > 0 else None, "peakMemory": peak}
+        return result
+
+    tables = record("load", lambda: (Ephemeris.StarCatalog(files["starFile"]),
+                                     Ephemeris.AriesEphemeris(files["ariesFile"])),
+                    lambda result: len(result[0]) + len(result[1]))
+    starCatalog, ariesEphemeris = tables
+    records = record("parse", lambda: list(SightingReader.SightingReader(files["sightingFile"])), len)
+    record("lookup", lambda: [lookupSighting(sighting, starCatalog, ariesEphemeris) for sighting in records],
+           len(records))
+
+    fix = Fix.Fix(logFile)
+    fix.starCatalog = starCatalog
+    fix.ariesEphemeris = ariesEphemeris
+    reduced = record("reduce", lambda: fix.reduceSightingsBatch(records), len(records))
+    ordered = record("sort", lambda: sorted(reduced, key=ReducedSighting.sortKey), len(reduced))
+
+    def log():
+        fix.logSightings(ordered)
+        fix.logger.close()
+    record("log", log, len(ordered))
+    record("fix", lambda: fix.fixPosition(ordered), len(ordered))
+    return stages
+
+
+# runTotal function times a complete getSightings run on the generated files, cold cache.
+# With instrument=True the run collects Fix stats, whose stages are returned as well.
+# Returns {"seconds", "items", "throughput", "errors", "approximateLatitude", "approximateLongitude"}.
+def runTotal(files, logFile, instrument=False):
+    Ephemeris.cache.clear()
+    stats = Instrumentation.Stats() if instrument else None
+    fix = Fix.Fix(logFile, stats=stats)
+    fix.setSightingFile(files["sightingFile"])
+    fix.setStarFile(files["starFile"])
+    fix.setAriesFile(files["ariesFile"])
+    position, seconds, peak = measure(fix.getSightings)
+    total = {"seconds": seconds, "items": len(fix.sightings) + fix.err,
+             "throughput": (len(fix.sightings) + fix.err) / seconds if seconds > 0 else None,
+             "errors": fix.err, "approximateLatitude": position[0], "approximateLongitude": position[1]}
+    if stats is not None:
+        total["stages"] = stats.report()["stages"]
+    return total
+
+
+# runBenchmark function generates the synthetic files in a temporary directory and benchmarks them.
+# Every timing is the fastest of repeat runs; with memory=True one more pass records the peaks.
+# "instrumented" holds the stage timings Fix reports itself during one more getSightings run.
+# Returns the result as a JSON-serializable dictionary.
+def runBenchmark(sightings=1000, years=1, seed=1, repeat=3, memory=False, scale=None):
+    directory = tempfile.mkdtemp()
+    try:
+        generated, seconds, peak = measure(lambda: SyntheticData.generate(directory, sightings, years, seed=seed))
+        logFile = os.path.join(directory, "log.txt")
+        stages = None
+        total = None
+        for run in range(max(repeat, 1)):
+            timings = runStages(generated, logFile)
+            stages = timings if stages is None else \
+                {name: min(stages[name], timings[name], key=lambda k: k["seconds"]) for name in STAGES}
+            timing = runTotal(generated, logFile)
+            total = timing if total is None or timing["seconds"] < total["seconds"] else total
+        if memory:
+            peaks = runStages(generated, logFile, memory=True)
+            for name in STAGES:
+                stages[name]["peakMemory"] = peaks[name]["peakMemory"]
+        instrumented = runTotal(generated, logFile, instrument=True)
+    finally:
+        shutil.rmtree(directory)
+
+    return {"scale": scale if scale is not None else "custom",
+            "sightings": sightings, "years": years, "seed": seed, "repeat": repeat,
+            "python": platform.python_version(), "machine": platform.machine(),
+            "generateSeconds": seconds,
+            "stages": stages, "total": total, "instrumented": instrumented["stages"]}
+
+
+# compare function receives a result and the baseline result of the same scale.
+# A stage, or the total, regresses when its throughput dropped by more than tolerance (0.25 is 25%).
+# Returns the list of regressions as readable strings; empty when there are none.
+def compare(result, baseline, tolerance=0.25):
+    regressions = []
+    entries = [(name, result["stages"].get(name), baseline["stages"].get(name)) for name in STAGES]
+    entries.append(("total", result.get("total"), baseline.get("total")))
+    for name, current, previous in entries:
+        if current is None or previous is None or not current["throughput"] or not previous["throughput"]:
+            continue
+        if current["throughput"] < previous["throughput"] * (1 - tolerance):
+            regressions.append("%s: %.0f/s, baseline %.0f/s (%.0f%%)" %
+                               (name, current["throughput"], previous["throughput"],
+                                100.0 * (current["throughput"] / previous["throughput"] - 1)))
+    return regressions
+
+
+# loadBaseline function returns the stored results keyed by scale, or {} when there is no baseline file.
+def loadBaseline(baselineFile):
+    try:
+        with open(baselineFile, "r") as baselineData:
+            return json.load(baselineData)
+    except FileNotFoundError as e:
+        return {}
+
+
+# main function parses the command line, runs the benchmark and prints the result as JSON.
+# Returns 1 when a regression against the baseline was found, otherwise 0.
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Fix on synthetic sightings.")
+    parser.add_argument("--scale", choices=sorted(SyntheticData.SCALES), default="small", help="named scale")
+    parser.add_argument("--sightings", type=int, default=None, help="sightings, overrides --scale")
+    parser.add_argument("--years", type=int, default=None, help="years of ephemeris, overrides --scale")
+    parser.add_argument("--seed", type=int, default=1, help="random seed")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per timing, the fastest is kept")
+    parser.add_argument("--memory", action="store_true", help="record peak memory per stage")
+    parser.add_argument("--output", default=None, help="write the result to this file")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="baseline file")
+    parser.add_argument("--save-baseline", action="store_true", help="store the result as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed throughput drop")
+    arguments = parser.parse_args(argv)
+
+    sightings, years = SyntheticData.SCALES[arguments.scale]
+    custom = arguments.sightings is not None or arguments.years is not None
+    sightings = arguments.sightings if arguments.sightings is not None else sightings
+    years = arguments.years if arguments.years is not None else years
+    result = runBenchmark(sightings, years, arguments.seed, arguments.repeat, arguments.memory,
+                          None if custom else arguments.scale)
+
+    text = json.dumps(result, indent=2, sort_keys=True)
+    print(text)
+    if arguments.output is not None:
+        with open(arguments.output, "w") as outputData:
+            outputData.write(text + "\n")
+
+    baseline = loadBaseline(arguments.baseline)
+    if arguments.save_baseline:
+        baseline[result["scale"]] = result
+        with open(arguments.baseline, "w") as baselineData:
+            baselineData.write(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        return 0
+    if result["scale"] not in baseline:
+        sys.stderr.write("No baseline for scale " + result["scale"] + "\n")
+        return 0
+    regressions = compare(result, baseline[result["scale"]], arguments.tolerance)
+    for regression in regressions:
+        sys.stderr.write("Regression " + regression + "\n")
+    return 1 if len(regressions) > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
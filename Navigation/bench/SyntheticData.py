@@ -0,0 +1,134 @@
+from datetime import date, timedelta
+from math import asin, cos, degrees, radians, sin
+import os
+import random
+import sys
+
+# GHA of Aries at 2000-01-01 00:00 UT and its rate, in degrees per day.
+GHA_ARIES_EPOCH = 99.96779
+GHA_ARIES_RATE = 360.98564736629
+EPOCH_ORDINAL = date(2000, 1, 1).toordinal()
+
+# Named scales: sightings in the sighting file and years of ephemeris.
+SCALES = {"small": (1000, 1), "medium": (100000, 2), "large": (1000000, 5)}
+
+
+# formatAngle function receives signed degrees and returns them as "XdMM.M", e.g. "-16d44.5".
+def formatAngle(value, width=1):
+    sign = "-" if value < 0 else ""
+    minutes = round(abs(value) * 60, 1)
+    whole = int(minutes // 60)
+    return sign + str(whole).zfill(width) + "d" + ("%04.1f" % (minutes - whole * 60))
+
+
+# ghaAries function receives a date and hours past midnight UT.
+# Returns the GHA of Aries in degrees.
+def ghaAries(day, hours):
+    return (GHA_ARIES_EPOCH + GHA_ARIES_RATE * (day.toordinal() - EPOCH_ORDINAL + hours / 24.0)) % 360
+
+
+# makeStars function receives the number of stars and a random generator.
+# Returns a list of (name, SHA, declination) spread over the sky.
+def makeStars(count, generator):
+    return [("Star%03d" % index, generator.uniform(0, 360), degrees(asin(generator.uniform(-0.95, 0.95))))
+            for index in range(count)]
+
+
+# writeStarFile function writes one line per star every interval days from start for the given days.
+# Returns the listed dates.
+def writeStarFile(starFile, stars, start, days, interval=3):
+    dates = [start + timedelta(days=offset) for offset in range(0, days, interval)]
+    with open(starFile, "w") as starData:
+        for day in dates:
+            stamp = day.strftime("%m/%d/%y")
+            # SHA drifts by precession, about 50" a year.
+            drift = (day.toordinal() - EPOCH_ORDINAL) * 0.0000382
+            starData.writelines("%s\t%s\t%s\t%s\n" % (name, stamp, formatAngle((sha + drift) % 360),
+                                                      formatAngle(declination)) for name, sha, declination in stars)
+    return dates
+
+
+# writeAriesFile function writes one line per hour from start for the given days, plus the first
+# hour of the following day so that every listed hour can be interpolated.
+def writeAriesFile(ariesFile, start, days):
+    with open(ariesFile, "w") as ariesData:
+        for offset in range(days + 1):
+            day = start + timedelta(days=offset)
+            stamp = day.strftime("%m/%d/%y")
+            hours = range(24) if offset < days else range(1)
+            ariesData.writelines("%s\t%d\t%s\n" % (stamp, hour, formatAngle(ghaAries(day, hour), 2)) for hour in hours)
+
+
+# writeSightingFile function writes count sightings of the given stars, taken on the listed dates
+# by an observer at (latitude, longitude east). Observations are the computed altitudes of bodies
+# between 10 and 80 degrees, so the sightings fix back to the observer.
+# About errorRate of the sightings miss their body tag or name an unknown body.
+def writeSightingFile(sightingFile, count, stars, dates, latitude, longitude, generator, errorRate=0.01):
+    phi = radians(latitude)
+    with open(sightingFile, "w") as sightingData:
+        sightingData.write("<fix>\n")
+        written = 0
+        while written < count:
+            name, sha, declination = stars[generator.randrange(len(stars))]
+            day = dates[generator.randrange(len(dates))]
+            seconds = generator.randrange(86400)
+            lha = radians(ghaAries(day, seconds / 3600.0) + sha + longitude)
+            delta = radians(declination)
+            altitude = degrees(asin(sin(phi) * sin(delta) + cos(phi) * cos(delta) * cos(lha)))
+            if altitude < 10 or altitude > 80:
+                continue
+
+            lines = ["\t<sighting>\n"]
+            chance = generator.random()
+            if chance < errorRate / 2:
+                pass
+            elif chance < errorRate:
+                lines.append("\t\t<body>Unknown</body>\n")
+            else:
+                lines.append("\t\t<body>%s</body>\n" % name)
+            lines.append("\t\t<date>%s</date>\n" % day.isoformat())
+            lines.append("\t\t<time>%02d:%02d:%02d</time>\n" % (seconds // 3600, seconds // 60 % 60, seconds % 60))
+            lines.append("\t\t<observation>%s</observation>\n" % formatAngle(altitude, 3))
+            if generator.random() < 0.5:
+                lines.append("\t\t<height>%.1f</height>\n" % generator.uniform(0, 30))
+                lines.append("\t\t<temperature>%d</temperature>\n" % generator.randrange(20, 100))
+                lines.append("\t\t<pressure>%d</pressure>\n" % generator.randrange(980, 1040))
+                lines.append("\t\t<horizon>%s</horizon>\n" % generator.choice(("Natural", "Artificial")))
+            lines.append("\t</sighting>\n")
+            sightingData.write("".join(lines))
+            written += 1
+        sightingData.write("</fix>\n")
+
+
+# generate function writes sight.xml, stars.txt and aries.txt into directory.
+# It receives the number of sightings, the years of ephemeris starting 2017-01-01, the number
+# of stars and the random seed; the same arguments always produce the same files.
+# Returns a dictionary with the file paths and the observer position.
+def generate(directory, sightings=1000, years=1, stars=59, seed=1):
+    generator = random.Random(seed)
+    start = date(2017, 1, 1)
+    days = (date(2017 + years, 1, 1) - start).days
+    catalog = makeStars(stars, generator)
+    latitude = generator.uniform(-60, 60)
+    longitude = generator.uniform(-180, 180)
+
+    files = {"sightingFile": os.path.join(directory, "sight.xml"),
+             "starFile": os.path.join(directory, "stars.txt"),
+             "ariesFile": os.path.join(directory, "aries.txt"),
+             "latitude": latitude, "longitude": longitude}
+    dates = writeStarFile(files["starFile"], catalog, start, days)
+    writeAriesFile(files["ariesFile"], start, days)
+    writeSightingFile(files["sightingFile"], sightings, catalog, dates, latitude, longitude, generator)
+    return files
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("usage: SyntheticData.py directory [sightings|scale] [years] [seed]")
+    if len(sys.argv) > 2 and sys.argv[2] in SCALES:
+        count, years = SCALES[sys.argv[2]]
+    else:
+        count = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+        years = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+    seed = int(sys.argv[4]) if len(sys.argv) > 4 else 1
+    print(generate(sys.argv[1], count, years, seed=seed))
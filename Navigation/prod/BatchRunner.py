@@ -0,0 +1,89 @@
+import glob
+import json
+import multiprocessing
+import os
+import sys
+
+import Ephemeris as Ephemeris
+import Fix as Fix
+
+
+# loadEphemeris function is the pool initializer.
+# It indexes the star and aries files once per worker process into the process-wide cache;
+# the dates are parsed as the worker's sighting files need them.
+def loadEphemeris(starFile, ariesFile):
+    Ephemeris.cache.getStarCatalog(starFile, partitioned=True)
+    Ephemeris.cache.getAriesEphemeris(ariesFile, partitioned=True)
+
+
+# reduceFile function receives (sightingFile, starFile, ariesFile, logFile).
+# It runs Fix on one sighting file against the worker's cached ephemeris and returns a summary.
+# Any error is reported as the file's failure, so one bad file does not stop the others.
+# metrics, a Metrics.Metrics, is passed on to Fix.
+# With checkpointFile the file is reduced incrementally against that checkpoint (see Fix.getSightings):
+# only the sightings appended since the last run are reduced and logged.
+def reduceFile(job, metrics=None, checkpointFile=None):
+    sightingFile, starFile, ariesFile, logFile = job
+    result = {"sightingFile": sightingFile, "logFile": logFile, "sightings": 0, "errors": 0,
+              "approximateLatitude": None, "approximateLongitude": None, "failure": None}
+    try:
+        fix = Fix.Fix(logFile, metrics=metrics, checkpointFile=checkpointFile)
+        fix.setSightingFile(sightingFile)
+        fix.setAriesFile(ariesFile)
+        fix.setStarFile(starFile)
+        result["approximateLatitude"], result["approximateLongitude"] = fix.getSightings(checkpointFile is not None)
+        result["sightings"] = len(fix.sightings)
+        result["errors"] = fix.err
+    except ValueError as raisedException:
+        result["failure"] = str(raisedException)
+    except Exception as raisedException:
+        result["failure"] = "BatchRunner.reduceFile:  " + type(raisedException).__name__ + ": " + str(raisedException)
+    return result
+
+
+# runBatch function receives a list of sighting files or a glob pattern, the star and aries files.
+# Every sighting file is reduced in a process pool and logged to its own log file,
+# <sighting file>.log in logDirectory (default: next to the sighting file). When that log file is
+# already taken by an earlier file, e.g. files with the same name in different directories logged to one
+# logDirectory, <sighting file>.<n>.log with the first n that is free is used, so no two workers share a log.
+# Returns a report with the per-file results in input order and the totals.
+def runBatch(sightingFiles, starFile, ariesFile, logDirectory=None, processes=None):
+    if isinstance(sightingFiles, str):
+        sightingFiles = sorted(glob.glob(sightingFiles))
+    if len(sightingFiles) < 1:
+        raise (ValueError("BatchRunner.runBatch:  No sighting files received"))
+
+    jobs = []
+    logFiles = set()
+    for sightingFile in sightingFiles:
+        directory = logDirectory if logDirectory is not None else os.path.dirname(sightingFile)
+        name = os.path.splitext(os.path.basename(sightingFile))[0]
+        logFile = os.path.join(directory, name + ".log")
+        number = 1
+        while os.path.normcase(os.path.abspath(logFile)) in logFiles:
+            logFile = os.path.join(directory, name + "." + str(number) + ".log")
+            number += 1
+        logFiles.add(os.path.normcase(os.path.abspath(logFile)))
+        jobs.append((sightingFile, starFile, ariesFile, logFile))
+
+    if processes is None:
+        processes = min(len(jobs), os.cpu_count() or 1)
+    pool = multiprocessing.Pool(processes, initializer=loadEphemeris, initargs=(starFile, ariesFile))
+    try:
+        results = pool.map(reduceFile, jobs, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+
+    return {"files": results,
+            "sightings": sum(result["sightings"] for result in results),
+            "errors": sum(result["errors"] for result in results),
+            "failures": sum(1 for result in results if result["failure"] is not None)}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 4:
+        sys.exit("usage: BatchRunner.py starFile ariesFile sightingFile|pattern ...")
+    patterns = sys.argv[3:]
+    files = [name for pattern in patterns for name in sorted(glob.glob(pattern))]
+    print(json.dumps(runBatch(files, sys.argv[1], sys.argv[2]), indent=2))
@@ -0,0 +1,210 @@
+from array import array
+import hashlib
+import io
+import json
+import os
+
+import ReducedSighting as ReducedSighting
+
+SIGHTING_END = b"</sighting>"
+BLOCK_SIZE = 1 << 20
+
+
+# findLastSightingEnd function receives an open binary file and its size.
+# Reads the file backwards and returns the offset just past the last "</sighting>", or 0.
+def findLastSightingEnd(sightingData, size):
+    end = size
+    while end > 0:
+        start = max(0, end - BLOCK_SIZE)
+        sightingData.seek(start)
+        block = sightingData.read(end - start + len(SIGHTING_END) - 1)
+        index = block.rfind(SIGHTING_END)
+        if index >= 0:
+            return start + index + len(SIGHTING_END)
+        end = start
+    return 0
+
+
+# hashPrefix function receives an open binary file and an offset.
+# Returns a sha256 object fed with the bytes before the offset, read BLOCK_SIZE bytes at a time,
+# so it can be updated with the bytes that follow.
+def hashPrefix(sightingData, offset):
+    digest = hashlib.sha256()
+    sightingData.seek(0)
+    remaining = offset
+    while remaining > 0:
+        block = sightingData.read(min(BLOCK_SIZE, remaining))
+        if len(block) < 1:
+            break
+        digest.update(block)
+        remaining -= len(block)
+    return digest
+
+
+# getSize function returns the size of a file, or -1 when it does not exist.
+def getSize(fileName):
+    try:
+        return os.path.getsize(fileName)
+    except OSError as raisedException:
+        return -1
+
+
+class CheckpointSightings():
+    # Default constructor of CheckpointSightings Class.
+    # It stands for the reduced sightings of every run recorded by a checkpoint, in chronological order,
+    # without reading them: the first size bytes of the sightings file are read and sorted the first time
+    # a sighting is asked for. count is the number of sightings.
+    def __init__(self, sightingsFile, size, count):
+        self.sightingsFile = sightingsFile
+        self.size = size
+        self.count = count
+        self.sightings = None
+
+    # load method reads and sorts the sightings once and returns them as a list.
+    def load(self):
+        if self.sightings is None:
+            with open(self.sightingsFile, "rb") as sightingsData:
+                lines = sightingsData.read(self.size).decode("utf-8").splitlines()
+            self.sightings = sorted((ReducedSighting.ReducedSighting.fromState(json.loads(line)) for line in lines),
+                                    key=ReducedSighting.sortKey)
+        return self.sightings
+
+    def __iter__(self):
+        return iter(self.load())
+
+    def __getitem__(self, index):
+        return self.load()[index]
+
+    def __len__(self):
+        return self.count
+
+
+class SightingCheckpoint():
+    # Default constructor of SightingCheckpoint Class.
+    # It receives the checkpoint file name, normally "<log file>.checkpoint".
+    # The checkpoint records how far into a sighting file the previous runs got: the offset past the
+    # last complete </sighting>, the device and inode of the file and a sha256 of every byte before the
+    # offset, so a change anywhere in what was processed makes the next run a full one. Resuming hashes
+    # those bytes again and reduces only the appended ones. It also records the
+    # error count, the number of sightings reduced and the fix, which the next fix starts from.
+    # The sightings themselves are appended run by run, never rewritten: their states as JSON lines to
+    # "<checkpoint file>.sightings" and their declination, GHA and adjusted altitude as doubles to
+    # "<checkpoint file>.columns", which the fix is solved from. The checkpoint records the length of both
+    # files; whatever a failed run appended past them is cut off by the next run.
+    def __init__(self, checkpointFile):
+        self.checkpointFile = checkpointFile
+        self.sightingsFile = checkpointFile + ".sightings"
+        self.columnsFile = checkpointFile + ".columns"
+        self.sightingFile = None
+        self.offset = 0
+        self.identity = None
+        self.digest = None
+        self.errors = 0
+        self.count = 0
+        self.sizes = [0, 0]
+        self.position = None
+        self.resumed = False
+        self.newOffset = 0
+        self.newIdentity = None
+        self.newDigest = None
+
+    # load method reads the checkpoint file; a missing or unreadable checkpoint leaves it empty.
+    def load(self):
+        try:
+            with open(self.checkpointFile, "r") as checkpointData:
+                state = json.load(checkpointData)
+            self.sightingFile = state["sightingFile"]
+            self.offset = state["offset"]
+            self.identity = state["identity"]
+            self.digest = state["digest"]
+            self.errors = state["errors"]
+            self.count = state["count"]
+            self.sizes = state["sizes"]
+            self.position = state["position"]
+        except Exception as e:
+            self.sightingFile = None
+        return self.sightingFile is not None
+
+    # resume method receives the sighting file name.
+    # Returns an iterable of the sighting records appended since the checkpoint,
+    # or None when the file cannot be resumed and must be processed in full.
+    def resume(self, sightingFile, reader):
+        path = os.path.abspath(sightingFile)
+        self.load()
+        self.resumed = False
+        with open(path, "rb") as sightingData:
+            status = os.fstat(sightingData.fileno())
+            self.newOffset = findLastSightingEnd(sightingData, status.st_size)
+            self.newIdentity = [status.st_dev, status.st_ino]
+
+            if (self.sightingFile == path and self.identity == self.newIdentity and 0 < self.offset <= self.newOffset
+                    and getSize(self.sightingsFile) >= self.sizes[0] and getSize(self.columnsFile) >= self.sizes[1]):
+                digest = hashPrefix(sightingData, self.offset)
+                if digest.hexdigest() == self.digest:
+                    appended = sightingData.read(self.newOffset - self.offset)
+                    digest.update(appended)
+                    self.newDigest = digest.hexdigest()
+                    self.resumed = True
+                    return reader.readSightings(io.BytesIO(b"<fix>" + appended + b"</fix>"))
+            self.newDigest = hashPrefix(sightingData, self.newOffset).hexdigest()
+
+        self.errors = 0
+        self.count = 0
+        self.sizes = [0, 0]
+        self.position = None
+        return None
+
+    # append method receives the sorted sightings reduced by this run and appends them to the sightings
+    # and columns files, after cutting off whatever was appended past the recorded lengths.
+    def append(self, sightings):
+        lines = []
+        columns = array("d")
+        for sighting in sightings:
+            lines.append(json.dumps(sighting.getState()) + "\n")
+            columns.extend((sighting.declination, sighting.ghaObservation, sighting.adjustedAltitude))
+        try:
+            with open(self.sightingsFile, "ab") as sightingsData:
+                sightingsData.truncate(self.sizes[0])
+                sightingsData.write("".join(lines).encode("utf-8"))
+                sightingsSize = sightingsData.tell()
+            with open(self.columnsFile, "ab") as columnsData:
+                columnsData.truncate(self.sizes[1])
+                columns.tofile(columnsData)
+                columnsSize = columnsData.tell()
+        except Exception as e:
+            raise (ValueError("SightingCheckpoint.append:  Checkpoint file could not be written"))
+        self.count += len(lines)
+        self.sizes = [sightingsSize, columnsSize]
+
+    # save method receives the sighting file name, the error count and the fix, (latitude, longitude) or None,
+    # and records them with the appended sightings. The checkpoint is written to a temporary file first
+    # and then moved over the old one.
+    def save(self, sightingFile, errors, position):
+        state = {"sightingFile": os.path.abspath(sightingFile),
+                 "offset": self.newOffset,
+                 "identity": self.newIdentity,
+                 "digest": self.newDigest,
+                 "errors": errors,
+                 "count": self.count,
+                 "sizes": self.sizes,
+                 "position": None if position is None else list(position)}
+        temporaryFile = self.checkpointFile + ".tmp"
+        try:
+            with open(temporaryFile, "w") as checkpointData:
+                json.dump(state, checkpointData)
+            os.replace(temporaryFile, self.checkpointFile)
+        except Exception as e:
+            raise (ValueError("SightingCheckpoint.save:  Checkpoint file could not be written"))
+        self.position = state["position"]
+
+    # getSightings method returns the sightings of every run recorded, as CheckpointSightings.
+    def getSightings(self):
+        return CheckpointSightings(self.sightingsFile, self.sizes[0], self.count)
+
+    # getColumns method returns the declinations, GHAs and adjusted altitudes of every sighting recorded,
+    # in degrees, as three arrays.
+    def getColumns(self):
+        columns = array("d")
+        with open(self.columnsFile, "rb") as columnsData:
+            columns.frombytes(columnsData.read(self.sizes[1]))
+        return (columns[0::3], columns[1::3], columns[2::3])
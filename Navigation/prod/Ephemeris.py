@@ -0,0 +1,386 @@
+from collections import OrderedDict
+import os
+import threading
+
+import EphemerisIndex as EphemerisIndex
+
+
+# parseDegreesAndMinutes function receives angleString of type string.
+# It converts a "XdY.Y" string into signed decimal degrees.
+# The sign of the degree part applies to the minutes as well, so "-16d44.5" is -16.7417.
+def parseDegreesAndMinutes(angleString):
+    try:
+        beforeD, afterD = angleString.strip().split("d")
+        value = abs(int(beforeD)) + (float(afterD) % 60) / 60
+    except Exception as e:
+        raise (ValueError("Ephemeris.parseDegreesAndMinutes:  Invalid angle string"))
+    if beforeD.strip().startswith("-"):
+        return -value
+    return value
+
+
+# hourDelta function receives the GHA of an hour and of the following hour, in degrees.
+# Returns the change over the hour between -180 and 180 degrees, so an hour in which
+# the GHA passes 360 and starts again at 0 interpolates forward instead of back by 345 degrees.
+def hourDelta(gha, following):
+    return (following - gha + 180) % 360 - 180
+
+
+class StarCatalog():
+    # Approximate memory held per indexed line, in bytes.
+    ENTRY_SIZE = 380
+
+    # Default constructor of StarCatalog Class.
+    # It reads the received star file once and indexes it by (body, date).
+    def __init__(self, starFile=None):
+        self.stars = {}
+        if starFile is not None:
+            self.load(starFile)
+
+    # load method receives parameter starFile as string.
+    # Every line is split once; SHA and declination are decoded into degrees.
+    # A later line for the same (body, date) replaces an earlier one.
+    def load(self, starFile):
+        try:
+            starData = open(starFile, "r")
+        except Exception as e:
+            raise (ValueError("StarCatalog.load:  Stars file could not be opened"))
+
+        with starData:
+            self.parse(starData)
+            EphemerisIndex.countRead(starData.tell())
+        return len(self.stars)
+
+    # parse method receives star file lines and indexes them.
+    def parse(self, lines):
+        for line in lines:
+            entry = StarCatalog.parseLine(line)
+            if entry is not None:
+                self.stars[entry[0]] = entry[1]
+
+    # parseLine method receives a star file line.
+    # Returns ((body, date), (SHA, declination, declinationString)) or None for a line that is not a star.
+    @staticmethod
+    def parseLine(line):
+        fields = line.split("\t")
+        if len(fields) < 4:
+            return None
+        declination = fields[3].strip()
+        try:
+            return ((fields[0], fields[1]), (parseDegreesAndMinutes(fields[2]), parseDegreesAndMinutes(declination),
+                                             declination))
+        except ValueError as raisedException:
+            return None
+
+    # get method receives body name and date in "mm/dd/yy" format.
+    # Returns (SHA, declination, declinationString) or None if the star is not listed.
+    def get(self, body, date):
+        return self.stars.get((body, date))
+
+    # getSize method returns the approximate memory held by the catalog, in bytes.
+    def getSize(self):
+        return len(self.stars) * self.ENTRY_SIZE
+
+    def __len__(self):
+        return len(self.stars)
+
+
+class AriesEphemeris():
+    # Approximate memory held per indexed hour, in bytes.
+    ENTRY_SIZE = 250
+
+    # Default constructor of AriesEphemeris Class.
+    # It reads the received aries file once and indexes it by (date, hour).
+    def __init__(self, ariesFile=None):
+        self.hours = {}
+        if ariesFile is not None:
+            self.load(ariesFile)
+
+    # load method receives parameter ariesFile as string.
+    # Each entry stores the GHA of the hour and the delta to the following line,
+    # so interpolation within the hour is one lookup plus one multiply-add.
+    # The last line has no following hour and therefore no entry.
+    def load(self, ariesFile):
+        try:
+            ariesData = open(ariesFile, "r")
+        except Exception as e:
+            raise (ValueError("AriesEphemeris.load:  Aries file could not be opened"))
+
+        with ariesData:
+            self.parse(ariesData)
+            EphemerisIndex.countRead(ariesData.tell())
+        return len(self.hours)
+
+    # parse method receives consecutive aries file lines and indexes every line but the last.
+    def parse(self, lines):
+        previousKey = None
+        previousGHA = None
+        for line in lines:
+            entry = AriesEphemeris.parseLine(line)
+            if entry is None:
+                previousKey = None
+                continue
+            key, gha = entry
+            if previousKey is not None:
+                self.hours[previousKey] = (previousGHA, hourDelta(previousGHA, gha))
+            previousKey = key
+            previousGHA = gha
+
+    # parseLine method receives an aries file line.
+    # Returns ((date, hour), GHA) or None for a line that is not an hour.
+    @staticmethod
+    def parseLine(line):
+        fields = line.split("\t")
+        try:
+            return ((fields[0], int(fields[1])), parseDegreesAndMinutes(fields[2]))
+        except Exception as e:
+            return None
+
+    # get method receives date in "mm/dd/yy" format and hour as integer.
+    # Returns (GHA, delta to next hour) or None if the hour is not listed.
+    def get(self, date, hour):
+        return self.hours.get((date, hour))
+
+    # getGHA method receives date, hour and seconds past the hour.
+    # Returns the interpolated GHA of Aries or None if the hour is not listed.
+    def getGHA(self, date, hour, seconds):
+        entry = self.hours.get((date, hour))
+        if entry is None:
+            return None
+        return entry[0] + entry[1] * (seconds / 3600)
+
+    # getSize method returns the approximate memory held by the table, in bytes.
+    def getSize(self):
+        return len(self.hours) * self.ENTRY_SIZE
+
+    def __len__(self):
+        return len(self.hours)
+
+
+class PartitionedStarCatalog(StarCatalog):
+    # Default constructor of PartitionedStarCatalog Class.
+    # It indexes the received star file by date (see EphemerisIndex) without parsing it;
+    # the lines of a date are parsed the first time a star of that date is looked up.
+    def __init__(self, starFile):
+        StarCatalog.__init__(self)
+        self.index = EphemerisIndex.DateIndex(starFile, 1)
+        self.loaded = set()
+
+    # get method receives body name and date in "mm/dd/yy" format.
+    # Returns (SHA, declination, declinationString) or None if the star is not listed.
+    def get(self, body, date):
+        if date not in self.loaded:
+            self.loadDate(date)
+        return self.stars.get((body, date))
+
+    # loadDate method parses the lines of one date.
+    def loadDate(self, date):
+        for run in self.index.readRuns(date):
+            self.parse(run)
+        self.loaded.add(date)
+
+
+class PartitionedAriesEphemeris(AriesEphemeris):
+    # Default constructor of PartitionedAriesEphemeris Class.
+    # It indexes the received aries file by date (see EphemerisIndex) without parsing it;
+    # the lines of a date, and the line after them, are parsed the first time an hour of that date is looked up.
+    def __init__(self, ariesFile):
+        AriesEphemeris.__init__(self)
+        self.index = EphemerisIndex.DateIndex(ariesFile, 0)
+        self.loaded = set()
+
+    # get method receives date in "mm/dd/yy" format and hour as integer.
+    # Returns (GHA, delta to next hour) or None if the hour is not listed.
+    def get(self, date, hour):
+        if date not in self.loaded:
+            self.loadDate(date)
+        return self.hours.get((date, hour))
+
+    # getGHA method receives date, hour and seconds past the hour.
+    # Returns the interpolated GHA of Aries or None if the hour is not listed.
+    def getGHA(self, date, hour, seconds):
+        if date not in self.loaded:
+            self.loadDate(date)
+        return AriesEphemeris.getGHA(self, date, hour, seconds)
+
+    # loadDate method parses the lines of one date.
+    def loadDate(self, date):
+        for run in self.index.readRuns(date, following=True):
+            self.parse(run)
+        self.loaded.add(date)
+
+
+class IndexedStarCatalog(StarCatalog):
+    # Approximate memory held per indexed date, in bytes.
+    INDEX_ENTRY_SIZE = 150
+
+    # Default constructor of IndexedStarCatalog Class.
+    # It indexes the received star file by date (see EphemerisIndex) and keeps nothing parsed:
+    # every lookup seeks to the lines of its date and parses only the line of the star,
+    # so memory stays small however many years the file covers.
+    def __init__(self, starFile):
+        StarCatalog.__init__(self)
+        self.index = EphemerisIndex.DateIndex(starFile, 1)
+
+    # get method receives body name and date in "mm/dd/yy" format.
+    # Returns (SHA, declination, declinationString) or None if the star is not listed.
+    # The index is rebuilt first when the star file has changed.
+    def get(self, body, date):
+        self.index.refresh()
+        prefix = body + "\t"
+        star = None
+        for run in self.index.readRuns(date):
+            for line in run:
+                if line.startswith(prefix):
+                    entry = StarCatalog.parseLine(line)
+                    if entry is not None and entry[0][1] == date:
+                        star = entry[1]
+        return star
+
+    # getSize method returns the approximate memory held by the index, in bytes.
+    def getSize(self):
+        return len(self.index.ranges) * self.INDEX_ENTRY_SIZE
+
+
+class IndexedAriesEphemeris(AriesEphemeris):
+    # Approximate memory held per indexed date, in bytes.
+    INDEX_ENTRY_SIZE = 150
+
+    # Default constructor of IndexedAriesEphemeris Class.
+    # It indexes the received aries file by date (see EphemerisIndex) and keeps nothing parsed:
+    # a lookup of another date than the last one seeks to the lines of that date, with the line
+    # after them, and keeps them by hour; an hour is parsed the first time it is looked up.
+    # Sightings are looked up in chronological order, so most lookups find their date already read.
+    def __init__(self, ariesFile):
+        AriesEphemeris.__init__(self)
+        self.index = EphemerisIndex.DateIndex(ariesFile, 0)
+        self.date = None
+        self.dateLines = {}
+        self.dateHours = {}
+
+    # readDate method reads the lines of one date and keeps them by hour, each with the line after it.
+    def readDate(self, date):
+        self.dateLines = {}
+        self.dateHours = {}
+        for run in self.index.readRuns(date, following=True):
+            for line, following in zip(run, run[1:]):
+                fields = line.split("\t", 2)
+                try:
+                    self.dateLines[int(fields[1])] = (line, following)
+                except (IndexError, ValueError) as raisedException:
+                    continue
+        self.date = date
+
+    # get method receives date in "mm/dd/yy" format and hour as integer.
+    # Returns (GHA, delta to next hour) or None if the hour is not listed.
+    # The index is rebuilt first when the aries file has changed.
+    def get(self, date, hour):
+        if self.index.refresh() or date != self.date:
+            self.readDate(date)
+        if hour in self.dateHours:
+            return self.dateHours[hour]
+        lines = self.dateLines.get(hour)
+        if lines is None:
+            return None
+        entry = AriesEphemeris.parseLine(lines[0])
+        following = AriesEphemeris.parseLine(lines[1])
+        if entry is not None and following is not None:
+            entry = (entry[1], hourDelta(entry[1], following[1]))
+        else:
+            entry = None
+        self.dateHours[hour] = entry
+        return entry
+
+    # getGHA method receives date, hour and seconds past the hour.
+    # Returns the interpolated GHA of Aries or None if the hour is not listed.
+    def getGHA(self, date, hour, seconds):
+        entry = self.get(date, hour)
+        if entry is None:
+            return None
+        return entry[0] + entry[1] * (seconds / 3600)
+
+    # getSize method returns the approximate memory held by the index and the lines read, in bytes.
+    def getSize(self):
+        return len(self.index.ranges) * self.INDEX_ENTRY_SIZE + len(self.dateLines) * self.ENTRY_SIZE
+
+
+class EphemerisCache():
+    # Default constructor of EphemerisCache Class.
+    # It keeps parsed tables keyed by absolute path, least recently used first.
+    # memoryLimit caps the approximate memory of all cached tables, in bytes (None for no cap).
+    def __init__(self, memoryLimit=None):
+        self.memoryLimit = memoryLimit
+        self.tables = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    # setMemoryLimit method receives the new cap in bytes and evicts tables until it holds.
+    def setMemoryLimit(self, memoryLimit):
+        with self.lock:
+            self.memoryLimit = memoryLimit
+            self.evict()
+
+    # getStarCatalog method returns the StarCatalog of the received star file,
+    # its PartitionedStarCatalog when partitioned is True or its IndexedStarCatalog when indexed is True.
+    def getStarCatalog(self, starFile, partitioned=False, indexed=False):
+        return self.get(IndexedStarCatalog if indexed else PartitionedStarCatalog if partitioned else StarCatalog,
+                        starFile)
+
+    # getAriesEphemeris method returns the AriesEphemeris of the received aries file,
+    # its PartitionedAriesEphemeris when partitioned is True or its IndexedAriesEphemeris when indexed is True.
+    def getAriesEphemeris(self, ariesFile, partitioned=False, indexed=False):
+        return self.get(IndexedAriesEphemeris if indexed else PartitionedAriesEphemeris if partitioned else AriesEphemeris,
+                        ariesFile)
+
+    # getSize method returns the approximate memory held by the cached tables, in bytes.
+    # Partitioned tables grow as dates are loaded, so it is summed on every call.
+    def getSize(self):
+        return sum(cached[1].getSize() for cached in self.tables.values())
+
+    # get method receives a table class and a file name.
+    # The cached table is returned while the file keeps its mtime and size;
+    # otherwise the file is parsed again and replaces the cached table.
+    def get(self, tableClass, fileName):
+        path = os.path.abspath(fileName)
+        try:
+            status = os.stat(path)
+        except OSError as raisedException:
+            raise (ValueError("EphemerisCache.get:  Ephemeris file could not be opened"))
+        key = (tableClass.__name__, path)
+        version = (status.st_mtime_ns, status.st_size)
+
+        with self.lock:
+            cached = self.tables.get(key)
+            if cached is not None and cached[0] == version:
+                self.tables.move_to_end(key)
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+
+        table = tableClass(path)
+
+        with self.lock:
+            self.discard(key)
+            self.tables[key] = (version, table)
+            self.evict()
+        return table
+
+    # clear method drops every cached table.
+    def clear(self):
+        with self.lock:
+            self.tables.clear()
+
+    # discard method drops one cached table; the caller holds the lock.
+    def discard(self, key):
+        self.tables.pop(key, None)
+
+    # evict method drops least recently used tables until the cap holds; the caller holds the lock.
+    # The most recently used table is always kept.
+    def evict(self):
+        while self.memoryLimit is not None and len(self.tables) > 1 and self.getSize() > self.memoryLimit:
+            self.discard(next(iter(self.tables)))
+
+
+# Process-wide cache shared by every Fix instance.
+cache = EphemerisCache()
@@ -0,0 +1,203 @@
+from datetime import datetime
+import math
+import mmap
+import struct
+import sys
+
+import Ephemeris as Ephemeris
+
+# File layout, little-endian:
+#   header:  magic, version, star count, first hour, hour count, star offset, aries offset
+#   stars:   one STAR record per (body, date), sorted by key so it can be binary searched
+#   aries:   one ARIES record per hour from the first hour on, NaN where the table has no entry
+# A key is the body name padded to NAME_SIZE bytes followed by the big-endian date ordinal,
+# so comparing keys as bytes orders them by body then date. Body names longer than NAME_SIZE bytes
+# and declination strings longer than DECLINATION_SIZE bytes cannot be compiled.
+# Hours are counted as date ordinal * 24 + hour.
+MAGIC = b"NAVEPH01"
+VERSION = 1
+HEADER = struct.Struct("<8sIIqQQQ")
+NAME_SIZE = 24
+KEY_SIZE = NAME_SIZE + 4
+DECLINATION_SIZE = 12
+STAR = struct.Struct("<28sdd12s")
+ARIES = struct.Struct("<dd")
+
+
+# toOrdinal function receives an ephemeris date as "mm/dd/yy" and returns its proleptic Gregorian ordinal.
+def toOrdinal(date):
+    return datetime.strptime(date, "%m/%d/%y").toordinal()
+
+
+# toKey function receives a body name and a date ordinal and returns the sortable star key,
+# or None when the name does not fit in NAME_SIZE bytes or holds the NUL byte it is padded with.
+def toKey(body, ordinal):
+    name = body.encode("utf-8")
+    if len(name) > NAME_SIZE or b"\0" in name:
+        return None
+    return name.ljust(NAME_SIZE, b"\0") + struct.pack(">I", ordinal)
+
+
+# compileEphemeris function receives the star and aries text files and the output file name.
+# It writes the fixed-width binary ephemeris and returns (star count, hour count).
+# Lines whose date is not on the calendar can never match a sighting and are left out.
+# Raises ValueError when a body name or a declination string does not fit in its field,
+# rather than truncating it.
+def compileEphemeris(starFile, ariesFile, binaryFile):
+    stars = []
+    for (body, date), (sha, declination, declinationString) in Ephemeris.StarCatalog(starFile).stars.items():
+        try:
+            ordinal = toOrdinal(date)
+        except ValueError as raisedException:
+            continue
+        key = toKey(body, ordinal)
+        if key is None:
+            raise (ValueError("EphemerisBinary.compileEphemeris:  Star name does not fit in " + str(NAME_SIZE) +
+                              " bytes: " + body))
+        declinationBytes = declinationString.encode("utf-8")
+        if len(declinationBytes) > DECLINATION_SIZE:
+            raise (ValueError("EphemerisBinary.compileEphemeris:  Declination does not fit in " +
+                              str(DECLINATION_SIZE) + " bytes: " + declinationString))
+        stars.append((key, sha, declination, declinationBytes))
+    stars.sort()
+
+    hours = {}
+    for (date, hour), entry in Ephemeris.AriesEphemeris(ariesFile).hours.items():
+        try:
+            hours[toOrdinal(date) * 24 + hour] = entry
+        except ValueError as raisedException:
+            continue
+    firstHour = min(hours) if hours else 0
+    hourCount = (max(hours) - firstHour + 1) if hours else 0
+
+    starOffset = HEADER.size
+    ariesOffset = starOffset + len(stars) * STAR.size
+    try:
+        binaryData = open(binaryFile, "wb")
+    except Exception as e:
+        raise (ValueError("EphemerisBinary.compileEphemeris:  Binary file could not be created"))
+    with binaryData:
+        binaryData.write(HEADER.pack(MAGIC, VERSION, len(stars), firstHour, hourCount, starOffset, ariesOffset))
+        for star in stars:
+            binaryData.write(STAR.pack(*star))
+        missing = ARIES.pack(math.nan, math.nan)
+        for hour in range(firstHour, firstHour + hourCount):
+            entry = hours.get(hour)
+            binaryData.write(ARIES.pack(*entry) if entry is not None else missing)
+    return (len(stars), hourCount)
+
+
+class BinaryEphemeris():
+    # Default constructor of BinaryEphemeris Class.
+    # It maps the received compiled ephemeris read-only; records are unpacked on lookup,
+    # so opening costs the same whatever the size and processes share the page cache.
+    def __init__(self, binaryFile):
+        try:
+            with open(binaryFile, "rb") as binaryData:
+                self.data = mmap.mmap(binaryData.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, self.starCount, self.firstHour, self.hourCount, self.starOffset, self.ariesOffset = \
+                HEADER.unpack_from(self.data, 0)
+        except Exception as e:
+            raise (ValueError("BinaryEphemeris.__init__:  Binary ephemeris file could not be opened"))
+        if magic != MAGIC or version != VERSION:
+            raise (ValueError("BinaryEphemeris.__init__:  File is not a compiled ephemeris"))
+        self.ordinals = {}
+
+    # getOrdinal method converts "mm/dd/yy" to an ordinal, remembering earlier conversions.
+    # Returns None for dates that are not on the calendar.
+    def getOrdinal(self, date):
+        ordinal = self.ordinals.get(date, -1)
+        if ordinal == -1:
+            try:
+                ordinal = toOrdinal(date)
+            except ValueError as raisedException:
+                ordinal = None
+            self.ordinals[date] = ordinal
+        return ordinal
+
+    # getStar method receives body name and date in "mm/dd/yy" format.
+    # Binary searches the star records and returns (SHA, declination, declinationString) or None.
+    # A name too long to have been compiled matches no record.
+    def getStar(self, body, date):
+        ordinal = self.getOrdinal(date)
+        if ordinal is None:
+            return None
+        key = toKey(body, ordinal)
+        if key is None:
+            return None
+        low = 0
+        high = self.starCount
+        while low < high:
+            middle = (low + high) // 2
+            offset = self.starOffset + middle * STAR.size
+            if self.data[offset:offset + KEY_SIZE] < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self.starCount:
+            return None
+        recordKey, sha, declination, declinationString = STAR.unpack_from(self.data, self.starOffset + low * STAR.size)
+        if recordKey != key:
+            return None
+        return (sha, declination, declinationString.rstrip(b"\0").decode("utf-8"))
+
+    # getHour method receives date in "mm/dd/yy" format and hour as integer.
+    # Returns (GHA, delta to next hour) or None if the hour is not listed.
+    def getHour(self, date, hour):
+        ordinal = self.getOrdinal(date)
+        if ordinal is None:
+            return None
+        index = ordinal * 24 + hour - self.firstHour
+        if index < 0 or index >= self.hourCount:
+            return None
+        entry = ARIES.unpack_from(self.data, self.ariesOffset + index * ARIES.size)
+        if math.isnan(entry[0]):
+            return None
+        return entry
+
+    # getGHA method receives date, hour and seconds past the hour.
+    # Returns the interpolated GHA of Aries or None if the hour is not listed.
+    def getGHA(self, date, hour, seconds):
+        entry = self.getHour(date, hour)
+        if entry is None:
+            return None
+        return entry[0] + entry[1] * (seconds / 3600)
+
+    def close(self):
+        self.data.close()
+
+
+class BinaryStarCatalog():
+    # Default constructor of BinaryStarCatalog Class.
+    # It exposes the star records of a BinaryEphemeris with the StarCatalog lookup.
+    def __init__(self, ephemeris):
+        self.ephemeris = ephemeris
+
+    def get(self, body, date):
+        return self.ephemeris.getStar(body, date)
+
+    def __len__(self):
+        return self.ephemeris.starCount
+
+
+class BinaryAriesEphemeris():
+    # Default constructor of BinaryAriesEphemeris Class.
+    # It exposes the aries records of a BinaryEphemeris with the AriesEphemeris lookup.
+    def __init__(self, ephemeris):
+        self.ephemeris = ephemeris
+
+    def get(self, date, hour):
+        return self.ephemeris.getHour(date, hour)
+
+    def getGHA(self, date, hour, seconds):
+        return self.ephemeris.getGHA(date, hour, seconds)
+
+    def __len__(self):
+        return self.ephemeris.hourCount
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4:
+        sys.exit("usage: EphemerisBinary.py starFile ariesFile binaryFile")
+    starCount, hourCount = compileEphemeris(sys.argv[1], sys.argv[2], sys.argv[3])
+    print(str(starCount) + " stars, " + str(hourCount) + " hours")
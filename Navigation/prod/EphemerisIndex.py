@@ -0,0 +1,136 @@
+import json
+import os
+
+# Version of the sidecar layout; sidecars of another version are rebuilt.
+VERSION = 1
+# Bytes of ephemeris text read by the indexes of the process, building them included (see Metrics).
+bytesRead = 0
+
+
+# countRead function adds size to bytesRead.
+def countRead(size):
+    global bytesRead
+    bytesRead += size
+
+
+class DateIndex():
+    # Ending of the sidecar file name.
+    SUFFIX = ".idx"
+
+    # Default constructor of DateIndex Class.
+    # It receives an ephemeris text file and the tab-separated column holding the date
+    # (1 for star files, 0 for aries files) and maps every date to the byte ranges of its lines.
+    # The index is kept in a sidecar file, "<text file>.idx", and rebuilt when the text file
+    # changes size or modification time; without write access it is only kept in memory.
+    def __init__(self, textFile, column):
+        self.textFile = os.path.abspath(textFile)
+        self.indexFile = self.textFile + self.SUFFIX
+        self.column = column
+        try:
+            status = os.stat(self.textFile)
+        except OSError as raisedException:
+            raise (ValueError("DateIndex.__init__:  Ephemeris file could not be opened"))
+        self.version = [status.st_mtime_ns, status.st_size]
+        self.ranges = {}
+        if not self.load():
+            self.build()
+            self.save()
+
+    # getKey method receives a line of the text file, as bytes, and returns its date, or None when it has none.
+    def getKey(self, line):
+        fields = line.split(b"\t", self.column + 1)
+        if len(fields) <= self.column:
+            return None
+        return fields[self.column].strip().decode("utf-8", "replace")
+
+    # load method reads the sidecar. Returns False when it is missing, unreadable or out of date.
+    def load(self):
+        try:
+            with open(self.indexFile, "r") as indexData:
+                state = json.load(indexData)
+            if state["version"] != VERSION or state["source"] != self.version or state["column"] != self.column:
+                return False
+            self.ranges = state["dates"]
+        except Exception as e:
+            return False
+        return True
+
+    # build method scans the text file once. Consecutive lines of the same key form one range;
+    # a key listed in several places gets several ranges, in file order.
+    def build(self):
+        self.ranges = {}
+        offset = 0
+        current = None
+        with open(self.textFile, "rb") as textData:
+            for line in textData:
+                key = self.getKey(line)
+                if key is not None:
+                    if key != current:
+                        self.ranges.setdefault(key, []).append([offset, offset])
+                    self.ranges[key][-1][1] = offset + len(line)
+                current = key
+                offset += len(line)
+        countRead(offset)
+
+    # save method writes the sidecar through a temporary file; failures are ignored.
+    def save(self):
+        temporaryFile = self.indexFile + ".tmp"
+        try:
+            with open(temporaryFile, "w") as indexData:
+                json.dump({"version": VERSION, "source": self.version, "column": self.column, "dates": self.ranges},
+                          indexData)
+            os.replace(temporaryFile, self.indexFile)
+        except OSError as raisedException:
+            pass
+
+    # readRuns method receives a key and returns the lines listed for it, one list per range, in file order.
+    # With following=True each list ends with the line after the range, if any; aries tables need it
+    # for the delta of the last hour of the range.
+    def readRuns(self, key, following=False):
+        ranges = self.ranges.get(key)
+        if ranges is None:
+            return []
+        runs = []
+        size = 0
+        with open(self.textFile, "rb") as textData:
+            for start, end in ranges:
+                textData.seek(start)
+                run = textData.read(end - start).decode("utf-8").splitlines(True)
+                size += end - start
+                if following:
+                    line = textData.readline()
+                    if line:
+                        run.append(line.decode("utf-8"))
+                        size += len(line)
+                runs.append(run)
+        countRead(size)
+        return runs
+
+    # getDates method returns the dates listed in the text file.
+    def getDates(self):
+        return list(self.ranges)
+
+    # isCurrent method returns True while the text file has not changed since the index was made.
+    def isCurrent(self):
+        try:
+            status = os.stat(self.textFile)
+        except OSError as raisedException:
+            return False
+        return [status.st_mtime_ns, status.st_size] == self.version
+
+    # refresh method rebuilds the index when the text file has changed since it was made.
+    # Returns True when it was rebuilt.
+    def refresh(self):
+        try:
+            status = os.stat(self.textFile)
+        except OSError as raisedException:
+            raise (ValueError("DateIndex.refresh:  Ephemeris file could not be opened"))
+        version = [status.st_mtime_ns, status.st_size]
+        if version == self.version:
+            return False
+        self.version = version
+        if not self.load():
+            self.build()
+            self.save()
+        return True
+
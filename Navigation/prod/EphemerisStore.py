@@ -0,0 +1,183 @@
+from datetime import date as calendarDate
+import sqlite3
+import sys
+import threading
+import uuid
+
+import Ephemeris as Ephemeris
+import EphemerisBinary as EphemerisBinary
+
+# Tables of the store. Dates are kept as proleptic Gregorian ordinals so that date ranges are
+# index range scans; the primary keys are the (body, date) and (date, hour) indexes of the lookups,
+# stars_day serves the lookups of every star of some dates.
+# Each aries row holds the GHA of the hour and the delta to the following hour, as AriesEphemeris does.
+# The meta table holds the version of the content, a token replaced by every import.
+SCHEMA = ("CREATE TABLE IF NOT EXISTS stars (body TEXT NOT NULL, day INTEGER NOT NULL, sha REAL NOT NULL, "
+          "declination REAL NOT NULL, declinationString TEXT NOT NULL, PRIMARY KEY (body, day)) WITHOUT ROWID",
+          "CREATE INDEX IF NOT EXISTS stars_day ON stars (day)",
+          "CREATE TABLE IF NOT EXISTS aries (day INTEGER NOT NULL, hour INTEGER NOT NULL, gha REAL NOT NULL, "
+          "delta REAL NOT NULL, PRIMARY KEY (day, hour)) WITHOUT ROWID",
+          "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID")
+# Dates bound per query; SQLite allows 999 parameters in its most restrictive builds.
+BATCH_SIZE = 500
+
+
+# toDate function receives a date ordinal and returns it as "mm/dd/yy", the date format of the text files.
+def toDate(ordinal):
+    return calendarDate.fromordinal(ordinal).strftime("%m/%d/%y")
+
+
+class EphemerisStore():
+    # Default constructor of EphemerisStore Class.
+    # It opens, or creates, the SQLite ephemeris store. The store is shared through the file:
+    # any number of processes read it at the same time (write-ahead logging keeps readers going
+    # during an import) and none of them parses a text file.
+    # readOnly=True opens an existing store without creating or changing it.
+    def __init__(self, storeFile, readOnly=False):
+        try:
+            if readOnly:
+                self.connection = sqlite3.connect("file:" + storeFile + "?mode=ro", uri=True, check_same_thread=False)
+                self.connection.execute("SELECT count(*) FROM stars, aries WHERE 0").fetchall()
+            else:
+                self.connection = sqlite3.connect(storeFile, check_same_thread=False)
+                self.connection.execute("PRAGMA journal_mode=WAL")
+                with self.connection:
+                    for statement in SCHEMA:
+                        self.connection.execute(statement)
+        except sqlite3.Error as raisedException:
+            raise (ValueError("EphemerisStore.__init__:  Ephemeris store could not be opened"))
+        self.storeFile = storeFile
+        self.lock = threading.Lock()
+        self.ordinals = {}
+
+    # importText method receives the star and aries text files and adds their entries in one transaction;
+    # an entry already in the store for the same (body, date) or (date, hour) is replaced.
+    # Lines whose date is not on the calendar can never match a sighting and are left out.
+    # The version of the store (see getVersion) is replaced in the same transaction.
+    # Returns (star count, hour count) imported.
+    def importText(self, starFile, ariesFile):
+        stars = []
+        for (body, date), (sha, declination, declinationString) in Ephemeris.StarCatalog(starFile).stars.items():
+            ordinal = self.getOrdinal(date)
+            if ordinal is not None:
+                stars.append((body, ordinal, sha, declination, declinationString))
+        hours = []
+        for (date, hour), (gha, delta) in Ephemeris.AriesEphemeris(ariesFile).hours.items():
+            ordinal = self.getOrdinal(date)
+            if ordinal is not None:
+                hours.append((ordinal, hour, gha, delta))
+        try:
+            with self.lock, self.connection:
+                self.connection.executemany("INSERT OR REPLACE INTO stars VALUES (?, ?, ?, ?, ?)", stars)
+                self.connection.executemany("INSERT OR REPLACE INTO aries VALUES (?, ?, ?, ?)", hours)
+                self.connection.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (uuid.uuid4().hex,))
+        except sqlite3.Error as raisedException:
+            raise (ValueError("EphemerisStore.importText:  Ephemeris store could not be written"))
+        return (len(stars), len(hours))
+
+    # getVersion method returns the version of the content, a token that changes with every import,
+    # or None for a store written before versions were kept.
+    def getVersion(self):
+        try:
+            with self.lock:
+                row = self.connection.execute("SELECT value FROM meta WHERE name = 'version'").fetchone()
+        except sqlite3.Error as raisedException:
+            return None
+        return row[0] if row is not None else None
+
+    # getOrdinal method converts "mm/dd/yy" to an ordinal, remembering earlier conversions.
+    # Returns None for dates that are not on the calendar.
+    def getOrdinal(self, date):
+        ordinal = self.ordinals.get(date, -1)
+        if ordinal == -1:
+            try:
+                ordinal = EphemerisBinary.toOrdinal(date)
+            except ValueError as raisedException:
+                ordinal = None
+            self.ordinals[date] = ordinal
+        return ordinal
+
+    # query method runs one SELECT per BATCH_SIZE dates of the received "mm/dd/yy" dates
+    # (a single one for any sighting file spanning fewer dates) and returns all rows.
+    def query(self, statement, dates):
+        ordinals = sorted(set(ordinal for ordinal in map(self.getOrdinal, dates) if ordinal is not None))
+        rows = []
+        with self.lock:
+            for first in range(0, len(ordinals), BATCH_SIZE):
+                batch = ordinals[first:first + BATCH_SIZE]
+                rows.extend(self.connection.execute(statement % ", ".join("?" * len(batch)), batch))
+        return rows
+
+    # getStars method receives "mm/dd/yy" dates.
+    # Returns the stars listed on them as ((body, date), (SHA, declination, declinationString)) pairs.
+    def getStars(self, dates):
+        return [((body, toDate(day)), (sha, declination, declinationString)) for body, day, sha, declination, declinationString
+                in self.query("SELECT body, day, sha, declination, declinationString FROM stars WHERE day IN (%s)", dates)]
+
+    # getHours method receives "mm/dd/yy" dates.
+    # Returns the hours listed on them as ((date, hour), (GHA, delta to next hour)) pairs.
+    def getHours(self, dates):
+        return [((toDate(day), hour), (gha, delta)) for day, hour, gha, delta
+                in self.query("SELECT day, hour, gha, delta FROM aries WHERE day IN (%s)", dates)]
+
+    # getDateRange method returns the first and last dates of the aries table as "mm/dd/yy", or None when it is empty.
+    def getDateRange(self):
+        with self.lock:
+            first, last = self.connection.execute("SELECT min(day), max(day) FROM aries").fetchone()
+        if first is None:
+            return None
+        return (toDate(first), toDate(last))
+
+    def close(self):
+        self.connection.close()
+
+
+class StoreStarCatalog(Ephemeris.PartitionedStarCatalog):
+    # Default constructor of StoreStarCatalog Class.
+    # It exposes the stars of an EphemerisStore with the StarCatalog lookup. The stars of a date
+    # are fetched the first time one of them is looked up; prefetch fetches many dates with one query.
+    def __init__(self, store):
+        Ephemeris.StarCatalog.__init__(self)
+        self.store = store
+        self.loaded = set()
+
+    # prefetch method receives "mm/dd/yy" dates and fetches the stars of those not fetched yet.
+    def prefetch(self, dates):
+        dates = set(dates) - self.loaded
+        if len(dates) > 0:
+            self.stars.update(self.store.getStars(dates))
+            self.loaded.update(dates)
+
+    # loadDate method fetches the stars of one date.
+    def loadDate(self, date):
+        self.prefetch((date,))
+
+
+class StoreAriesEphemeris(Ephemeris.PartitionedAriesEphemeris):
+    # Default constructor of StoreAriesEphemeris Class.
+    # It exposes the hours of an EphemerisStore with the AriesEphemeris lookup. The hours of a date
+    # are fetched the first time one of them is looked up; prefetch fetches many dates with one query.
+    def __init__(self, store):
+        Ephemeris.AriesEphemeris.__init__(self)
+        self.store = store
+        self.loaded = set()
+
+    # prefetch method receives "mm/dd/yy" dates and fetches the hours of those not fetched yet.
+    def prefetch(self, dates):
+        dates = set(dates) - self.loaded
+        if len(dates) > 0:
+            self.hours.update(self.store.getHours(dates))
+            self.loaded.update(dates)
+
+    # loadDate method fetches the hours of one date.
+    def loadDate(self, date):
+        self.prefetch((date,))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4:
+        sys.exit("usage: EphemerisStore.py storeFile starFile ariesFile")
+    store = EphemerisStore(sys.argv[1])
+    starCount, hourCount = store.importText(sys.argv[2], sys.argv[3])
+    store.close()
+    print(str(starCount) + " stars, " + str(hourCount) + " hours")
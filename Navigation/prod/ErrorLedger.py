@@ -0,0 +1,88 @@
+from array import array
+
+
+class ErrorLedger():
+    # Error codes and the message each one stands for; {field} is replaced by the field name.
+    MISSING_TAG = "missing-tag"
+    STAR_NOT_FOUND = "star-not-found"
+    ARIES_NOT_FOUND = "aries-not-found"
+    INVALID_SIGHTING = "invalid-sighting"
+    MESSAGES = {MISSING_TAG: "Fix.getSightings:  {field} tag is missing",
+                STAR_NOT_FOUND: "Sighting file : Some data not match",
+                ARIES_NOT_FOUND: "Sighting file : Aries data not match",
+                INVALID_SIGHTING: "Fix.getSightings:  Invalid sighting"}
+    CODES = (MISSING_TAG, STAR_NOT_FOUND, ARIES_NOT_FOUND, INVALID_SIGHTING)
+
+    # Default constructor of ErrorLedger Class.
+    # It records one entry per error: sighting index, field, code. Entries are kept as three
+    # machine arrays, 10 bytes each, and messages are only built when read.
+    # limit caps the number of entries kept (None for no cap); errors past the cap are only counted.
+    # Errors are also counted per code, past the cap too (see getCounts).
+    def __init__(self, limit=None):
+        self.limit = limit
+        self.codeCounts = array("q", [0] * len(self.CODES))
+        self.indexes = array("q")
+        self.codes = array("B")
+        self.fields = array("B")
+        self.fieldNames = [None]
+        self.overflow = 0
+        self.carried = 0
+
+    # add method records an error with the code, the index of the sighting in its file
+    # (None when unknown) and the field at fault (None when not a single field).
+    def add(self, code, index=None, field=None):
+        position = self.CODES.index(code)
+        self.codeCounts[position] += 1
+        if self.limit is not None and len(self.codes) >= self.limit:
+            self.overflow += 1
+            return
+        if field not in self.fieldNames:
+            self.fieldNames.append(field)
+        self.indexes.append(-1 if index is None else index)
+        self.codes.append(position)
+        self.fields.append(self.fieldNames.index(field))
+
+    # carry method counts errors that have no entry, e.g. those of an earlier run resumed from a checkpoint.
+    def carry(self, count):
+        self.carried += count
+
+    # count property is the number of errors: entries, overflow and carried errors.
+    @property
+    def count(self):
+        return len(self.codes) + self.overflow + self.carried
+
+    # message method returns the message of an entry code for the field.
+    def message(self, code, field):
+        return self.MESSAGES[code].replace("{field}", str(field))
+
+    # __iter__ method yields every entry as {"index", "field", "code", "message"} in the order recorded.
+    def __iter__(self):
+        for position in range(len(self.codes)):
+            index = self.indexes[position]
+            code = self.CODES[self.codes[position]]
+            field = self.fieldNames[self.fields[position]]
+            yield {"index": None if index < 0 else index, "field": field, "code": code,
+                   "message": self.message(code, field)}
+
+    def __len__(self):
+        return len(self.codes)
+
+    # getCounts method returns {code: number of errors} for every code, entries past the limit included;
+    # carried errors have no code and are left out.
+    def getCounts(self):
+        return dict(zip(self.CODES, self.codeCounts))
+
+    # getString method returns the messages of every entry joined together,
+    # the way Fix.errString used to accumulate them.
+    def getString(self):
+        return "".join(entry["message"] for entry in self)
+
+    # clear method forgets every error.
+    def clear(self):
+        del self.indexes[:]
+        del self.codes[:]
+        del self.fields[:]
+        self.fieldNames = [None]
+        self.codeCounts = array("q", [0] * len(self.CODES))
+        self.overflow = 0
+        self.carried = 0
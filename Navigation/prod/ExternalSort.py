@@ -0,0 +1,122 @@
+import heapq
+import os
+import pickle
+import shutil
+import tempfile
+
+import ReducedSighting as ReducedSighting
+
+# Approximate memory held per ReducedSighting, in bytes, with its sort key and values.
+ENTRY_SIZE = 300
+# Sightings written to, and read back from, a run file at a time.
+CHUNK_SIZE = 1000
+
+
+# mergeSorted function receives iterables of reduced sightings, each already sorted by ReducedSighting.sortKey,
+# e.g. the results of several sighting files. Returns an iterator over all of them in that order.
+# Sightings of different streams with the same time and body keep the order of the streams.
+def mergeSorted(streams):
+    return heapq.merge(*streams, key=ReducedSighting.sortKey)
+
+
+# readRun function receives a run file and yields its sightings, one chunk in memory at a time.
+def readRun(runFile):
+    with open(runFile, "rb") as runData:
+        while True:
+            try:
+                chunk = pickle.load(runData)
+            except EOFError as raisedException:
+                return
+            for state in chunk:
+                yield ReducedSighting.ReducedSighting.fromState(state)
+
+
+# writeRun function receives a run file name and sorted sightings and writes them in chunks.
+# Returns the number of sightings written.
+def writeRun(runFile, sightings):
+    count = 0
+    chunk = []
+    with open(runFile, "wb") as runData:
+        for sighting in sightings:
+            chunk.append(sighting.getState())
+            if len(chunk) >= CHUNK_SIZE:
+                pickle.dump(chunk, runData, pickle.HIGHEST_PROTOCOL)
+                count += len(chunk)
+                chunk = []
+        if len(chunk) > 0:
+            pickle.dump(chunk, runData, pickle.HIGHEST_PROTOCOL)
+            count += len(chunk)
+    return count
+
+
+class ExternalSorter():
+    # Default constructor of ExternalSorter Class.
+    # It collects reduced sightings like a list and returns them sorted by ReducedSighting.sortKey,
+    # the order of the log, holding about memoryBudget bytes of them at most: every time the budget is
+    # reached the sightings held are sorted and spilled to a run file in a temporary directory
+    # (in directory, default the system one), and iterating k-way merges the runs.
+    # When there are more runs than can be merged within the budget, they are merged in several passes.
+    # Iterating reads the runs again each time; close removes them.
+    def __init__(self, memoryBudget=64 << 20, directory=None):
+        self.runSize = max(CHUNK_SIZE, memoryBudget // ENTRY_SIZE)
+        self.fanIn = max(2, self.runSize // CHUNK_SIZE - 1)
+        self.directory = directory
+        self.runDirectory = None
+        self.runs = []
+        self.written = 0
+        self.pending = []
+        self.count = 0
+
+    # append method receives a reduced sighting; it spills the sightings held when the budget is reached.
+    def append(self, sighting):
+        self.pending.append(sighting)
+        self.count += 1
+        if len(self.pending) >= self.runSize:
+            self.spill()
+
+    # spill method sorts the sightings held and writes them to a new run file.
+    def spill(self):
+        if len(self.pending) == 0:
+            return
+        self.pending.sort(key=ReducedSighting.sortKey)
+        self.runs.append(self.writeRun(self.pending))
+        self.pending = []
+
+    # writeRun method writes sorted sightings to a new run file and returns its name.
+    def writeRun(self, sightings):
+        if self.runDirectory is None:
+            self.runDirectory = tempfile.mkdtemp(prefix="fixsort", dir=self.directory)
+        runFile = os.path.join(self.runDirectory, "run" + str(self.written))
+        self.written += 1
+        writeRun(runFile, sightings)
+        return runFile
+
+    # sort method takes the place of list.sort for Fix: it sorts the sightings held in memory and merges
+    # the runs down to fanIn, so that iterating only has to merge. The order is always ReducedSighting.sortKey.
+    # Runs stay in the order their sightings were appended, so sightings with the same time and body
+    # come out in that order, as from a stable sort.
+    def sort(self, key=ReducedSighting.sortKey):
+        if key is not ReducedSighting.sortKey:
+            raise (ValueError("ExternalSorter.sort:  Sightings are only sorted by ReducedSighting.sortKey"))
+        self.pending.sort(key=ReducedSighting.sortKey)
+        while len(self.runs) + 1 > self.fanIn:
+            merged = self.runs[0:self.fanIn]
+            self.runs = [self.writeRun(mergeSorted([readRun(runFile) for runFile in merged]))] + self.runs[self.fanIn:]
+            for runFile in merged:
+                os.remove(runFile)
+
+    # __iter__ method yields every sighting appended so far in order, merging the runs with the sightings held.
+    def __iter__(self):
+        self.sort()
+        return mergeSorted([readRun(runFile) for runFile in self.runs] + [self.pending])
+
+    def __len__(self):
+        return self.count
+
+    # close method removes the run files and forgets the sightings; the count of sightings appended stays.
+    def close(self):
+        if self.runDirectory is not None:
+            shutil.rmtree(self.runDirectory, ignore_errors=True)
+        self.runDirectory = None
+        self.runs = []
+        self.pending = []
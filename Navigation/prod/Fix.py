@@ -1,50 +1,127 @@
-from datetime import datetime, time, timedelta, timezone
+from array import array
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+from itertools import islice
 from math import *
 import os
-from xml.dom.minidom import parse
-import xml.dom.minidom
 
 import Angle as Angle
+import Checkpoint as Checkpoint
+import Ephemeris as Ephemeris
+import EphemerisBinary as EphemerisBinary
+import EphemerisStore as EphemerisStore
+import ErrorLedger as ErrorLedger
+import ExternalSort as ExternalSort
+import FixResults as FixResults
+import Instrumentation as Instrumentation
+import LogWriter as LogWriter
+import PositionSolver as PositionSolver
+import ReducedSighting as ReducedSighting
+import ReductionCache as ReductionCache
+import Reduction as Reduction
+import SiderealTime as SiderealTime
+import SightingReader as SightingReader
+
+
+# stripExtension function receives a file name and returns it without its extension. Dots in directory
+# names and earlier in the name are kept, e.g. "spool.d/a.b.xml" gives "spool.d/a.b";
+# a name that is only an extension, e.g. ".xml", gives "".
+def stripExtension(fileName):
+    directory, name = os.path.split(fileName)
+    stem = name.rsplit(".", 1)[0]
+    if len(stem) < 1:
+        return ""
+    return os.path.join(directory, stem)
 
 
 class Fix():
+    # Sightings whose reduction cache entries are read with one query (see reduceSightingsCached).
+    CACHE_BATCH = 500
+    # Sightings whose ephemeris dates are prefetched together (see prefetchSightings), and that are
+    # reduced together as columns (see reduceSightingsBatch).
+    PREFETCH_BATCH = 10000
+    # Required tags of a sighting, in the order they are checked.
+    REQUIRED_TAGS = ("body", "date", "time", "observation")
+
     # Default constructor of Fix Class.    
     # It initializes all the attributes.    
-    def __init__(self, logFile="log.txt"):
-        self.errString = ""
+    # logFile None writes no log at all (see getResults); incremental runs need a log file.
+    # backgroundLog writes the log from a separate thread.
+    # stats, an Instrumentation.Stats, collects per-stage timings and counters of getSightings;
+    # with None (the default) nothing is measured.
+    # errorLimit caps the sighting errors kept in the error ledger; errors past it are only counted.
+    # indexed=True looks the star and aries data up by seeking into the text files for every sighting
+    # (see Ephemeris.IndexedStarCatalog) in place of parsing the dates the sightings were taken on.
+    # reductionCache, a ReductionCache.ReductionCache, keeps reduced sightings across runs; sightings found
+    # in it are not reduced again. It is only used while the star and aries data were set through the set methods.
+    # sortBudget caps the memory, in bytes, held by the reduced sightings while they are sorted; beyond it
+    # they are sorted in runs on disk and merged into the log (see ExternalSort). None keeps them all in memory.
+    # metrics, a Metrics.Metrics, is told about every run of getResults and getSightings; its stats
+    # take the place of stats so that it gets the stage latencies.
+    # checkpointFile is the checkpoint of incremental runs, "<log file>.checkpoint" by default; sighting files
+    # logged to the same log are each given their own.
+    def __init__(self, logFile="log.txt", backgroundLog=False, stats=None, errorLimit=None, indexed=False,
+                 reductionCache=None, sortBudget=None, metrics=None, checkpointFile=None):
+        self.errors = ErrorLedger.ErrorLedger(errorLimit)
+        self.checkpointFile = checkpointFile
+        self.indexed = indexed
+        self.reductionCache = reductionCache
+        self.sortBudget = sortBudget
+        self.ephemerisSources = {}
+        self.fingerprint = None
         self.Angle = Angle.Angle()
         self.newAngle = Angle.Angle()
         self.newAngle2 = Angle.Angle()
-        self.err = 0
+        self.starCatalog = None
+        self.ariesEphemeris = None
+        self.sightings = []
+        self.stats = stats if metrics is None else metrics.stats
+        self.metrics = metrics
+        if logFile is None:
+            self.logger = LogWriter.NullLogWriter()
+            self.logFile = None
+            return
         if len(logFile) < 1:
             raise (ValueError("Fix.__init__:  Received Filename is invalid"))
 
         try:
-            logger = open(logFile, "a")
-            self.logger = logger
-            
-            dateUTC = datetime.now(tz=timezone.utc)
-            dateLocal = dateUTC.astimezone().replace(microsecond=0)
+            self.logger = LogWriter.LogWriter(logFile, background=backgroundLog)
 
             filePath = os.path.abspath(logFile)
-            logger.write("LOG: " + dateLocal.isoformat(' ') + " Log file:\t" + filePath + "\n")
+            self.logFile = filePath
+            if self.checkpointFile is None:
+                self.checkpointFile = filePath + ".checkpoint"
+            self.logger.log(" Log file:\t" + filePath)
             
         except ValueError as raisedException:
             raise (ValueError("Fix.__init__:  Log File could not be created or appended"))
 
+    # err property is the number of sighting errors.
+    # Assigning it counts the difference as errors without ledger entries.
+    @property
+    def err(self):
+        return self.errors.count
+
+    @err.setter
+    def err(self, value):
+        self.errors.carry(value - self.errors.count)
+
+    # errString property is the messages of the recorded sighting errors joined together.
+    @property
+    def errString(self):
+        return self.errors.getString()
+
     # setSightingFile method receives parameter sightingFile as string.
     # Sets the received xml file as the sighting file.
     def setSightingFile(self, sightingFile):
-        actualFileName = sightingFile.split(".")[0]
+        actualFileName = stripExtension(sightingFile)
         
         if(len(actualFileName)) < 1:
            raise (ValueError("Fix.setSightingFile:  Received Filename is invalid"))
        
         self.sightingFile = actualFileName + ".xml"
-        dateUTC = datetime.now(tz=timezone.utc)
-        dateLocal = dateUTC.astimezone().replace(microsecond=0)
         filePath = os.path.abspath(sightingFile)
-        self.logger.write("LOG: " + dateLocal.isoformat(' ') + " Sighting file:\t" + filePath + " \n")
+        self.logger.log(" Sighting file:\t" + filePath + " ")
         try:
             f = open(self.sightingFile, "r")
             f.close()
@@ -56,16 +133,14 @@ class Fix():
     # setAriesFile method receives parameter ariesFile as string.
     # Sets the received text file as the aries file.
     def setAriesFile(self, ariesFile):
-        actualFileName = ariesFile.split(".")[0]
+        actualFileName = stripExtension(ariesFile)
 
         if (len(actualFileName)) < 1:
             raise (ValueError("Fix.setAriesFile:  Received Filename is invalid"))
 
-        dateUTC = datetime.now(tz=timezone.utc)
-        dateLocal = dateUTC.astimezone().replace(microsecond=0)
         filePath = os.path.abspath(ariesFile)
 
-        self.logger.write("LOG: " + dateLocal.isoformat(' ') + " Aries file:\t" + filePath + " \n")
+        self.logger.log(" Aries file:\t" + filePath + " ")
         self.ariesFile = actualFileName + ".txt"
 
         try:
@@ -73,21 +148,30 @@ class Fix():
             f.close()
         except Exception as e:
             raise (ValueError("Fix.setAriesFile:  Aries file could not be opened"))
+
+        self.ariesEphemeris = None
+        self.ephemerisSources["aries"] = self.ariesFile
         return filePath
 
+    # setAnalyticAries method computes the GHA of Aries from the sighting time (see SiderealTime)
+    # in place of reading an aries file; setAriesFile switches back to a file.
+    def setAnalyticAries(self):
+        self.logger.log(" Aries file:\tanalytic ")
+        self.ariesFile = None
+        self.ariesEphemeris = SiderealTime.AnalyticAriesEphemeris()
+        self.ephemerisSources["aries"] = "analytic"
+
     # setStarFile method receives parameter starFile as string.
     # Sets the received text file name as the stars file.
     def setStarFile(self, starFile):
-        actualFileName = starFile.split(".")[0]
+        actualFileName = stripExtension(starFile)
 
         if (len(actualFileName)) < 1:
             raise (ValueError("Fix.setStarFile:  Received Filename is invalid"))
 
-        dateUTC = datetime.now(tz=timezone.utc)
-        dateLocal = dateUTC.astimezone().replace(microsecond=0)
         filePath = os.path.abspath(starFile)
 
-        self.logger.write("LOG: " + dateLocal.isoformat(' ') + " Star file:\t" + filePath + " \n")
+        self.logger.log(" Star file:\t" + filePath + " ")
         self.starFile = actualFileName + ".txt"
 
         try:
@@ -96,178 +180,420 @@ class Fix():
         except Exception as e:
             raise (ValueError("Fix.setStarFile:  Stars file could not be opened"))
 
+        self.starCatalog = None
+        self.ephemerisSources["stars"] = self.starFile
         return filePath
 
+    # setEphemerisFile method receives parameter ephemerisFile as string.
+    # Uses a compiled binary ephemeris (see EphemerisBinary) for both star and aries data
+    # in place of the star and aries text files.
+    def setEphemerisFile(self, ephemerisFile):
+        if len(ephemerisFile) < 1:
+            raise (ValueError("Fix.setEphemerisFile:  Received Filename is invalid"))
+
+        filePath = os.path.abspath(ephemerisFile)
+        self.logger.log(" Ephemeris file:\t" + filePath + " ")
+
+        try:
+            ephemeris = EphemerisBinary.BinaryEphemeris(ephemerisFile)
+        except ValueError as raisedException:
+            raise (ValueError("Fix.setEphemerisFile:  Ephemeris file could not be opened"))
+
+        self.starCatalog = EphemerisBinary.BinaryStarCatalog(ephemeris)
+        self.ariesEphemeris = EphemerisBinary.BinaryAriesEphemeris(ephemeris)
+        self.ephemerisSources = {"stars": filePath, "aries": filePath}
+        return filePath
+
+    # setEphemerisStore method receives parameter storeFile as string.
+    # Uses a SQLite ephemeris store (see EphemerisStore) for both star and aries data
+    # in place of the star and aries text files.
+    def setEphemerisStore(self, storeFile):
+        if len(storeFile) < 1:
+            raise (ValueError("Fix.setEphemerisStore:  Received Filename is invalid"))
+
+        filePath = os.path.abspath(storeFile)
+        self.logger.log(" Ephemeris store:\t" + filePath + " ")
+
+        try:
+            store = EphemerisStore.EphemerisStore(storeFile, readOnly=True)
+        except ValueError as raisedException:
+            raise (ValueError("Fix.setEphemerisStore:  Ephemeris store could not be opened"))
+
+        self.starCatalog = EphemerisStore.StoreStarCatalog(store)
+        self.ariesEphemeris = EphemerisStore.StoreAriesEphemeris(store)
+        self.ephemerisSources = {"stars": store, "aries": store}
+        return filePath
+
+    # stage method returns a context manager timing its body as the stage name,
+    # or one that does nothing when no stats are collected.
+    def stage(self, name):
+        if self.stats is None:
+            return nullcontext()
+        return self.stats.stage(name)
+
     # getSightings file works on the sighting file, starsfile and ariesfile.
     # Processes the sightings information specified in the sightingFile.
-    # Reads stars file and aries file and takes matching data.
+    # Reads stars file and aries file and takes matching data; only the lines of the dates
+    # the sightings were taken on are parsed (see Ephemeris.PartitionedStarCatalog).
     # Calculates adjusted altitude, latitude and longitude.
     # Writes calculation in log file with current datetime in cronological order to the earliest time.
-    def getSightings(self):
-       
-        approximateLatitude = "0d0.0"			
-        approximateLongitude = "0d0.0"
+    # Returns the approximate position fixed from all reduced sightings by least squares
+    # (see PositionSolver), or "0d0.0" for both when it cannot be fixed.
+    # With incremental=True a checkpoint is kept, by default next to the log ("<log file>.checkpoint"):
+    # a later run on the same, appended-to file reduces and logs only the new sightings,
+    # appends them to those of the previous runs, and falls back to a full run when the file
+    # was replaced or rewritten before the checkpoint (see Checkpoint.SightingCheckpoint).
+    # self.sightings is then a Checkpoint.CheckpointSightings, read the first time it is iterated.
+    # With a sort budget, self.sightings is left as the emptied ExternalSorter once the run is over;
+    # it still has the number of reduced sightings.
+    # With stats set, the stages load, checkpoint, parse, reduce, lookup (within reduce), sort, log
+    # and fix are timed, and the sightings and errors are counted.
+    def getSightings(self, incremental=False):
         try:
-            DOMTree = xml.dom.minidom.parse(self.sightingFile)  
-        except Exception as e:
-            raise (ValueError("Fix.getSightings:  Sighting file not found"))
+            results = self.getResults(incremental)
+        except ValueError as raisedException:
+            raise (ValueError(str(raisedException).replace("Fix.getResults:", "Fix.getSightings:", 1)))
+        results.close()
+        return (results.approximateLatitude, results.approximateLongitude)
+
+    # getResults method runs getSightings and returns its results as a FixResults: the reduced sightings
+    # in chronological order, with the numeric degrees of each and its log strings computed only when read,
+    # the sighting errors and the approximate position in degrees.
+    # The log is written as by getSightings; with no log file nothing is formatted at all.
+    # The results hold the sightings (with a sort budget, their run files) until they are closed.
+    def getResults(self, incremental=False):
+        if incremental and self.logFile is None:
+            raise (ValueError("Fix.getResults:  Incremental runs need a log file"))
 
-        collection = DOMTree.documentElement
-        sightings = collection.getElementsByTagName("sighting")
-        listSightings = []
-        
         try:
-            for sighting in sightings:
-                try:
-                    body = sighting.getElementsByTagName('body')[0].childNodes[0].data.strip()
-                except Exception as e:
-                    self.err += 1
-                    self.errString += "Fix.getSightings:  body tag is missing"
-                    continue
-
-                try:
-                    receivedDate = sighting.getElementsByTagName('date')[0].childNodes[0].data.strip()
-                except Exception as e:
-                    self.err += 1
-                    self.errString += "Fix.getSightings:  date tag is missing"
-                    continue
-
-                try:
-                    tm = sighting.getElementsByTagName('time')[0].childNodes[0].data.strip()
-                except Exception as e:
-                    self.err += 1
-                    self.errString += "Fix.getSightings:  time tag is missing"
-                
-                try:
-                    observation = sighting.getElementsByTagName('observation')[0].childNodes[0].data.strip()
-                except Exception as e:
-                    self.err += 1
-                    self.errString += "Fix.getSightings:  observation tag is missing"
-                    continue
+            sightings = SightingReader.SightingReader(self.sightingFile)
+        except Exception as e:
+            raise (ValueError("Fix.getResults:  Sighting file not found"))
 
-                try:
-                    height = sighting.getElementsByTagName('height')[0].childNodes[0].data.strip()
-                except Exception as e:
-                    height = "0"
-
-                try:
-                    temperature = float(sighting.getElementsByTagName('temperature')[0].childNodes[0].data.strip())
-                except Exception as e:
-                    temperature = 72.0
-                
-                try:
-                    pressure = sighting.getElementsByTagName('pressure')[0].childNodes[0].data.strip()
-                except Exception as e:
-                    pressure = "1010"
-
-                try:
-                    horizon = sighting.getElementsByTagName('horizon')[0].childNodes[0].data.strip().lower()
-                except Exception as e:
-                    horizon = "natural"
-
-                angle = Angle.Angle()
-                angle.setDegreesAndMinutes(observation)
-                
-                if angle.degrees < 0 or angle.degrees > 90:
-                    raise (ValueError("Fix.getSightings:  Observation-Degrees are invalid"))
-                elif angle.minutes < 0 or angle.minutes > 60:
-                    raise (ValueError("Fix.getSightings:  Observation-Minutes are invalid"))
-
-                dip = 0.0
-                if horizon == "natural":
-                    dip = (-0.97 * sqrt(float(height.strip()))) / 60.0
-
-                celcius = (temperature - 32) * 5.0 / 9.0
-                angle.setDegreesAndMinutes(observation)
-                altitude = angle.degrees + (angle.minutes / 60) % 360
-
-                part1 = -0.00452 * float(pressure)
-                part2 = float(273 + celcius)
-                part3 = tan(radians(altitude))
-                refraction = part1 / part2 / part3
-
-                adjustedAltitude = altitude + dip + refraction
-                angle.setDegrees(adjustedAltitude)
-                h, m, sec = tm.split(":")
-
-                s = (int(m) * 60) + int(sec)
-                convertedDate = datetime.strptime(receivedDate, '%Y-%m-%d').strftime('%m/%d/%y')
-
-                starData = open(self.starFile, "r")
-                bodyFlag = False
-
-                for line in starData:
-
-                    name = line.split("\t")[0]
-                    tempDt = line.split("\t")[1]
-                    if name == body and tempDt == convertedDate:
-                        self.SHAstar = self.Angle.setDegreesAndMinutes(line.split("\t")[2])
-                        self.latitude = (line.split("\t")[3]).strip()
-                        bodyFlag = True
-                starData.close()
-
-                try:
-                    if (not bodyFlag):
-                        self.err += 1
-                        self.errString += "Sighting file : Some data not match"
-                        continue
-
-                except:
-                    self.err += 1
-
-                ariesData = open(self.ariesFile, "r")
-                for line in ariesData:
-                    tempD = line.split("\t")[0]
-                    tempH = line.split("\t")[1]
-                    obj = line.split("\t")[2]
-
-                    h = int(h)
-                    tempH = int(tempH)
-                    if tempD == convertedDate and tempH == h:
-                        self.GHAaries1 = self.newAngle.setDegreesAndMinutes(obj)
-                        nextObj = next(ariesData).split("\t")[2]
-                        self.GHAaries2 = self.newAngle2.setDegreesAndMinutes(nextObj)
-
-                ariesData.close()
-
-                self.GHAaries = self.GHAaries1 + (self.GHAaries2 - self.GHAaries1) * (s / 3600)
-                self.GHAobservation = self.GHAaries + self.SHAstar
-
-                self.Angle.setDegrees(self.GHAobservation)
-                self.GHAobservation = self.Angle.getString()
-
-                listSightings.append({
-                    "body": body,
-                    "datetime": datetime.strptime(receivedDate + " " + tm, "%Y-%m-%d %H:%M:%S"),
-                    "dt": receivedDate,
-                    "tm": tm,
-                    "observation": observation,
-                    "height": height,
-                    "temperature": temperature,
-                    "pressure": pressure,
-                    "horizon": horizon,
-                    "altitude": angle.getString(),
-                    "latitude": self.latitude,
-                    "longitude": self.GHAobservation
-                })
-
-            listSightings = sorted(listSightings, key=lambda k: k['body'])
-            listSightings = sorted(listSightings, key=lambda k: k['datetime'])
-
-            for sighting in listSightings:
-                dateUTC = datetime.now(tz=timezone.utc)
-                dateLocal = dateUTC.astimezone().replace(microsecond=0)
-                self.logger.write("LOG: " + dateLocal.isoformat(' ') + ":\t" + sighting['body'] + "\t" + sighting['dt'] + "\t" + sighting['tm'] + "\t" + sighting['altitude'] + "\t" + sighting['latitude'] + "\t" + sighting['longitude'] + "\n")
-
-
-            dateUTC = datetime.now(tz=timezone.utc)
-            dateLocal = dateUTC.astimezone().replace(microsecond=0)
-            self.logger.write("LOG: " + dateLocal.isoformat(' ') + " Sighting errors:" + "\t" + str(self.err) + "\n")
-            self.logger.close()
-            return (approximateLatitude, approximateLongitude)
+        if self.metrics is None:
+            return self.fixSightings(sightings, incremental)[0]
+        self.metrics.startRun(self)
+        try:
+            results, reduced = self.fixSightings(sightings, incremental)
         except Exception as e:
-            raise (ValueError("Fix.getSightings:  Error reading sighting file"))
-            self.err += 1
+            self.metrics.endRun(self, failed=True)
+            raise
+        self.metrics.endRun(self, reduced)
+        return results
+
+    # fixSightings method runs getResults on the sighting records read from the sighting file.
+    # Returns the FixResults and the number of sightings reduced by this run.
+    # Star and aries files that were never set or cannot be read fail the run like a bad sighting file.
+    def fixSightings(self, sightings, incremental=False):
+        try:
+            with self.stage("load"):
+                if self.starCatalog is None:
+                    self.starCatalog = Ephemeris.cache.getStarCatalog(self.starFile, partitioned=True,
+                                                                      indexed=self.indexed)
+                if self.ariesEphemeris is None:
+                    self.ariesEphemeris = Ephemeris.cache.getAriesEphemeris(self.ariesFile, partitioned=True,
+                                                                            indexed=self.indexed)
+
+            checkpoint = None
+            start = 0
+            if incremental:
+                with self.stage("checkpoint"):
+                    checkpoint = Checkpoint.SightingCheckpoint(self.checkpointFile)
+                    appended = checkpoint.resume(self.sightingFile, sightings)
+                if appended is not None:
+                    sightings = appended
+                    start = checkpoint.count + checkpoint.errors
+                    self.errors.carry(checkpoint.errors)
+
+            listSightings = self.reduceSightings(sightings, start)
+            self.sightings = listSightings
+            if self.logFile is not None:
+                with self.stage("log"):
+                    self.logSightings(listSightings)
+
+            reduced = len(listSightings)
+            if checkpoint is not None:
+                with self.stage("checkpoint"):
+                    checkpoint.append(listSightings)
+                    if isinstance(listSightings, ExternalSort.ExternalSorter):
+                        listSightings.close()
+                    self.sightings = checkpoint.getSightings()
+
+            with self.stage("fix"):
+                if checkpoint is not None:
+                    position = self.solveColumns(*checkpoint.getColumns(), start=checkpoint.position)
+                else:
+                    position = self.solveFix(self.sightings)
+
+            if checkpoint is not None:
+                with self.stage("checkpoint"):
+                    checkpoint.save(self.sightingFile, self.err, position)
+
+            with self.stage("log"):
+                self.logger.log(" Sighting errors:" + "\t" + str(self.err))
+                self.logger.close()
+            if self.stats is not None:
+                self.stats.count("sightings", reduced)
+                self.stats.count("errors", self.err)
+            return (FixResults.FixResults(self.sightings, position, self.errors), reduced)
+        except Exception as e:
+            if isinstance(self.sightings, ExternalSort.ExternalSorter):
+                self.sightings.close()
+            raise (ValueError("Fix.getResults:  Error reading sighting file"))
+
+    # reduceSightings method receives an iterable of sighting records from SightingReader
+    # and the index of the first one in its file, used in the error ledger.
+    # Returns the reduced sightings sorted by time, sightings taken at the same time by body:
+    # a list, or with a sort budget an ExternalSort.ExternalSorter to iterate and close.
+    # Tables that can prefetch (see EphemerisStore.StoreStarCatalog) get the dates of the sightings
+    # ahead of them (see prefetchSightings).
+    # Sightings are reduced PREFETCH_BATCH at a time as columns (see reduceSightingsBatch), except that
+    # with a reduction cache, sightings reduced in earlier runs are read from it (see reduceSightingCached),
+    # and with stats set every sighting is reduced on its own: reading the records is timed as parse,
+    # reducing them as reduce and the star and aries lookups as lookup.
+    def reduceSightings(self, sightings, start=0):
+        listSightings = [] if self.sortBudget is None else ExternalSort.ExternalSorter(self.sortBudget)
+        reduceSighting = self.getReducer()
+        if self.stats is None and reduceSighting == self.reduceSighting:
+            self.reduceSightingsBatch(sightings, start, listSightings)
+        else:
+            prefetches = [table.prefetch for table in (self.starCatalog, self.ariesEphemeris)
+                          if hasattr(table, "prefetch")]
+            if len(prefetches) > 0:
+                sightings = self.prefetchSightings(sightings, prefetches)
+            if self.stats is not None:
+                self.reduceSightingsTimed(sightings, start, reduceSighting, listSightings)
+            else:
+                self.reduceSightingsCached(sightings, start, listSightings)
+        if reduceSighting == self.reduceSightingCached:
+            self.reductionCache.flush()
+
+        with self.stage("sort"):
+            listSightings.sort(key=ReducedSighting.sortKey)
+        return listSightings
+
+    # prefetchSightings method receives sighting records and the prefetch methods of the tables and yields
+    # the records, reading PREFETCH_BATCH of them at a time and prefetching the dates among them that were
+    # not prefetched yet first, so only one batch is held in memory and a sighting file spanning few dates
+    # is fetched with one query per table.
+    def prefetchSightings(self, sightings, prefetches):
+        fetched = set()
+        records = iter(sightings)
+        while True:
+            batch = list(islice(records, self.PREFETCH_BATCH))
+            if len(batch) == 0:
+                return
+            dates = self.getEphemerisDates(batch) - fetched
+            if len(dates) > 0:
+                with self.stage("lookup"):
+                    for prefetch in prefetches:
+                        prefetch(dates)
+                fetched.update(dates)
+            yield from batch
+
+    # getEphemerisDates method receives sighting records and returns the set of their dates
+    # in the "mm/dd/yy" format of the ephemeris; records without a valid date are left out.
+    def getEphemerisDates(self, sightings):
+        dates = set()
+        for receivedDate in set(sighting["date"] for sighting in sightings):
+            try:
+                dates.add(datetime.strptime(receivedDate, "%Y-%m-%d").strftime("%m/%d/%y"))
+            except (TypeError, ValueError) as raisedException:
+                continue
+        return dates
+
+    # getReducer method returns the method reducing one sighting: reduceSightingCached with a reduction cache
+    # and an ephemeris fingerprint (see ReductionCache.fingerprint), otherwise reduceSighting.
+    def getReducer(self):
+        if self.reductionCache is None:
+            return self.reduceSighting
+        self.fingerprint = ReductionCache.fingerprint(self.ephemerisSources)
+        if self.fingerprint is None:
+            return self.reduceSighting
+        return self.reduceSightingCached
+
+    # reduceSightingsBatch method reduces the sightings like reduceSightings, unsorted, PREFETCH_BATCH at a time
+    # through Reduction.BatchReduction, appending them to listSightings (a new list by default), and returns listSightings.
+    # The records of a batch are checked and parsed first; their adjusted altitudes and GHAs are then computed
+    # as columns, NumPy arrays when NumPy is installed, and the sighting errors recorded in the order of the records.
+    def reduceSightingsBatch(self, sightings, start=0, listSightings=None):
+        listSightings = [] if listSightings is None else listSightings
+        batchReduction = Reduction.BatchReduction(self.starCatalog, self.ariesEphemeris)
+        records = enumerate(sightings, start)
+        while True:
+            batch = list(islice(records, self.PREFETCH_BATCH))
+            if len(batch) == 0:
+                return listSightings
+            rows = []
+            for index, sighting in batch:
+                missing = self.getMissingTag(sighting)
+                rows.append((index, missing, None if missing is not None else self.parseSighting(sighting)))
+            parsed = [row for index, missing, row in rows if row is not None]
+            adjustedAltitudes, ghaAries, ghaObservations = batchReduction.reduce(*zip(*parsed)) if parsed else ([], [], [])
+
+            column = 0
+            for index, missing, row in rows:
+                if row is None:
+                    self.errors.add(ErrorLedger.ErrorLedger.MISSING_TAG, index, missing)
+                    continue
+                body, timestamp = row[0], row[6]
+                star = batchReduction.getStar(body, timestamp // 86400)
+                gha = ghaAries[column]
+                if star is None:
+                    self.errors.add(ErrorLedger.ErrorLedger.STAR_NOT_FOUND, index, "body")
+                elif isnan(gha):
+                    self.errors.add(ErrorLedger.ErrorLedger.ARIES_NOT_FOUND, index, "date")
+                else:
+                    listSightings.append(ReducedSighting.ReducedSighting(
+                        body, timestamp, float(adjustedAltitudes[column]), star[1], float(ghaObservations[column]),
+                        star[2]))
+                column += 1
+
+    # reduceSightingsCached method reduces the sightings like reduceSightings, unsorted, through the reduction cache,
+    # appending them to listSightings (a new list by default), and returns listSightings.
+    # The cache entries of every CACHE_BATCH sightings are read together before they are reduced.
+    def reduceSightingsCached(self, sightings, start=0, listSightings=None):
+        listSightings = [] if listSightings is None else listSightings
+        records = enumerate(sightings, start)
+        while True:
+            batch = list(islice(records, self.CACHE_BATCH))
+            if len(batch) == 0:
+                return listSightings
+            keys = [ReductionCache.makeKey(self.fingerprint, sighting) for index, sighting in batch]
+            self.reductionCache.prefetch(keys)
+            for (index, sighting), key in zip(batch, keys):
+                reduced = self.reduceSightingCached(sighting, index, key)
+                if reduced is not None:
+                    listSightings.append(reduced)
+
+    # reduceSightingCached method reduces one sighting like reduceSighting, reading it from the reduction cache
+    # when it was reduced before against the same ephemeris and keeping new results in it.
+    # key is the sighting's ReductionCache.makeKey, computed here when not given.
+    # Sighting errors are not cached; they are found again.
+    def reduceSightingCached(self, sighting, index=None, key=None):
+        if key is None:
+            key = ReductionCache.makeKey(self.fingerprint, sighting)
+        reduced = self.reductionCache.get(key)
+        if reduced is None:
+            reduced = self.reduceSighting(sighting, index)
+            if reduced is not None:
+                self.reductionCache.put(key, reduced)
+        return reduced
+
+    # reduceSightingsTimed method reduces the sightings like reduceSightings, unsorted, with every stage timed,
+    # appending them to listSightings (a new list by default), and returns listSightings.
+    # The tables are swapped for timed stand-ins while the sightings are reduced.
+    def reduceSightingsTimed(self, sightings, start=0, reduceSighting=None, listSightings=None):
+        starCatalog = self.starCatalog
+        ariesEphemeris = self.ariesEphemeris
+        reduceSighting = self.stats.wrap("reduce", reduceSighting if reduceSighting is not None else self.reduceSighting)
+        listSightings = [] if listSightings is None else listSightings
+        try:
+            self.starCatalog = Instrumentation.TimedTable(starCatalog, self.stats, "lookup")
+            self.ariesEphemeris = Instrumentation.TimedTable(ariesEphemeris, self.stats, "lookup")
+            for index, sighting in enumerate(self.stats.iterate("parse", sightings), start):
+                reduced = reduceSighting(sighting, index)
+                if reduced is not None:
+                    listSightings.append(reduced)
+        finally:
+            self.starCatalog = starCatalog
+            self.ariesEphemeris = ariesEphemeris
+        return listSightings
+
+    # logSightings method writes one log line per reduced sighting.
+    def logSightings(self, listSightings):
+        for sighting in listSightings:
+            self.logger.log(":\t" + sighting.body + "\t" + sighting.dt + "\t" + sighting.tm + "\t" + sighting.altitude + "\t" + sighting.latitude + "\t" + sighting.longitude)
+
+    # fixPosition method receives reduced sightings.
+    # Returns the approximate (latitude, longitude) strings, "0d0.0" for both when there is no fix.
+    def fixPosition(self, listSightings):
+        return FixResults.formatPosition(self.solveFix(listSightings))
+
+    # solveFix method receives reduced sightings and reads them once.
+    # Returns the approximate (latitude, longitude) in degrees, or None when there is no fix.
+    def solveFix(self, listSightings):
+        declinations = array("d")
+        ghas = array("d")
+        altitudes = array("d")
+        for sighting in listSightings:
+            declinations.append(sighting.declination)
+            ghas.append(sighting.ghaObservation)
+            altitudes.append(sighting.adjustedAltitude)
+        return self.solveColumns(declinations, ghas, altitudes)
+
+    # solveColumns method receives the declinations, GHAs and adjusted altitudes of the sightings in degrees,
+    # and optionally an assumed (latitude, longitude) to start from, such as the fix of an earlier run.
+    # They are solved as one set by PositionSolver.solvePositions, whose iterations are array operations
+    # over all sightings when NumPy is installed.
+    # Returns the approximate (latitude, longitude) in degrees, or None when there is no fix.
+    def solveColumns(self, declinations, ghas, altitudes, start=None):
+        if len(declinations) < 2:
+            return None
+        latitudes, longitudes, converged = PositionSolver.solvePositions(
+            declinations, ghas, altitudes, array("l", [0]) * len(declinations),
+            latitudes=None if start is None else [start[0]], longitudes=None if start is None else [start[1]])
+        if not converged[0]:
+            return None
+        return (float(latitudes[0]), float(longitudes[0]))
+
+    # getMissingTag method receives one sighting record and returns the first required tag it lacks, or None.
+    def getMissingTag(self, sighting):
+        for tag in self.REQUIRED_TAGS:
+            if sighting[tag] is None:
+                return tag
+        return None
+
+    # parseSighting method receives one sighting record with every required tag.
+    # Returns (body, observed altitude in degrees, height, temperature, pressure, horizon, timestamp),
+    # the columns of Reduction.BatchReduction.reduce, with the timestamp in whole seconds since 1970.
+    # Raises ValueError when the observation is out of range or a value cannot be read.
+    def parseSighting(self, sighting):
+        angle = Angle.Angle()
+        angle.setDegreesAndMinutes(sighting["observation"])
+
+        if angle.degrees < 0 or angle.degrees > 90:
+            raise (ValueError("Fix.getSightings:  Observation-Degrees are invalid"))
+        elif angle.minutes < 0 or angle.minutes > 60:
+            raise (ValueError("Fix.getSightings:  Observation-Minutes are invalid"))
+
+        altitude = angle.degrees + (angle.minutes / 60) % 360
+        moment = datetime.strptime(sighting["date"] + " " + sighting["time"], "%Y-%m-%d %H:%M:%S")
+        timestamp = (moment.toordinal() - ReducedSighting.EPOCH_ORDINAL) * 86400 + moment.hour * 3600 + \
+            moment.minute * 60 + moment.second
+        return (sighting["body"], altitude, float(sighting["height"]), float(sighting["temperature"]),
+                float(sighting["pressure"]), sighting["horizon"], timestamp)
+
+    # reduceSighting method receives one sighting record from SightingReader and its index in the file.
+    # Returns the ReducedSighting, or None after recording the error in the ledger
+    # when a required tag is missing or the star or aries data does not match.
+    def reduceSighting(self, sighting, index=None):
+        missing = self.getMissingTag(sighting)
+        if missing is not None:
+            self.errors.add(ErrorLedger.ErrorLedger.MISSING_TAG, index, missing)
+            return None
+
+        body, altitude, height, temperature, pressure, horizon, timestamp = self.parseSighting(sighting)
+        adjustedAltitude = Reduction.adjustAltitude(altitude, height, temperature, pressure, horizon)
+        moment = ReducedSighting.EPOCH + timedelta(seconds=timestamp)
+        s = moment.minute * 60 + moment.second
+        convertedDate = moment.strftime('%m/%d/%y')
+
+        star = self.starCatalog.get(body, convertedDate)
+        if star is None:
+            self.errors.add(ErrorLedger.ErrorLedger.STAR_NOT_FOUND, index, "body")
+            return None
+        self.SHAstar, declination, self.latitude = star
+
+        self.GHAaries = self.ariesEphemeris.getGHA(convertedDate, moment.hour, s)
+        if self.GHAaries is None:
+            self.errors.add(ErrorLedger.ErrorLedger.ARIES_NOT_FOUND, index, "date")
+            return None
+        self.GHAobservation = self.GHAaries + self.SHAstar
+        ghaObservation = self.GHAobservation % 360
+
+        return ReducedSighting.ReducedSighting(body, timestamp, adjustedAltitude, declination, ghaObservation,
+                                               self.latitude)
 
 
             
@@ -0,0 +1,116 @@
+import argparse
+import json
+import sys
+
+import Ephemeris as Ephemeris
+import EphemerisBinary as EphemerisBinary
+import EphemerisStore as EphemerisStore
+import ErrorLedger as ErrorLedger
+import Fix as Fix
+import SiderealTime as SiderealTime
+import SightingReader as SightingReader
+
+
+# toJson function receives a reduced sighting and returns its output line.
+def toJson(sighting):
+    return json.dumps(sighting.asDict())
+
+
+# streamSightings function receives a Fix with its ephemeris set, binary input streams holding
+# sighting documents, the text output stream and the batch size.
+# Every sighting is reduced as soon as it has been parsed and written as one JSON line;
+# output is flushed every batchSize lines. Nothing is sorted, so memory does not grow with the input.
+# Lines already reduced are still written when a stream turns out to be malformed.
+# When the Fix has a log file, the sightings written are also logged with every flush, in the same order.
+# Returns the number of sightings written.
+def streamSightings(fix, inputs, output, batchSize=100):
+    reader = SightingReader.SightingReader()
+    written = 0
+    lines = []
+    sightings = []
+    try:
+        for stream in inputs:
+            for index, record in enumerate(reader.readSightings(stream)):
+                try:
+                    sighting = fix.reduceSighting(record, index)
+                except Exception as e:
+                    fix.errors.add(ErrorLedger.ErrorLedger.INVALID_SIGHTING, index)
+                    continue
+                if sighting is None:
+                    continue
+                lines.append(toJson(sighting) + "\n")
+                if fix.logFile is not None:
+                    sightings.append(sighting)
+                if len(lines) >= batchSize:
+                    output.write("".join(lines))
+                    output.flush()
+                    fix.logSightings(sightings)
+                    written += len(lines)
+                    lines = []
+                    sightings = []
+    finally:
+        if len(lines) > 0:
+            output.write("".join(lines))
+            output.flush()
+            fix.logSightings(sightings)
+            written += len(lines)
+    return written
+
+
+# main function parses the command line and streams the reduced sightings to stdout.
+# Sighting documents are read from the files given, or from stdin when there are none or for "-".
+# The error count goes to stderr, and to the log after the sightings with --log. Returns the exit status.
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reduce sightings to JSON lines.")
+    parser.add_argument("sightingFiles", nargs="*", help="sighting files, - for stdin (default)")
+    parser.add_argument("--stars", default="stars.txt", help="star file")
+    parser.add_argument("--aries", default="aries.txt", help="aries file, or \"analytic\" to compute the GHA of Aries")
+    parser.add_argument("--ephemeris", default=None, help="compiled ephemeris, used in place of --stars and --aries")
+    parser.add_argument("--store", default=None, help="SQLite ephemeris store, used in place of --stars and --aries")
+    parser.add_argument("--log", default=None, help="log file (default: none)")
+    parser.add_argument("--batch", type=int, default=100, help="lines per flush")
+    parser.add_argument("--indexed", action="store_true", help="seek into the star and aries files for every lookup")
+    arguments = parser.parse_args(argv)
+
+    try:
+        fix = Fix.Fix(arguments.log)
+        if arguments.ephemeris is not None:
+            ephemeris = EphemerisBinary.BinaryEphemeris(arguments.ephemeris)
+            fix.starCatalog = EphemerisBinary.BinaryStarCatalog(ephemeris)
+            fix.ariesEphemeris = EphemerisBinary.BinaryAriesEphemeris(ephemeris)
+        elif arguments.store is not None:
+            store = EphemerisStore.EphemerisStore(arguments.store, readOnly=True)
+            fix.starCatalog = EphemerisStore.StoreStarCatalog(store)
+            fix.ariesEphemeris = EphemerisStore.StoreAriesEphemeris(store)
+        else:
+            fix.starCatalog = Ephemeris.cache.getStarCatalog(arguments.stars, partitioned=True,
+                                                             indexed=arguments.indexed)
+            if arguments.aries == "analytic":
+                fix.ariesEphemeris = SiderealTime.AnalyticAriesEphemeris()
+            else:
+                fix.ariesEphemeris = Ephemeris.cache.getAriesEphemeris(arguments.aries, partitioned=True,
+                                                                       indexed=arguments.indexed)
+    except ValueError as raisedException:
+        sys.stderr.write(str(raisedException) + "\n")
+        return 2
+
+    names = arguments.sightingFiles if len(arguments.sightingFiles) > 0 else ["-"]
+    status = 0
+    for name in names:
+        try:
+            if name == "-":
+                streamSightings(fix, [sys.stdin.buffer], sys.stdout, arguments.batch)
+            else:
+                with open(name, "rb") as sightingData:
+                    streamSightings(fix, [sightingData], sys.stdout, arguments.batch)
+        except Exception as e:
+            sys.stderr.write("FixCli.main:  Error reading sighting file " + name + "\n")
+            status = 1
+    fix.logger.log(" Sighting errors:" + "\t" + str(fix.err))
+    fix.logger.close()
+    sys.stderr.write("Sighting errors:\t" + str(fix.err) + "\n")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
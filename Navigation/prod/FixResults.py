@@ -0,0 +1,65 @@
+import PositionSolver as PositionSolver
+
+
+# formatPosition function receives a position in degrees, (latitude, longitude) or None.
+# Returns it as the (latitude, longitude) strings of the log, "0d0.0" for both when there is no fix.
+def formatPosition(position):
+    if position is None:
+        return ("0d0.0", "0d0.0")
+    return (PositionSolver.formatDegreesAndMinutes(position[0]), PositionSolver.formatDegreesAndMinutes(position[1]))
+
+
+class FixResults():
+    # Default constructor of FixResults Class.
+    # It holds the results of one Fix run (see Fix.getResults): the reduced sightings in chronological
+    # order, the error ledger and the approximate position in degrees, None when it could not be fixed.
+    # Iterating yields the ReducedSighting objects: adjustedAltitude, declination and ghaObservation
+    # are degrees, the log strings (altitude, latitude, longitude) are only formatted when read.
+    # The sightings can be iterated again until the results are closed.
+    def __init__(self, sightings, position, errors):
+        self.sightings = sightings
+        self.position = position
+        self.errors = errors
+
+    # latitude property is the approximate latitude in degrees north, or None.
+    @property
+    def latitude(self):
+        return None if self.position is None else self.position[0]
+
+    # longitude property is the approximate longitude in degrees east, or None.
+    @property
+    def longitude(self):
+        return None if self.position is None else self.position[1]
+
+    # approximateLatitude property is the approximate latitude as "XdY.Y", "0d0.0" when there is no fix.
+    @property
+    def approximateLatitude(self):
+        return formatPosition(self.position)[0]
+
+    # approximateLongitude property is the approximate longitude as "XdY.Y", "0d0.0" when there is no fix.
+    @property
+    def approximateLongitude(self):
+        return formatPosition(self.position)[1]
+
+    # err property is the number of sighting errors.
+    @property
+    def err(self):
+        return self.errors.count
+
+    def __iter__(self):
+        return iter(self.sightings)
+
+    def __len__(self):
+        return len(self.sightings)
+
+    # close method releases the sightings; with a sort budget it removes their run files.
+    def close(self):
+        if hasattr(self.sightings, "close"):
+            self.sightings.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+        return False
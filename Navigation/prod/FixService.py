@@ -0,0 +1,167 @@
+import argparse
+import asyncio
+import io
+import json
+import os
+import sys
+import threading
+
+import Ephemeris as Ephemeris
+import Fix as Fix
+import LogWriter as LogWriter
+import SightingReader as SightingReader
+
+# Longest request line read, in bytes; longer lines are answered with an error and skipped.
+LINE_LIMIT = 16 << 20
+
+
+class FixService():
+    # Default constructor of FixService Class.
+    # It receives the star and aries files, loads them into the process-wide ephemeris cache
+    # and keeps them resident. logFile is opened once, for as long as the service runs; the sightings
+    # and error count of every request are logged to it like a getSightings run.
+    # lineLimit is the longest request line read, in bytes.
+    def __init__(self, starFile, ariesFile, logFile="fixservice.log", lineLimit=LINE_LIMIT):
+        self.starFile = starFile
+        self.ariesFile = ariesFile
+        self.lineLimit = lineLimit
+        self.reader = SightingReader.SightingReader()
+        try:
+            self.logger = LogWriter.LogWriter(logFile)
+        except ValueError as raisedException:
+            raise (ValueError("FixService.__init__:  Log File could not be created or appended"))
+        self.logFile = os.path.abspath(logFile)
+        self.logger.log(" Log file:\t" + self.logFile)
+        self.lock = threading.Lock()
+        self.loadEphemeris()
+
+    # loadEphemeris method fetches the tables from the cache; they are only reparsed
+    # when the star or aries file changed on disk.
+    def loadEphemeris(self):
+        self.starCatalog = Ephemeris.cache.getStarCatalog(self.starFile)
+        self.ariesEphemeris = Ephemeris.cache.getAriesEphemeris(self.ariesFile)
+
+    # handleRequest method receives one decoded request:
+    #   {"id": <any>, "sightings": "<fix>...</fix>"}    a sighting document, or
+    #   {"id": <any>, "sightings": [{"body": ..., "date": ..., "time": ..., "observation": ...}, ...]}
+    # Returns the response with the reduced sightings in chronological order, the error count
+    # and the approximate position. Requests may be handled by several threads at once;
+    # the log lines of each are written together.
+    def handleRequest(self, request):
+        if not isinstance(request, dict):
+            raise (ValueError("FixService.handleRequest:  Request is not an object"))
+        sightings = request.get("sightings")
+        if isinstance(sightings, str):
+            records = self.reader.readSightings(io.BytesIO(sightings.encode("utf-8")))
+        elif isinstance(sightings, list) and all(isinstance(values, dict) for values in sightings):
+            records = [self.reader.normalize(values) for values in sightings]
+        else:
+            raise (ValueError("FixService.handleRequest:  Request has no sightings"))
+
+        self.loadEphemeris()
+        fix = Fix.Fix(None)
+        fix.logger = self.logger
+        fix.starCatalog = self.starCatalog
+        fix.ariesEphemeris = self.ariesEphemeris
+        try:
+            listSightings = fix.reduceSightings(records)
+            approximateLatitude, approximateLongitude = fix.fixPosition(listSightings)
+        except ValueError as raisedException:
+            raise
+        except Exception as e:
+            raise (ValueError("FixService.handleRequest:  Error reading sightings"))
+        with self.lock:
+            fix.logSightings(listSightings)
+            self.logger.log(" Sighting errors:" + "\t" + str(fix.err))
+            self.logger.flush()
+
+        return {"id": request.get("id"),
+                "sightings": [{"body": sighting.body, "date": sighting.dt, "time": sighting.tm,
+                               "altitude": sighting.altitude, "latitude": sighting.latitude,
+                               "longitude": sighting.longitude} for sighting in listSightings],
+                "errors": fix.err,
+                "approximateLatitude": approximateLatitude,
+                "approximateLongitude": approximateLongitude}
+
+    # readRequest method receives the stream of a connection and reads one request line.
+    # Returns the line, b"" at the end of the connection, or None for a line longer than lineLimit,
+    # which is read to its end and dropped.
+    async def readRequest(self, reader):
+        overrun = False
+        while True:
+            try:
+                line = await reader.readuntil(b"\n")
+            except asyncio.IncompleteReadError as raisedException:
+                line = raisedException.partial
+            except asyncio.LimitOverrunError as raisedException:
+                await reader.readexactly(raisedException.consumed)
+                overrun = True
+                continue
+            return None if overrun else line
+
+    # handleClient method serves one connection: one JSON request per line in, one JSON response per line out.
+    # Requests are handled in the default executor, so the event loop keeps serving other connections.
+    # Requests that cannot be handled, or are longer than lineLimit, get {"id": ..., "error": <message>}.
+    async def handleClient(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                line = await self.readRequest(reader)
+                if line == b"":
+                    break
+                request = None
+                try:
+                    if line is None:
+                        raise (ValueError("FixService.handleClient:  Request is longer than " +
+                                          str(self.lineLimit) + " bytes"))
+                    request = json.loads(line)
+                    response = await loop.run_in_executor(None, self.handleRequest, request)
+                except ValueError as raisedException:
+                    requestId = request.get("id") if isinstance(request, dict) else None
+                    response = {"id": requestId, "error": str(raisedException)}
+                writer.write((json.dumps(response) + "\n").encode("utf-8"))
+                await writer.drain()
+        finally:
+            writer.close()
+
+    # start method starts listening on a Unix socket when socketPath is given, otherwise on host:port.
+    # Returns the asyncio server.
+    async def start(self, host="127.0.0.1", port=8765, socketPath=None):
+        if socketPath is not None:
+            return await asyncio.start_unix_server(self.handleClient, path=socketPath, limit=self.lineLimit)
+        return await asyncio.start_server(self.handleClient, host, port, limit=self.lineLimit)
+
+    # serve method starts the service and runs it until cancelled.
+    async def serve(self, host="127.0.0.1", port=8765, socketPath=None):
+        server = await self.start(host, port, socketPath)
+        async with server:
+            await server.serve_forever()
+
+    # close method writes the rest of the log and closes it.
+    def close(self):
+        self.logger.close()
+
+
+# main function parses the command line and runs the service.
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve sight reductions over a local socket.")
+    parser.add_argument("--stars", default="stars.txt", help="star file")
+    parser.add_argument("--aries", default="aries.txt", help="aries file")
+    parser.add_argument("--log", default="fixservice.log", help="log file")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP host")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port")
+    parser.add_argument("--socket", default=None, help="Unix socket path, used in place of host and port")
+    parser.add_argument("--limit", type=int, default=LINE_LIMIT, help="longest request line, in bytes")
+    arguments = parser.parse_args(argv)
+
+    service = FixService(arguments.stars, arguments.aries, arguments.log, arguments.limit)
+    try:
+        asyncio.run(service.serve(arguments.host, arguments.port, arguments.socket))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,260 @@
+import argparse
+import ctypes
+import ctypes.util
+import fnmatch
+import json
+import os
+import select
+import struct
+import sys
+import time
+
+import BatchRunner as BatchRunner
+import Metrics as Metrics
+
+# inotify event masks (see inotify(7)) and the fixed part of an event: wd, mask, cookie, name length.
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+EVENT = struct.Struct("iIII")
+
+
+class InotifyWatcher():
+    # Default constructor of InotifyWatcher Class.
+    # It watches the received directory with Linux inotify, called through ctypes.
+    # Raises ValueError where inotify is not available.
+    def __init__(self, directory):
+        self.directory = directory
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError) as raisedException:
+            raise (ValueError("InotifyWatcher.__init__:  inotify is not available"))
+        if self.fd < 0:
+            raise (ValueError("InotifyWatcher.__init__:  inotify is not available"))
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory),
+                                  IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE) < 0:
+            os.close(self.fd)
+            raise (ValueError("InotifyWatcher.__init__:  Directory could not be watched"))
+
+    # wait method blocks up to timeout seconds for changes.
+    # Returns the names of the files changed, or None when events were lost and the directory must be rescanned.
+    def wait(self, timeout):
+        names = set()
+        if not select.select([self.fd], [], [], max(timeout, 0))[0]:
+            return names
+        try:
+            data = os.read(self.fd, 65536)
+        except BlockingIOError as raisedException:
+            return names
+        offset = 0
+        while offset + EVENT.size <= len(data):
+            wd, mask, cookie, length = EVENT.unpack_from(data, offset)
+            if mask & IN_Q_OVERFLOW:
+                return None
+            name = data[offset + EVENT.size:offset + EVENT.size + length].rstrip(b"\0")
+            if name:
+                names.add(os.fsdecode(name))
+            offset += EVENT.size + length
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher():
+    # Default constructor of PollingWatcher Class.
+    # It watches the received directory by listing it every interval seconds
+    # and comparing the size and modification time of every file.
+    def __init__(self, directory, interval=0.1):
+        self.directory = directory
+        self.interval = interval
+        self.versions = self.scan()
+
+    # scan method returns {name: (mtime, size)} for the files of the directory.
+    def scan(self):
+        versions = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file():
+                        status = entry.stat()
+                        versions[entry.name] = (status.st_mtime_ns, status.st_size)
+                except OSError as raisedException:
+                    continue
+        return versions
+
+    # wait method sleeps up to timeout seconds, at most one interval, and lists the directory.
+    # Returns the names of the files added or changed since the last listing.
+    def wait(self, timeout):
+        time.sleep(max(min(timeout, self.interval), 0))
+        versions = self.scan()
+        names = set(name for name, version in versions.items() if self.versions.get(name) != version)
+        self.versions = versions
+        return names
+
+    def close(self):
+        pass
+
+
+# openWatcher function returns an InotifyWatcher for the directory, or a PollingWatcher
+# when polling is True or inotify is not available.
+def openWatcher(directory, polling=False, interval=0.1):
+    if not polling:
+        try:
+            return InotifyWatcher(directory)
+        except ValueError as raisedException:
+            pass
+    return PollingWatcher(directory, interval)
+
+
+class DirectoryWatch():
+    # Default constructor of DirectoryWatch Class.
+    # It watches a spool directory for sighting files matching pattern and reduces every file
+    # added or changed with Fix, against the star and aries files, appending to logFile.
+    # Files are reduced incrementally, each with its own checkpoint "<file name>.checkpoint" in
+    # checkpointDirectory ("<log file>.checkpoints" by default), so the sightings appended to a file
+    # already reduced are the only ones logged; a file changed before its checkpoint is reduced in full.
+    # A file is reduced once it has had no writes for debounce seconds, so a file still being
+    # written is not read half way; a file that fails to parse is retried when it changes again.
+    # The ephemeris is indexed once here and stays warm in the process-wide cache.
+    # Files already in the directory are only reduced with existing=True.
+    # metrics, a Metrics.Metrics, is told about every file reduced.
+    def __init__(self, directory, starFile, ariesFile, logFile="log.txt", pattern="*.xml", debounce=0.2,
+                 polling=False, existing=False, metrics=None, checkpointDirectory=None):
+        if not os.path.isdir(directory):
+            raise (ValueError("DirectoryWatch.__init__:  Directory could not be opened"))
+        self.directory = os.path.abspath(directory)
+        self.starFile = starFile
+        self.ariesFile = ariesFile
+        self.logFile = logFile
+        self.checkpointDirectory = checkpointDirectory if checkpointDirectory is not None else logFile + ".checkpoints"
+        try:
+            os.makedirs(self.checkpointDirectory, exist_ok=True)
+        except OSError as raisedException:
+            raise (ValueError("DirectoryWatch.__init__:  Checkpoint directory could not be created"))
+        self.pattern = pattern
+        self.debounce = debounce
+        self.metrics = metrics
+        BatchRunner.loadEphemeris(starFile, ariesFile)
+        self.watcher = openWatcher(self.directory, polling)
+        self.pending = {}
+        self.reduced = {}
+        if existing:
+            self.rescan()
+        else:
+            for name in os.listdir(self.directory):
+                self.reduced[name] = self.getVersion(name)
+
+    # getVersion method returns (mtime, size) of a file of the directory, or None when it is gone.
+    def getVersion(self, name):
+        try:
+            status = os.stat(os.path.join(self.directory, name))
+        except OSError as raisedException:
+            return None
+        return (status.st_mtime_ns, status.st_size)
+
+    # rescan method marks every matching file of the directory as changed.
+    def rescan(self):
+        now = time.monotonic()
+        for name in os.listdir(self.directory):
+            if fnmatch.fnmatch(name, self.pattern):
+                self.pending[name] = now
+
+    # step method waits up to timeout seconds for changes and reduces the files that have settled.
+    # Returns the BatchRunner.reduceFile summaries of the files reduced, each with "latency",
+    # the seconds from the last write seen to the logged result.
+    def step(self, timeout=1.0):
+        if self.pending:
+            timeout = min(timeout, max(min(self.pending.values()) + self.debounce - time.monotonic(), 0))
+        names = self.watcher.wait(timeout)
+        now = time.monotonic()
+        if names is None:
+            self.rescan()
+        else:
+            for name in names:
+                if fnmatch.fnmatch(name, self.pattern):
+                    self.pending[name] = now
+
+        results = []
+        for name, changed in sorted(self.pending.items()):
+            if now - changed < self.debounce:
+                continue
+            del self.pending[name]
+            version = self.getVersion(name)
+            if version is None or version == self.reduced.get(name):
+                continue
+            result = self.reduceFile(name)
+            result["latency"] = time.monotonic() - changed
+            if result["failure"] is None:
+                self.reduced[name] = version
+            results.append(result)
+        return results
+
+    # reduceFile method reduces one sighting file of the directory against its checkpoint and returns its summary.
+    def reduceFile(self, name):
+        return BatchRunner.reduceFile((os.path.join(self.directory, name), self.starFile, self.ariesFile, self.logFile),
+                                      self.metrics, os.path.join(self.checkpointDirectory, name + ".checkpoint"))
+
+    # run method reduces files as they settle until stopped with KeyboardInterrupt or,
+    # when given, until stop() returns True; every summary is passed to report.
+    def run(self, report=None, stop=None):
+        try:
+            while stop is None or not stop():
+                for result in self.step():
+                    if report is not None:
+                        report(result)
+        except KeyboardInterrupt:
+            pass
+
+    def close(self):
+        self.watcher.close()
+
+
+# main function parses the command line and watches the directory, writing one JSON summary
+# per reduced file to stdout.
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reduce sighting files as they are dropped into a directory.")
+    parser.add_argument("directory", help="spool directory")
+    parser.add_argument("--stars", default="stars.txt", help="star file")
+    parser.add_argument("--aries", default="aries.txt", help="aries file")
+    parser.add_argument("--log", default="log.txt", help="log file")
+    parser.add_argument("--pattern", default="*.xml", help="sighting file names")
+    parser.add_argument("--debounce", type=float, default=0.2, help="seconds without writes before a file is reduced")
+    parser.add_argument("--polling", action="store_true", help="poll the directory instead of using inotify")
+    parser.add_argument("--existing", action="store_true", help="also reduce the files already in the directory")
+    parser.add_argument("--checkpoints", default=None, help="checkpoint directory (default: <log file>.checkpoints)")
+    parser.add_argument("--metrics", default=None,
+                        help="metrics file, Prometheus text format or a JSON snapshot for a .json name")
+    parser.add_argument("--metrics-interval", type=float, default=None,
+                        help="seconds between metrics exports (default: after every file)")
+    arguments = parser.parse_args(argv)
+
+    metrics = None
+    if arguments.metrics is not None:
+        metrics = Metrics.Metrics(arguments.metrics, arguments.metrics_interval)
+    try:
+        watch = DirectoryWatch(arguments.directory, arguments.stars, arguments.aries, arguments.log, arguments.pattern,
+                               arguments.debounce, arguments.polling, arguments.existing, metrics,
+                               arguments.checkpoints)
+    except ValueError as raisedException:
+        sys.stderr.write(str(raisedException) + "\n")
+        return 2
+
+    def report(result):
+        sys.stdout.write(json.dumps(result) + "\n")
+        sys.stdout.flush()
+
+    try:
+        watch.run(report)
+    finally:
+        watch.close()
+        if metrics is not None:
+            metrics.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
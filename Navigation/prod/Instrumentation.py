@@ -0,0 +1,127 @@
+from contextlib import contextmanager
+import time
+import tracemalloc
+
+
+class Stats():
+    # Default constructor of Stats Class.
+    # It collects, per stage name, the time spent, the number of calls and, with memory=True,
+    # the peak in bytes: the most memory traced by tracemalloc above what was in use when the stage started.
+    # callback, when given, is called as callback(name, seconds, peak) every time a stage ends;
+    # peak is None without memory.
+    def __init__(self, memory=False, callback=None):
+        self.memory = memory
+        self.callback = callback
+        self.timers = {}
+        self.calls = {}
+        self.counters = {}
+        self.peaks = {}
+        # [memory in use at the start, highest memory seen] of each open stage, innermost last.
+        self.open = []
+        # True while tracemalloc runs because this object started it.
+        self.tracing = False
+
+    # start method is called when a stage starts.
+    # Returns the start time; with memory it starts tracemalloc when needed, hands the peak so far
+    # to the enclosing stage and resets the peak for this stage.
+    def start(self):
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.tracing = True
+            current, peak = tracemalloc.get_traced_memory()
+            if len(self.open) > 0:
+                self.open[-1][1] = max(self.open[-1][1], peak)
+            tracemalloc.reset_peak()
+            self.open.append([current, current])
+        return time.perf_counter()
+
+    # stop method is called when the stage name that started at started ends.
+    def stop(self, name, started):
+        seconds = time.perf_counter() - started
+        self.timers[name] = self.timers.get(name, 0.0) + seconds
+        self.calls[name] = self.calls.get(name, 0) + 1
+        peak = None
+        if self.memory:
+            start, seen = self.open.pop()
+            highest = max(seen, tracemalloc.get_traced_memory()[1])
+            peak = highest - start
+            self.peaks[name] = max(self.peaks.get(name, 0), peak)
+            if len(self.open) > 0:
+                self.open[-1][1] = max(self.open[-1][1], highest)
+            elif self.tracing:
+                tracemalloc.stop()
+                self.tracing = False
+        if self.callback is not None:
+            self.callback(name, seconds, peak)
+
+    # stage method times the body of a with statement as the stage name.
+    @contextmanager
+    def stage(self, name):
+        started = self.start()
+        try:
+            yield self
+        finally:
+            self.stop(name, started)
+
+    # iterate method receives an iterable and yields its items, timing every step as the stage name.
+    # It is used for lazy sources such as SightingReader, whose parsing happens inside next().
+    def iterate(self, name, iterable):
+        iterator = iter(iterable)
+        while True:
+            started = self.start()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.stop(name, started)
+                return
+            except BaseException:
+                self.stop(name, started)
+                raise
+            self.stop(name, started)
+            yield item
+
+    # wrap method receives a function and returns it timed as the stage name.
+    def wrap(self, name, function):
+        def timed(*args, **kwargs):
+            started = self.start()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.stop(name, started)
+        return timed
+
+    # count method adds amount to the counter name.
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    # report method returns every stage and counter as a dictionary:
+    #   {"stages": {name: {"seconds", "calls", "peakMemory"}}, "counters": {name: value}}
+    def report(self):
+        return {"stages": {name: {"seconds": self.timers[name], "calls": self.calls[name],
+                                  "peakMemory": self.peaks.get(name)} for name in self.timers},
+                "counters": dict(self.counters)}
+
+    # clear method forgets everything collected so far.
+    def clear(self):
+        self.timers.clear()
+        self.calls.clear()
+        self.counters.clear()
+        self.peaks.clear()
+
+
+class TimedTable():
+    # Default constructor of TimedTable Class.
+    # It stands in for a star catalog or aries ephemeris and times its lookup methods
+    # as the stage name; every other attribute is read from the table itself.
+    def __init__(self, table, stats, name, methods=("get", "getGHA")):
+        self.table = table
+        for method in methods:
+            if hasattr(table, method):
+                setattr(self, method, stats.wrap(name, getattr(table, method)))
+
+    def __getattr__(self, name):
+        return getattr(self.table, name)
+
+    def __len__(self):
+        return len(self.table)
@@ -0,0 +1,119 @@
+from datetime import datetime, timezone
+import queue
+import threading
+import time
+
+
+# writeChunks function is the body of the background writer thread.
+# It writes every chunk received on the queue until it receives None.
+def writeChunks(chunks, logFile):
+    while True:
+        chunk = chunks.get()
+        try:
+            if chunk is None:
+                return
+            logFile.write(chunk)
+        finally:
+            chunks.task_done()
+
+
+class LogWriter():
+    # Default constructor of LogWriter Class.
+    # It opens the received log file for appending.
+    # Lines are collected in memory and written bufferSize characters at a time,
+    # by a background thread when background is True.
+    def __init__(self, logFile, bufferSize=65536, background=False):
+        try:
+            self.logFile = open(logFile, "a")
+        except Exception as e:
+            raise (ValueError("LogWriter.__init__:  Log file could not be opened"))
+        self.bufferSize = bufferSize
+        self.lines = []
+        self.size = 0
+        self.second = None
+        self.prefix = None
+        self.closed = False
+        self.chunks = None
+        self.writer = None
+        if background:
+            self.chunks = queue.Queue()
+            self.writer = threading.Thread(target=writeChunks, args=(self.chunks, self.logFile), daemon=True)
+            self.writer.start()
+
+    # getPrefix method returns "LOG: " followed by the local time to the second.
+    # The formatted string is cached and only rebuilt when the second changes.
+    def getPrefix(self):
+        second = int(time.time())
+        if second != self.second:
+            dateLocal = datetime.fromtimestamp(second, tz=timezone.utc).astimezone()
+            self.prefix = "LOG: " + dateLocal.isoformat(' ')
+            self.second = second
+        return self.prefix
+
+    # log method receives the text that follows the timestamp, e.g. " Log file:\t<path>".
+    # It appends one timestamped line to the buffer.
+    def log(self, message):
+        self.write(self.getPrefix() + message + "\n")
+
+    # write method appends raw text to the buffer and hands the buffer off once it is full.
+    def write(self, text):
+        self.lines.append(text)
+        self.size += len(text)
+        if self.size >= self.bufferSize:
+            self.flushBuffer()
+
+    # flushBuffer method hands the collected lines to the file or to the writer thread.
+    def flushBuffer(self):
+        if len(self.lines) < 1:
+            return
+        chunk = "".join(self.lines)
+        self.lines = []
+        self.size = 0
+        if self.chunks is not None:
+            self.chunks.put(chunk)
+        else:
+            self.logFile.write(chunk)
+
+    # flush method writes everything logged so far through to the file.
+    def flush(self):
+        self.flushBuffer()
+        if self.chunks is not None:
+            self.chunks.join()
+        self.logFile.flush()
+
+    # close method flushes the buffer, stops the writer thread and closes the file.
+    def close(self):
+        if self.closed:
+            return
+        self.flush()
+        if self.writer is not None:
+            self.chunks.put(None)
+            self.writer.join()
+        self.logFile.close()
+        self.closed = True
+
+    # __del__ method makes sure buffered lines reach the file when the writer is discarded unclosed.
+    def __del__(self):
+        try:
+            self.close()
+        except Exception as e:
+            pass
+
+
+class NullLogWriter():
+    # Default constructor of NullLogWriter Class.
+    # It takes the place of a LogWriter when no log is written; every line is dropped.
+    def __init__(self):
+        self.closed = False
+
+    def log(self, message):
+        pass
+
+    def write(self, text):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
@@ -0,0 +1,219 @@
+from bisect import bisect_left
+import json
+import os
+import threading
+import time
+
+import Ephemeris as Ephemeris
+import EphemerisIndex as EphemerisIndex
+import ErrorLedger as ErrorLedger
+import Instrumentation as Instrumentation
+
+# Upper bounds, in seconds, of the stage latency histogram buckets; a last bucket holds everything slower.
+BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+
+# formatNumber function returns a value the way the Prometheus text format writes it.
+def formatNumber(value):
+    if isinstance(value, float):
+        if value == float("inf"):
+            return "+Inf"
+        return repr(value)
+    return str(value)
+
+
+class Histogram():
+    # Default constructor of Histogram Class.
+    # It counts observations per BUCKETS bucket, not cumulated, with their sum.
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    # observe method receives seconds and counts them in the first bucket whose bound is not below them.
+    def observe(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    # getBuckets method returns [(upper bound, observations up to it)], cumulated, ending with +inf.
+    def getBuckets(self):
+        buckets = []
+        total = 0
+        for bound, count in zip(BUCKETS + (float("inf"),), self.counts):
+            total += count
+            buckets.append((bound, total))
+        return buckets
+
+
+class Metrics():
+    # Default constructor of Metrics Class.
+    # It collects the metrics of Fix runs, for Fix(metrics=...): runs completed and failed,
+    # sightings processed and rejected per ErrorLedger code, a latency histogram per stage,
+    # hits and misses of the ephemeris cache (and of the reduction cache, when used) and bytes read
+    # from sighting files and ephemeris text files. Binary and SQLite ephemerides are not counted as bytes read.
+    # With exportFile the metrics are written to it, in the Prometheus text exposition format or, for a
+    # file name ending in ".json", as a JSON snapshot: after every run, or every interval seconds
+    # from a background thread when interval is given. The file is replaced whole, so a scraper
+    # never reads it half written.
+    # Collecting stage latencies times every sighting (see Instrumentation.Stats), which slows reduction down.
+    def __init__(self, exportFile=None, interval=None):
+        self.exportFile = exportFile
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.stats = Instrumentation.Stats(callback=self.observe)
+        self.histograms = {}
+        self.runs = 0
+        self.failures = 0
+        self.sightings = 0
+        self.rejections = dict.fromkeys(ErrorLedger.ErrorLedger.CODES, 0)
+        self.ephemerisCache = {"hits": 0, "misses": 0}
+        self.reductionCache = {"hits": 0, "misses": 0}
+        self.bytesRead = {"sightings": 0, "ephemeris": 0}
+        self.lastRun = None
+        self.starts = {}
+        self.stopped = threading.Event()
+        self.exporter = None
+        if exportFile is not None and interval is not None:
+            self.exporter = threading.Thread(target=self.exportEvery, daemon=True)
+            self.exporter.start()
+
+    # observe method is the Stats callback; it counts the seconds of one stage in its histogram.
+    def observe(self, name, seconds, peak):
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    # getCounts method returns the running totals of a Fix that runs are measured against.
+    def getCounts(self, fix):
+        cache = fix.reductionCache
+        return {"rejections": fix.errors.getCounts(),
+                "ephemerisCache": {"hits": Ephemeris.cache.hits, "misses": Ephemeris.cache.misses},
+                "reductionCache": {"hits": cache.hits if cache is not None else 0,
+                                   "misses": cache.misses if cache is not None else 0},
+                "ephemeris": EphemerisIndex.bytesRead}
+
+    # startRun method is called by Fix when a run starts.
+    def startRun(self, fix):
+        with self.lock:
+            self.starts[id(fix)] = self.getCounts(fix)
+
+    # endRun method is called by Fix when a run ends with the number of sightings it reduced; it adds
+    # what the run did to the totals and exports the metrics when there is an export file and no interval.
+    # failed is True when the run raised.
+    def endRun(self, fix, reduced=0, failed=False):
+        with self.lock:
+            start = self.starts.pop(id(fix), None)
+            if start is None:
+                return
+            end = self.getCounts(fix)
+            rejected = 0
+            for code, count in end["rejections"].items():
+                self.rejections[code] += count - start["rejections"][code]
+                rejected += count - start["rejections"][code]
+            self.sightings += reduced + rejected
+            for name in ("hits", "misses"):
+                self.ephemerisCache[name] += end["ephemerisCache"][name] - start["ephemerisCache"][name]
+                self.reductionCache[name] += end["reductionCache"][name] - start["reductionCache"][name]
+            self.bytesRead["ephemeris"] += end["ephemeris"] - start["ephemeris"]
+            try:
+                self.bytesRead["sightings"] += os.path.getsize(fix.sightingFile)
+            except OSError as raisedException:
+                pass
+            if failed:
+                self.failures += 1
+            else:
+                self.runs += 1
+            self.lastRun = time.time()
+        if self.exportFile is not None and self.interval is None:
+            self.export()
+
+    # getSnapshot method returns every metric as a dictionary, the JSON snapshot:
+    #   {"timestamp", "lastRun", "runs", "failures", "sightings", "rejections": {code: count},
+    #    "stages": {name: {"buckets": [[bound, cumulated count]], "sum", "count"}},
+    #    "ephemerisCache": {"hits", "misses"}, "reductionCache": {"hits", "misses"},
+    #    "bytesRead": {"sightings", "ephemeris"}}
+    # The last bucket bound is null, standing for +Inf.
+    def getSnapshot(self):
+        with self.lock:
+            return {"timestamp": time.time(), "lastRun": self.lastRun, "runs": self.runs, "failures": self.failures,
+                    "sightings": self.sightings, "rejections": dict(self.rejections),
+                    "stages": {name: {"buckets": [[None if bound == float("inf") else bound, count]
+                                                  for bound, count in histogram.getBuckets()],
+                                      "sum": histogram.sum, "count": histogram.count}
+                               for name, histogram in sorted(self.histograms.items())},
+                    "ephemerisCache": dict(self.ephemerisCache), "reductionCache": dict(self.reductionCache),
+                    "bytesRead": dict(self.bytesRead)}
+
+    # getPrometheus method returns every metric in the Prometheus text exposition format.
+    def getPrometheus(self):
+        snapshot = self.getSnapshot()
+        lines = []
+
+        def add(name, kind, description, samples):
+            lines.append("# HELP " + name + " " + description)
+            lines.append("# TYPE " + name + " " + kind)
+            for suffix, labels, value in samples:
+                labelText = ",".join(key + "=\"" + str(label) + "\"" for key, label in labels)
+                lines.append(name + suffix + ("{" + labelText + "}" if labelText else "") + " " + formatNumber(value))
+
+        add("fix_runs_total", "counter", "Fix runs completed.", [("", (), snapshot["runs"])])
+        add("fix_runs_failed_total", "counter", "Fix runs that raised.", [("", (), snapshot["failures"])])
+        add("fix_sightings_processed_total", "counter", "Sightings read, rejected ones included.",
+            [("", (), snapshot["sightings"])])
+        add("fix_sightings_rejected_total", "counter", "Sightings rejected, per reason.",
+            [("", (("reason", code),), count) for code, count in snapshot["rejections"].items()])
+        samples = []
+        for name, histogram in snapshot["stages"].items():
+            for bound, count in histogram["buckets"]:
+                samples.append(("_bucket", (("stage", name), ("le", formatNumber(float("inf") if bound is None
+                                                                                  else bound))), count))
+            samples.append(("_sum", (("stage", name),), histogram["sum"]))
+            samples.append(("_count", (("stage", name),), histogram["count"]))
+        add("fix_stage_latency_seconds", "histogram", "Latency of every call of a Fix stage.", samples)
+        for cache in ("ephemerisCache", "reductionCache"):
+            prefix = "fix_ephemeris_cache_" if cache == "ephemerisCache" else "fix_reduction_cache_"
+            for name in ("hits", "misses"):
+                add(prefix + name + "_total", "counter", "Lookups of the " + cache[0:-5] + " cache: " + name + ".",
+                    [("", (), snapshot[cache][name])])
+        add("fix_bytes_read_total", "counter", "Bytes read, per source.",
+            [("", (("source", source),), count) for source, count in snapshot["bytesRead"].items()])
+        if snapshot["lastRun"] is not None:
+            add("fix_last_run_timestamp_seconds", "gauge", "End of the last Fix run, in seconds since 1970.",
+                [("", (), snapshot["lastRun"])])
+        return "\n".join(lines) + "\n"
+
+    # export method writes the metrics to exportFile, or to the received file, through a temporary file.
+    # Raises ValueError when the file cannot be written.
+    def export(self, exportFile=None):
+        exportFile = exportFile if exportFile is not None else self.exportFile
+        if exportFile.endswith(".json"):
+            text = json.dumps(self.getSnapshot())
+        else:
+            text = self.getPrometheus()
+        temporaryFile = exportFile + ".tmp"
+        try:
+            with open(temporaryFile, "w") as exportData:
+                exportData.write(text)
+            os.replace(temporaryFile, exportFile)
+        except OSError as raisedException:
+            raise (ValueError("Metrics.export:  Metrics file could not be written"))
+
+    # exportEvery method is the body of the exporter thread; failed exports are retried at the next interval.
+    def exportEvery(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self.export()
+            except ValueError as raisedException:
+                continue
+
+    # close method stops the exporter thread, if any, and writes the metrics a last time.
+    def close(self):
+        if self.exporter is not None:
+            self.stopped.set()
+            self.exporter.join()
+            self.exporter = None
+        if self.exportFile is not None:
+            self.export()
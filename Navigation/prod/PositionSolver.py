@@ -0,0 +1,168 @@
+from math import asin, atan2, cos, degrees, radians, sin
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Default convergence tolerance in degrees (about 0.004 nautical miles) and iteration cap.
+TOLERANCE = 1e-4
+MAX_ITERATIONS = 20
+
+
+# formatDegreesAndMinutes function receives signed degrees.
+# Returns them as "XdY.Y" with the sign in front, e.g. -16.7417 is "-16d44.5".
+def formatDegreesAndMinutes(value):
+    sign = "-" if value < 0 else ""
+    minutes = round(abs(value) * 60, 1)
+    whole = int(minutes // 60)
+    return sign + str(whole) + "d" + str(round(minutes - whole * 60, 1))
+
+
+# estimatePosition function receives the declinations, GHAs and observed altitudes of a sighting set.
+# Returns a starting (latitude, longitude): the mean of the geographic positions of the bodies,
+# weighted towards the higher bodies, whose positions are closest to the observer.
+def estimatePosition(declinations, ghas, altitudes):
+    x = y = z = 0.0
+    for declination, gha, altitude in zip(declinations, ghas, altitudes):
+        weight = max(sin(radians(altitude)), 0.01)
+        x += weight * cos(radians(declination)) * cos(radians(-gha))
+        y += weight * cos(radians(declination)) * sin(radians(-gha))
+        z += weight * sin(radians(declination))
+    return (degrees(atan2(z, (x * x + y * y) ** 0.5)), degrees(atan2(y, x)))
+
+
+# wrapLongitude function receives a longitude in degrees and returns it in [-180, 180).
+def wrapLongitude(longitude):
+    return (longitude + 180) % 360 - 180
+
+
+# solvePosition function receives the declination, GHA and observed (adjusted) altitude of each sighting,
+# in degrees, and an optional assumed position (latitude north, longitude east).
+# Each iteration computes the intercept Ho - Hc and azimuth Z of every sighting from the assumed position
+# and moves it by the least-squares solution of  cos(Z) dLat + sin(Z) cos(lat) dLon = Ho - Hc.
+# Returns (latitude, longitude) once a step is below tolerance, or None when there are fewer than two
+# sightings, the lines of position are parallel or the iteration cap is reached.
+def solvePosition(declinations, ghas, altitudes, latitude=None, longitude=None,
+                  tolerance=TOLERANCE, maxIterations=MAX_ITERATIONS):
+    if len(declinations) < 2:
+        return None
+    if latitude is None or longitude is None:
+        latitude, longitude = estimatePosition(declinations, ghas, altitudes)
+
+    for iteration in range(maxIterations):
+        phi = radians(latitude)
+        a11 = a12 = a22 = b1 = b2 = 0.0
+        for declination, gha, altitude in zip(declinations, ghas, altitudes):
+            delta = radians(declination)
+            lha = radians(gha + longitude)
+            sinHc = sin(phi) * sin(delta) + cos(phi) * cos(delta) * cos(lha)
+            intercept = altitude - degrees(asin(max(-1.0, min(1.0, sinHc))))
+            azimuth = atan2(-cos(delta) * sin(lha), sin(delta) * cos(phi) - cos(delta) * sin(phi) * cos(lha))
+            u = cos(azimuth)
+            v = sin(azimuth) * cos(phi)
+            a11 += u * u
+            a12 += u * v
+            a22 += v * v
+            b1 += u * intercept
+            b2 += v * intercept
+
+        determinant = a11 * a22 - a12 * a12
+        if abs(determinant) < 1e-12:
+            return None
+        stepLatitude = (a22 * b1 - a12 * b2) / determinant
+        stepLongitude = (a11 * b2 - a12 * b1) / determinant
+        latitude = max(-90.0, min(90.0, latitude + stepLatitude))
+        longitude = wrapLongitude(longitude + stepLongitude)
+        if abs(stepLatitude) < tolerance and abs(stepLongitude * cos(phi)) < tolerance:
+            return (latitude, longitude)
+    return None
+
+
+# solvePositions function solves many sighting sets at once.
+# It receives flat columns of declinations, GHAs and altitudes plus, for every sighting, the index
+# of its set (0 .. sets - 1), and optionally an assumed position per set (latitudes and longitudes).
+# Returns (latitudes, longitudes, converged) with one entry per set;
+# entries of sets that did not converge are NaN.
+# With NumPy every iteration is a handful of array operations over all sightings of all sets.
+def solvePositions(declinations, ghas, altitudes, setIndexes, tolerance=TOLERANCE, maxIterations=MAX_ITERATIONS,
+                   latitudes=None, longitudes=None):
+    if numpy is None:
+        return solvePositionsScalar(declinations, ghas, altitudes, setIndexes, tolerance, maxIterations,
+                                    latitudes, longitudes)
+
+    delta = numpy.radians(numpy.asarray(declinations, dtype=numpy.float64))
+    gha = numpy.asarray(ghas, dtype=numpy.float64)
+    altitude = numpy.asarray(altitudes, dtype=numpy.float64)
+    setIndex = numpy.asarray(setIndexes, dtype=numpy.int64)
+    sets = int(setIndex.max()) + 1 if len(setIndex) else 0
+
+    if latitudes is not None and longitudes is not None:
+        latitude = numpy.array(latitudes, dtype=numpy.float64)
+        longitude = numpy.array(longitudes, dtype=numpy.float64)
+    else:
+        weight = numpy.maximum(numpy.sin(numpy.radians(altitude)), 0.01)
+        x = numpy.bincount(setIndex, weight * numpy.cos(delta) * numpy.cos(numpy.radians(-gha)), sets)
+        y = numpy.bincount(setIndex, weight * numpy.cos(delta) * numpy.sin(numpy.radians(-gha)), sets)
+        z = numpy.bincount(setIndex, weight * numpy.sin(delta), sets)
+        latitude = numpy.degrees(numpy.arctan2(z, numpy.hypot(x, y)))
+        longitude = numpy.degrees(numpy.arctan2(y, x))
+
+    counts = numpy.bincount(setIndex, minlength=sets)
+    converged = numpy.zeros(sets, dtype=bool)
+    active = counts >= 2
+    for iteration in range(maxIterations):
+        if not active.any():
+            break
+        phi = numpy.radians(latitude)[setIndex]
+        lha = numpy.radians(gha + longitude[setIndex])
+        sinHc = numpy.sin(phi) * numpy.sin(delta) + numpy.cos(phi) * numpy.cos(delta) * numpy.cos(lha)
+        intercept = altitude - numpy.degrees(numpy.arcsin(numpy.clip(sinHc, -1.0, 1.0)))
+        azimuth = numpy.arctan2(-numpy.cos(delta) * numpy.sin(lha),
+                                numpy.sin(delta) * numpy.cos(phi) - numpy.cos(delta) * numpy.sin(phi) * numpy.cos(lha))
+        u = numpy.cos(azimuth)
+        v = numpy.sin(azimuth) * numpy.cos(phi)
+        a11 = numpy.bincount(setIndex, u * u, sets)
+        a12 = numpy.bincount(setIndex, u * v, sets)
+        a22 = numpy.bincount(setIndex, v * v, sets)
+        b1 = numpy.bincount(setIndex, u * intercept, sets)
+        b2 = numpy.bincount(setIndex, v * intercept, sets)
+
+        determinant = a11 * a22 - a12 * a12
+        active &= numpy.abs(determinant) >= 1e-12
+        safe = numpy.where(active, determinant, 1.0)
+        stepLatitude = numpy.where(active, (a22 * b1 - a12 * b2) / safe, 0.0)
+        stepLongitude = numpy.where(active, (a11 * b2 - a12 * b1) / safe, 0.0)
+        done = active & (numpy.abs(stepLatitude) < tolerance) & \
+            (numpy.abs(stepLongitude * numpy.cos(numpy.radians(latitude))) < tolerance)
+        latitude = numpy.clip(latitude + stepLatitude, -90.0, 90.0)
+        longitude = (longitude + stepLongitude + 180) % 360 - 180
+        converged |= done
+        active &= ~done
+
+    latitude = numpy.where(converged, latitude, numpy.nan)
+    longitude = numpy.where(converged, longitude, numpy.nan)
+    return (latitude, longitude, converged)
+
+
+# solvePositionsScalar function is the pure Python fallback of solvePositions used without NumPy.
+def solvePositionsScalar(declinations, ghas, altitudes, setIndexes, tolerance, maxIterations,
+                         latitudes=None, longitudes=None):
+    sets = (max(setIndexes) + 1) if len(setIndexes) else 0
+    columns = [([], [], []) for index in range(sets)]
+    for declination, gha, altitude, setIndex in zip(declinations, ghas, altitudes, setIndexes):
+        columns[setIndex][0].append(declination)
+        columns[setIndex][1].append(gha)
+        columns[setIndex][2].append(altitude)
+
+    starts = zip(latitudes, longitudes) if latitudes is not None and longitudes is not None else [(None, None)] * sets
+    solvedLatitudes = []
+    solvedLongitudes = []
+    converged = []
+    for column, (latitude, longitude) in zip(columns, starts):
+        position = solvePosition(column[0], column[1], column[2], latitude, longitude,
+                                 tolerance=tolerance, maxIterations=maxIterations)
+        converged.append(position is not None)
+        solvedLatitudes.append(position[0] if position is not None else float("nan"))
+        solvedLongitudes.append(position[1] if position is not None else float("nan"))
+    return (solvedLatitudes, solvedLongitudes, converged)
@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta
+import math
+from operator import attrgetter
+import sys
+
+# Start of the timestamps, 1970-01-01 00:00 UTC, and its day number.
+EPOCH = datetime(1970, 1, 1)
+EPOCH_ORDINAL = EPOCH.toordinal()
+
+# Sort key of reduced sightings: by time, sightings taken at the same time by body.
+sortKey = attrgetter("key")
+
+
+# Dates already formatted, by day since 1970; a log holds few days, so this stays small.
+dates = {}
+
+
+# formatAngle function receives degrees and returns them the way Angle.setDegrees and Angle.getString do,
+# e.g. "239d13.1", without building an Angle.
+def formatAngle(degrees):
+    minutes, whole = math.modf(float(degrees))
+    return str(int(whole) % 360) + "d" + "%.1f" % (60 * minutes)
+
+
+# formatDate function receives a day since 1970 and returns it as "yyyy-mm-dd", formatted once per day.
+def formatDate(day):
+    date = dates.get(day)
+    if date is None:
+        date = dates[day] = (EPOCH + timedelta(days=day)).date().isoformat()
+    return date
+
+
+# formatTime function receives whole seconds since 1970 and returns the time of day as "hh:mm:ss".
+def formatTime(timestamp):
+    return "%02d:%02d:%02d" % (timestamp // 3600 % 24, timestamp // 60 % 60, timestamp % 60)
+
+
+class ReducedSighting():
+    # One reduced sighting: interned body name, whole seconds since 1970 UTC and the numeric results.
+    # declinationString is the declination as listed in the star file, shared with the star catalog.
+    # The strings written to the log are computed when read.
+    __slots__ = ("key", "body", "timestamp", "adjustedAltitude", "declination", "ghaObservation",
+                 "declinationString")
+
+    # Names that can also be read with sighting[name], as from the dictionaries used before.
+    FIELDS = ("body", "datetime", "dt", "tm", "altitude", "latitude", "longitude",
+              "adjustedAltitude", "declination", "ghaObservation")
+
+    # Default constructor of ReducedSighting Class.
+    # The sort key (timestamp, body) is computed once here.
+    def __init__(self, body, timestamp, adjustedAltitude, declination, ghaObservation, declinationString):
+        self.body = sys.intern(body)
+        self.timestamp = timestamp
+        self.key = (timestamp, self.body)
+        self.adjustedAltitude = adjustedAltitude
+        self.declination = declination
+        self.ghaObservation = ghaObservation
+        self.declinationString = declinationString
+
+    # datetime property is the time of the sighting as a naive UTC datetime.
+    @property
+    def datetime(self):
+        return EPOCH + timedelta(seconds=self.timestamp)
+
+    # dt property is the date of the sighting as "yyyy-mm-dd".
+    @property
+    def dt(self):
+        return formatDate(self.timestamp // 86400)
+
+    # tm property is the time of the sighting as "hh:mm:ss".
+    @property
+    def tm(self):
+        return formatTime(self.timestamp)
+
+    # altitude property is the adjusted altitude as "XdY.Y".
+    @property
+    def altitude(self):
+        return formatAngle(self.adjustedAltitude)
+
+    # latitude property is the declination of the body as listed in the star file.
+    @property
+    def latitude(self):
+        return self.declinationString
+
+    # longitude property is the GHA of the observation as "XdY.Y".
+    @property
+    def longitude(self):
+        return formatAngle(self.ghaObservation)
+
+    def __getitem__(self, name):
+        if name not in self.FIELDS:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def __eq__(self, other):
+        if not isinstance(other, ReducedSighting):
+            return NotImplemented
+        return self.getState() == other.getState()
+
+    def __repr__(self):
+        return "ReducedSighting(" + ", ".join(repr(value) for value in self.getState()) + ")"
+
+    # asDict method returns the sighting as a dictionary, e.g. to write it as JSON: the log strings
+    # (date, time, altitude, latitude, longitude) and the numeric degrees.
+    def asDict(self):
+        return {"body": self.body, "date": self.dt, "time": self.tm, "altitude": self.altitude,
+                "latitude": self.latitude, "longitude": self.longitude, "adjustedAltitude": self.adjustedAltitude,
+                "declination": self.declination, "ghaObservation": self.ghaObservation}
+
+    # getState method returns the constructor arguments as a list, e.g. to store them as JSON.
+    def getState(self):
+        return [self.body, self.timestamp, self.adjustedAltitude, self.declination, self.ghaObservation,
+                self.declinationString]
+
+    # fromState method receives a list returned by getState and returns the sighting.
+    @staticmethod
+    def fromState(state):
+        return ReducedSighting(*state)
@@ -0,0 +1,152 @@
+from datetime import datetime, timezone
+from math import sqrt, tan, radians
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Day number of 1970-01-01; timestamps are whole or fractional seconds since then, UTC.
+EPOCH_ORDINAL = datetime(1970, 1, 1).toordinal()
+
+
+# adjustAltitude function receives the observed altitude in degrees and the sighting conditions.
+# It applies dip (natural horizon only) and refraction and returns the adjusted altitude.
+def adjustAltitude(altitude, height, temperature, pressure, horizon):
+    dip = 0.0
+    if horizon == "natural":
+        dip = (-0.97 * sqrt(float(height))) / 60.0
+
+    celcius = (temperature - 32) * 5.0 / 9.0
+    refraction = -0.00452 * float(pressure) / float(273 + celcius) / tan(radians(altitude))
+    return altitude + dip + refraction
+
+
+# toTimestamp function receives date as "yyyy-mm-dd" and time as "hh:mm:ss".
+# Returns seconds since 1970-01-01 UTC.
+def toTimestamp(date, time):
+    return datetime.strptime(date + " " + time, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc).timestamp()
+
+
+# toDayNumber function receives an ephemeris date as "mm/dd/yy".
+# Returns days since 1970-01-01.
+def toDayNumber(date):
+    return datetime.strptime(date, "%m/%d/%y").toordinal() - EPOCH_ORDINAL
+
+
+class BatchReduction():
+    # Default constructor of BatchReduction Class.
+    # It receives a star catalog and an aries ephemeris of any kind (text, partitioned, indexed,
+    # binary or store tables) and looks up the entries of every batch through their get methods,
+    # so it holds no copy of either table. Tables with prefetch get the dates of the batch first.
+    # An ephemeris with getGHAs, such as SiderealTime.AnalyticAriesEphemeris, computes the GHAs
+    # of a whole column instead of being looked up.
+    # The star entries and the dates prefetched are remembered across batches (see getStar).
+    def __init__(self, starCatalog, ariesEphemeris):
+        self.starCatalog = starCatalog
+        self.ariesEphemeris = ariesEphemeris
+        self.getGHAs = getattr(ariesEphemeris, "getGHAs", None)
+        self.dates = {}
+        self.stars = {}
+        self.prefetched = set()
+
+    # getDate method converts a day number since 1970 to "mm/dd/yy", remembering earlier conversions.
+    def getDate(self, day):
+        date = self.dates.get(day)
+        if date is None:
+            date = self.dates[day] = datetime.fromordinal(day + EPOCH_ORDINAL).strftime("%m/%d/%y")
+        return date
+
+    # getStar method receives a body and a day number since 1970.
+    # Returns the star catalog entry, (SHA, declination, declination string), or None when it is not listed;
+    # every star and day is looked up once.
+    def getStar(self, body, day):
+        key = (body, day)
+        if key not in self.stars:
+            self.stars[key] = self.starCatalog.get(body, self.getDate(day))
+        return self.stars[key]
+
+    # lookUp method receives the bodies and the hours since 1970 of a batch.
+    # Every distinct star and hour is looked up once; tables with prefetch get the dates not prefetched yet first.
+    # Returns (SHA, GHA, delta) as lists of degrees, NaN where the star or the hour is not listed;
+    # GHA and delta are None with getGHAs.
+    def lookUp(self, bodies, hours):
+        days = [hour // 24 for hour in hours]
+        dates = set(self.getDate(day) for day in set(days)) - self.prefetched
+        if len(dates) > 0:
+            for table in (self.starCatalog, self.ariesEphemeris):
+                if hasattr(table, "prefetch"):
+                    table.prefetch(dates)
+            self.prefetched.update(dates)
+
+        sha = []
+        for body, day in zip(bodies, days):
+            star = self.getStar(body, day)
+            sha.append(star[0] if star is not None else float("nan"))
+        if self.getGHAs is not None:
+            return (sha, None, None)
+
+        entries = {}
+        gha = []
+        delta = []
+        for hour in hours:
+            entry = entries.get(hour)
+            if entry is None:
+                entry = self.ariesEphemeris.get(self.getDate(hour // 24), hour % 24)
+                entry = entries[hour] = entry[0:2] if entry is not None else (float("nan"), float("nan"))
+            gha.append(entry[0])
+            delta.append(entry[1])
+        return (sha, gha, delta)
+
+    # reduce method receives equal-length columns for one batch of sightings:
+    # bodies, observed altitudes in degrees, heights, temperatures (F), pressures,
+    # horizons ("natural"/"artificial") and timestamps (seconds since 1970, UTC).
+    # Returns (adjustedAltitude, GHAaries, GHAobservation) as columns of degrees;
+    # entries whose star or hour is not in the ephemeris are NaN.
+    # An observed altitude of 0 raises, FloatingPointError here and ZeroDivisionError in reduceScalar,
+    # as adjustAltitude does.
+    def reduce(self, bodies, observations, heights, temperatures, pressures, horizons, timestamps):
+        if numpy is None:
+            return self.reduceScalar(bodies, observations, heights, temperatures, pressures, horizons, timestamps)
+
+        altitude = numpy.asarray(observations, dtype=numpy.float64)
+        height = numpy.asarray(heights, dtype=numpy.float64)
+        temperature = numpy.asarray(temperatures, dtype=numpy.float64)
+        pressure = numpy.asarray(pressures, dtype=numpy.float64)
+        natural = numpy.asarray(horizons) == "natural"
+        timestamp = numpy.asarray(timestamps, dtype=numpy.float64)
+
+        dip = numpy.where(natural, (-0.97 * numpy.sqrt(height)) / 60.0, 0.0)
+        celcius = (temperature - 32) * 5.0 / 9.0
+        with numpy.errstate(divide="raise"):
+            refraction = -0.00452 * pressure / (273 + celcius) / numpy.tan(numpy.radians(altitude))
+        adjustedAltitude = altitude + dip + refraction
+
+        hour = numpy.floor(timestamp / 3600).astype(numpy.int64)
+        sha, gha, delta = self.lookUp(bodies, hour.tolist())
+        if self.getGHAs is not None:
+            ghaAries = numpy.asarray(self.getGHAs(timestamp), dtype=numpy.float64)
+        else:
+            ghaAries = (numpy.asarray(gha, dtype=numpy.float64) +
+                        numpy.asarray(delta, dtype=numpy.float64) * ((timestamp - hour * 3600) / 3600))
+        ghaObservation = numpy.mod(ghaAries + numpy.asarray(sha, dtype=numpy.float64), 360)
+        return (adjustedAltitude, ghaAries, ghaObservation)
+
+    # reduceScalar method is the pure Python fallback used when NumPy is not installed.
+    # It takes the same columns as reduce and returns lists.
+    def reduceScalar(self, bodies, observations, heights, temperatures, pressures, horizons, timestamps):
+        hours = [int(timestamp // 3600) for timestamp in timestamps]
+        sha, gha, delta = self.lookUp(bodies, hours)
+        adjustedAltitude = []
+        ghaAries = []
+        ghaObservation = []
+        for index, (observation, height, temperature, pressure, horizon, timestamp) in enumerate(zip(
+                observations, heights, temperatures, pressures, horizons, timestamps)):
+            adjustedAltitude.append(adjustAltitude(observation, height, temperature, pressure, horizon))
+            if self.getGHAs is not None:
+                ghaHour = self.getGHAs([timestamp])[0]
+            else:
+                ghaHour = gha[index] + delta[index] * ((timestamp - hours[index] * 3600) / 3600)
+            ghaAries.append(ghaHour)
+            ghaObservation.append((ghaHour + sha[index]) % 360)
+        return (adjustedAltitude, ghaAries, ghaObservation)
@@ -0,0 +1,208 @@
+import hashlib
+import os
+import sqlite3
+import threading
+
+import ReducedSighting as ReducedSighting
+
+# Version of the reduction; entries of another version never match. Bump it whenever
+# Fix.reduceSighting or the reduced values change.
+VERSION = 2
+# Inputs of a sighting that its reduction depends on, besides the ephemeris.
+INPUTS = ("body", "date", "time", "observation", "height", "temperature", "pressure", "horizon")
+# Every entry holds the constructor arguments of its ReducedSighting (see ReducedSighting.getState) and the
+# generation it was last used in. There is no index on used: it would make every recency update twice as slow,
+# and it is only needed to evict.
+SCHEMA = "CREATE TABLE IF NOT EXISTS reductions (key BLOB PRIMARY KEY, body TEXT NOT NULL, " \
+         "timestamp INTEGER NOT NULL, adjustedAltitude REAL NOT NULL, declination REAL NOT NULL, " \
+         "ghaObservation REAL NOT NULL, declinationString TEXT NOT NULL, used INTEGER NOT NULL) WITHOUT ROWID"
+SELECT = "SELECT key, body, timestamp, adjustedAltitude, declination, ghaObservation, declinationString " \
+         "FROM reductions WHERE %s"
+BLOCK_SIZE = 1 << 20
+# Keys bound per query; SQLite allows 999 parameters in its most restrictive builds.
+BATCH_SIZE = 500
+
+# Content hashes of ephemeris files, keyed by (path, mtime, size), so each version is read once per process.
+fileHashes = {}
+
+
+# hashFile function returns the sha256 hex digest of the file's content, or None when it cannot be read.
+def hashFile(fileName):
+    path = os.path.abspath(fileName)
+    try:
+        status = os.stat(path)
+        version = (path, status.st_mtime_ns, status.st_size)
+        digest = fileHashes.get(version)
+        if digest is None:
+            content = hashlib.sha256()
+            with open(path, "rb") as fileData:
+                for block in iter(lambda: fileData.read(BLOCK_SIZE), b""):
+                    content.update(block)
+            digest = fileHashes[version] = content.hexdigest()
+    except OSError as raisedException:
+        return None
+    return digest
+
+
+# fingerprint function receives the ephemeris sources of a Fix, {"stars": ..., "aries": ...},
+# each a file name, a name such as "analytic" for computed data or an EphemerisStore.
+# A store is fingerprinted by its version (see EphemerisStore.getVersion): an import can change its
+# content without changing its file, whose pages are written through the write-ahead log.
+# Returns a hex digest of the content of both, or None when either is missing or unreadable.
+def fingerprint(sources):
+    parts = [str(VERSION)]
+    for name in ("stars", "aries"):
+        source = sources.get(name)
+        if source is None:
+            return None
+        if hasattr(source, "getVersion"):
+            source = source.getVersion()
+            if source is None:
+                return None
+            source = "store:" + source
+        elif os.path.isfile(source):
+            source = hashFile(source)
+            if source is None:
+                return None
+        parts.append(name + ":" + source)
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+# normalizeNumber function returns the value as a float's repr, so "10", "10.0" and " 10 " are one key;
+# values that are not numbers are kept as they are.
+def normalizeNumber(value):
+    try:
+        return repr(float(value))
+    except (TypeError, ValueError) as raisedException:
+        return str(value)
+
+
+# normalizeAngle function returns "XdY.Y" with both parts normalized, so "45d15.2" and "45d15.20" are one key;
+# values that are not angles are kept as they are.
+def normalizeAngle(value):
+    try:
+        degrees, minutes = value.split("d")
+        return str(int(degrees)) + "d" + repr(float(minutes))
+    except (AttributeError, ValueError) as raisedException:
+        return str(value)
+
+
+# makeKey function receives an ephemeris fingerprint and a sighting record from SightingReader.
+# Returns the 16-byte content address of its reduction, the first half of a sha256.
+# Fields are separated by a unit separator, which cannot occur in a sighting file.
+def makeKey(ephemeris, sighting):
+    return hashlib.sha256("\x1f".join((ephemeris, str(sighting["body"]), str(sighting["date"]), str(sighting["time"]),
+                                       normalizeAngle(sighting["observation"]), normalizeNumber(sighting["height"]),
+                                       normalizeNumber(sighting["temperature"]), normalizeNumber(sighting["pressure"]),
+                                       str(sighting["horizon"]))).encode("utf-8")).digest()[0:16]
+
+
+class ReductionCache():
+    # Default constructor of ReductionCache Class.
+    # It keeps reduced sightings in a SQLite file, addressed by makeKey, so a sighting seen in an
+    # earlier run (a re-sent log, a corrected copy of a file) is read back instead of reduced again.
+    # maxEntries caps the entries kept; beyond it the least recently used ones are evicted, down to
+    # a tenth below the cap so that eviction, a scan of the table, stays rare.
+    # Lookups are read right away, or together beforehand with prefetch; new entries and recency updates
+    # are written together by flush. Recency is counted in flushes: every entry read or added
+    # between two flushes is stamped with the same generation.
+    def __init__(self, cacheFile, maxEntries=1000000):
+        try:
+            self.connection = sqlite3.connect(cacheFile, check_same_thread=False)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            with self.connection:
+                self.connection.execute(SCHEMA)
+            self.count, generation = self.connection.execute("SELECT count(*), coalesce(max(used), 0) "
+                                                             "FROM reductions").fetchone()
+        except sqlite3.Error as raisedException:
+            raise (ValueError("ReductionCache.__init__:  Reduction cache could not be opened"))
+        self.cacheFile = cacheFile
+        self.maxEntries = maxEntries
+        self.generation = generation + 1
+        self.lock = threading.Lock()
+        self.added = {}
+        self.used = set()
+        self.fetched = {}
+        self.hits = 0
+        self.misses = 0
+
+    # prefetch method receives keys and reads the entries of all of them, with one query per BATCH_SIZE keys;
+    # get then finds them, or finds that they are missing, without a query of its own.
+    # Entries not read by the next flush are forgotten.
+    def prefetch(self, keys):
+        keys = list(keys)
+        with self.lock:
+            for first in range(0, len(keys), BATCH_SIZE):
+                batch = keys[first:first + BATCH_SIZE]
+                self.fetched.update(dict.fromkeys(batch))
+                for row in self.connection.execute(SELECT % ("key IN (" + ", ".join("?" * len(batch)) + ")"), batch):
+                    self.fetched[row[0]] = row[1:]
+
+    # get method receives a key and returns the cached ReducedSighting, or None.
+    def get(self, key):
+        with self.lock:
+            state = self.added.get(key)
+            if state is None:
+                if key in self.fetched:
+                    state = self.fetched.pop(key)
+                else:
+                    row = self.connection.execute(SELECT % "key = ?", (key,)).fetchone()
+                    state = row[1:] if row is not None else None
+                if state is None:
+                    self.misses += 1
+                    return None
+                self.used.add(key)
+            self.hits += 1
+        return ReducedSighting.ReducedSighting(*state)
+
+    # put method receives a key and its ReducedSighting and keeps it until the next flush.
+    def put(self, key, sighting):
+        with self.lock:
+            self.added[key] = sighting.getState()
+
+    # flush method writes the new entries and the recency of those read in one transaction,
+    # then evicts the least recently used entries when there are more than maxEntries.
+    def flush(self):
+        with self.lock:
+            self.fetched = {}
+            if len(self.added) == 0 and len(self.used) == 0:
+                return
+            try:
+                with self.connection:
+                    used = list(self.used)
+                    for first in range(0, len(used), BATCH_SIZE):
+                        batch = used[first:first + BATCH_SIZE]
+                        self.connection.execute("UPDATE reductions SET used = ? WHERE key IN (" +
+                                                ", ".join("?" * len(batch)) + ")", [self.generation] + batch)
+                    before = self.connection.total_changes
+                    self.connection.executemany("INSERT OR IGNORE INTO reductions VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                                [[key] + state + [self.generation] for key, state in self.added.items()])
+                    self.count += self.connection.total_changes - before
+                    if self.maxEntries is not None and self.count > self.maxEntries:
+                        target = self.maxEntries - self.maxEntries // 10
+                        self.connection.execute("DELETE FROM reductions WHERE key IN (SELECT key FROM reductions "
+                                                "ORDER BY used LIMIT ?)", (self.count - target,))
+                        self.count = target
+            except sqlite3.Error as raisedException:
+                raise (ValueError("ReductionCache.flush:  Reduction cache could not be written"))
+            finally:
+                self.added = {}
+                self.used = set()
+                self.generation += 1
+
+    # clear method forgets every entry.
+    def clear(self):
+        with self.lock:
+            self.added = {}
+            self.used = set()
+            self.fetched = {}
+            with self.connection:
+                self.connection.execute("DELETE FROM reductions")
+            self.count = 0
+
+    def __len__(self):
+        return self.count + len(self.added)
+
+    def close(self):
+        self.flush()
+        self.connection.close()
@@ -0,0 +1,106 @@
+from datetime import datetime
+from math import cos, radians, sin
+
+import Ephemeris as Ephemeris
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Greenwich mean sidereal time (IAU 1982, as in the Astronomical Almanac), in degrees:
+#   GMST = 280.46061837 + 360.98564736629 d + 0.000387933 T^2 - T^3 / 38710000
+# with d the days since 2000-01-01 12:00 UT (J2000.0) and T = d / 36525.
+# The almanac GHA of Aries is the apparent sidereal time: GMST plus the equation of the equinoxes,
+# nutation in longitude times cos(obliquity), up to about 0.3'. Its four largest terms bring
+# the result within 0.05' of the almanac.
+GMST_J2000 = 280.46061837
+GMST_RATE = 360.98564736629
+COS_OBLIQUITY = cos(radians(23.4393))
+# Days from 1970-01-01 00:00 to J2000.0.
+J2000_DAYS = 10957.5
+EPOCH_ORDINAL = datetime(1970, 1, 1).toordinal()
+
+
+# ghaAries function receives a timestamp in seconds since 1970-01-01 UTC.
+# Returns the GHA of Aries in degrees, in [0, 360).
+def ghaAries(timestamp):
+    days = timestamp / 86400.0 - J2000_DAYS
+    centuries = days / 36525.0
+    # The whole days contribute 0.98564736629 degrees each beyond full turns; splitting them off
+    # keeps the product small and the result accurate to well below 0.1'.
+    whole = days // 1
+    node = radians(125.04452 - 1934.136261 * centuries)
+    sun = radians(280.4665 + 36000.7698 * centuries)
+    moon = radians(218.3165 + 481267.8813 * centuries)
+    nutation = -17.20 * sin(node) - 1.32 * sin(2 * sun) - 0.23 * sin(2 * moon) + 0.21 * sin(2 * node)
+    return (GMST_J2000 + (GMST_RATE - 360.0) * whole + GMST_RATE * (days - whole)
+            + 0.000387933 * centuries * centuries - centuries ** 3 / 38710000.0
+            + nutation * COS_OBLIQUITY / 3600.0) % 360.0
+
+
+# ghaAriesArray function receives a sequence of timestamps.
+# Returns their GHAs of Aries, as an array with NumPy and as a list without.
+def ghaAriesArray(timestamps):
+    if numpy is None:
+        return [ghaAries(timestamp) for timestamp in timestamps]
+    days = numpy.asarray(timestamps, dtype=numpy.float64) / 86400.0 - J2000_DAYS
+    centuries = days / 36525.0
+    whole = numpy.floor(days)
+    node = numpy.radians(125.04452 - 1934.136261 * centuries)
+    sun = numpy.radians(280.4665 + 36000.7698 * centuries)
+    moon = numpy.radians(218.3165 + 481267.8813 * centuries)
+    nutation = -17.20 * numpy.sin(node) - 1.32 * numpy.sin(2 * sun) - 0.23 * numpy.sin(2 * moon) \
+        + 0.21 * numpy.sin(2 * node)
+    return numpy.mod(GMST_J2000 + (GMST_RATE - 360.0) * whole + GMST_RATE * (days - whole)
+                     + 0.000387933 * centuries * centuries - centuries ** 3 / 38710000.0
+                     + nutation * COS_OBLIQUITY / 3600.0, 360.0)
+
+
+class AnalyticAriesEphemeris():
+    # Default constructor of AnalyticAriesEphemeris Class.
+    # It stands in for AriesEphemeris: the GHA of Aries is computed from the time,
+    # so there is no aries file to read and every date on the calendar is covered.
+    def __init__(self):
+        self.days = {}
+
+    # getDayNumber method receives a date in "mm/dd/yy" format.
+    # Returns days since 1970-01-01, or None for dates that are not on the calendar.
+    def getDayNumber(self, date):
+        day = self.days.get(date, False)
+        if day is False:
+            try:
+                day = datetime.strptime(date, "%m/%d/%y").toordinal() - EPOCH_ORDINAL
+            except ValueError as raisedException:
+                day = None
+            self.days[date] = day
+        return day
+
+    # get method receives date in "mm/dd/yy" format and hour as integer.
+    # Returns (GHA, delta to next hour) like AriesEphemeris.get, or None for an invalid date or hour;
+    # the delta is wrapped across 360 (see Ephemeris.hourDelta).
+    def get(self, date, hour):
+        day = self.getDayNumber(date)
+        if day is None or hour < 0 or hour > 23:
+            return None
+        gha = ghaAries(day * 86400 + hour * 3600)
+        return (gha, Ephemeris.hourDelta(gha, ghaAries(day * 86400 + hour * 3600 + 3600)))
+
+    # getGHA method receives date, hour and seconds past the hour.
+    # Returns the GHA of Aries at that time, or None for an invalid date or hour.
+    def getGHA(self, date, hour, seconds):
+        day = self.getDayNumber(date)
+        if day is None or hour < 0 or hour > 23:
+            return None
+        return ghaAries(day * 86400 + hour * 3600 + seconds)
+
+    # getGHAs method receives timestamps and returns their GHAs of Aries (see ghaAriesArray).
+    def getGHAs(self, timestamps):
+        return ghaAriesArray(timestamps)
+
+    # getSize method returns the approximate memory held, in bytes: nothing but the date memo.
+    def getSize(self):
+        return len(self.days) * 100
+
+    def __len__(self):
+        return 0
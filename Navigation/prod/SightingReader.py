@@ -0,0 +1,84 @@
+import xml.etree.ElementTree as ElementTree
+
+
+class SightingReader():
+    # Values used when an optional tag is missing from a sighting.
+    DEFAULTS = {"height": "0", "temperature": 72.0, "pressure": "1010", "horizon": "natural"}
+    # Tags that have no default; they are None in the record when missing.
+    REQUIRED = ("body", "date", "time", "observation")
+
+    # Default constructor of SightingReader Class.
+    # It receives the sighting file name and checks that it can be opened.
+    # Without a file name the reader only parses streams passed to readSightings.
+    def __init__(self, sightingFile=None):
+        self.sightingFile = sightingFile
+        if sightingFile is None:
+            return
+        try:
+            f = open(sightingFile, "rb")
+            f.close()
+        except Exception as e:
+            raise (ValueError("SightingReader.__init__:  Sighting file could not be opened"))
+
+    # __iter__ method parses the sighting file incrementally.
+    # It yields one record per <sighting> element and clears each element once read,
+    # so memory stays flat whatever the size of the file.
+    def __iter__(self):
+        with open(self.sightingFile, "rb") as sightingData:
+            for record in self.readSightings(sightingData):
+                yield record
+
+    # readSightings method receives a binary stream holding a sighting document.
+    # It yields a dictionary per sighting with the required tags as stripped strings
+    # (None when missing) and the optional tags with their defaults applied.
+    def readSightings(self, stream):
+        root = None
+        for event, element in ElementTree.iterparse(stream, events=("start", "end")):
+            if root is None:
+                root = element
+                continue
+            if event != "end" or element.tag != "sighting":
+                continue
+            yield self.toRecord(element)
+            element.clear()
+            root.clear()
+
+    # toRecord method receives a <sighting> element and returns its record.
+    def toRecord(self, sighting):
+        values = {}
+        for tag in self.REQUIRED + tuple(self.DEFAULTS):
+            values[tag] = self.getText(sighting, tag)
+        return self.normalize(values)
+
+    # normalize method receives a mapping from tag to value, e.g. one sighting of a JSON payload.
+    # Missing or None values of optional tags get their defaults; other values are turned into
+    # stripped strings the way they would read from a sighting file.
+    def normalize(self, values):
+        record = {}
+        for tag in self.REQUIRED + tuple(self.DEFAULTS):
+            value = values.get(tag)
+            record[tag] = str(value).strip() if value is not None else None
+
+        if record["height"] is None:
+            record["height"] = self.DEFAULTS["height"]
+
+        try:
+            record["temperature"] = float(record["temperature"])
+        except Exception as e:
+            record["temperature"] = self.DEFAULTS["temperature"]
+
+        if record["pressure"] is None:
+            record["pressure"] = self.DEFAULTS["pressure"]
+
+        if record["horizon"] is None:
+            record["horizon"] = self.DEFAULTS["horizon"]
+        else:
+            record["horizon"] = record["horizon"].lower()
+        return record
+
+    # getText method returns the stripped text of the first matching child, or None.
+    def getText(self, sighting, tag):
+        child = sighting.find(tag)
+        if child is None or child.text is None:
+            return None
+        return child.text.strip()
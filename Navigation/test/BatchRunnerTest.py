@@ -0,0 +1,96 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+prodDirectory = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "prod")
+if prodDirectory not in sys.path:
+    sys.path.insert(0, prodDirectory)
+
+import BatchRunner as BatchRunner
+
+
+class BatchRunnerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.className = "BatchRunner."
+        self.tempDir = tempfile.mkdtemp()
+        self.starFile = os.path.join(prodDirectory, "stars.txt")
+        self.ariesFile = os.path.join(prodDirectory, "aries.txt")
+        self.sightingFiles = []
+        for name in ("day1.xml", "day2.xml"):
+            sightingFile = os.path.join(self.tempDir, name)
+            shutil.copyfile(os.path.join(prodDirectory, "sight.xml"), sightingFile)
+            self.sightingFiles.append(sightingFile)
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 100
+#        Analysis - runBatch
+#            inputs
+#                list or glob of sighting files, star file, aries file
+#            outputs
+#                report with per-file results and totals
+#            state change
+#                one log file per sighting file
+#
+#            Happy path
+#                nominal case:  list of files
+#                glob pattern
+#                glob under a directory with a dot in its name
+#                files with the same name logged to one directory get their own logs
+#            Sad path
+#                pattern matching nothing
+#                file failing with another error than ValueError
+#
+#    Happy path
+    def test100_010_ShouldReduceEveryFile(self):
+        report = BatchRunner.runBatch(self.sightingFiles, self.starFile, self.ariesFile, processes=2)
+        self.assertEqual(self.sightingFiles, [result["sightingFile"] for result in report["files"]])
+        self.assertEqual(4, report["sightings"])
+        self.assertEqual(2, report["errors"])
+        self.assertEqual(0, report["failures"])
+        self.assertTrue(os.path.exists(os.path.join(self.tempDir, "day1.log")))
+
+    def test100_020_ShouldExpandGlob(self):
+        report = BatchRunner.runBatch(os.path.join(self.tempDir, "*.xml"), self.starFile, self.ariesFile, processes=1)
+        self.assertEqual(2, len(report["files"]))
+
+    def test100_030_ShouldExpandGlobUnderDottedDirectory(self):
+        spoolDirectory = os.path.join(self.tempDir, "spool.d")
+        os.mkdir(spoolDirectory)
+        shutil.copyfile(self.sightingFiles[0], os.path.join(spoolDirectory, "day1.part1.xml"))
+        report = BatchRunner.runBatch(os.path.join(spoolDirectory, "*.xml"), self.starFile, self.ariesFile,
+                                      processes=1)
+        self.assertEqual(0, report["failures"])
+        self.assertEqual(2, report["sightings"])
+
+    def test100_040_ShouldGiveSameNamesTheirOwnLogs(self):
+        otherDirectory = os.path.join(self.tempDir, "other")
+        os.mkdir(otherDirectory)
+        otherFile = os.path.join(otherDirectory, "day1.xml")
+        shutil.copyfile(self.sightingFiles[0], otherFile)
+        logDirectory = os.path.join(self.tempDir, "logs")
+        os.mkdir(logDirectory)
+        report = BatchRunner.runBatch([self.sightingFiles[0], otherFile], self.starFile, self.ariesFile,
+                                      logDirectory=logDirectory, processes=2)
+        self.assertEqual([os.path.join(logDirectory, "day1.log"), os.path.join(logDirectory, "day1.1.log")],
+                         [result["logFile"] for result in report["files"]])
+        for result in report["files"]:
+            with open(result["logFile"], "r") as logData:
+                self.assertEqual(2, len([line for line in logData if "Sirius" in line or "Pollux" in line]))
+
+#    Sad path
+    def test100_910_ShouldRaiseExceptionOnNoFiles(self):
+        expectedDiag = self.className + "runBatch:"
+        with self.assertRaises(ValueError) as context:
+            BatchRunner.runBatch(os.path.join(self.tempDir, "*.none"), self.starFile, self.ariesFile)
+        self.assertEqual(expectedDiag, context.exception.args[0][0:len(expectedDiag)])
+
+    def test100_920_ShouldReportOtherErrorsPerFile(self):
+        expectedDiag = self.className + "reduceFile:"
+        result = BatchRunner.reduceFile((None, self.starFile, self.ariesFile, os.path.join(self.tempDir, "none.log")))
+        self.assertEqual(expectedDiag, result["failure"][0:len(expectedDiag)])
@@ -0,0 +1,87 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+benchDirectory = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bench")
+if benchDirectory not in sys.path:
+    sys.path.insert(0, benchDirectory)
+
+import Benchmark as Benchmark
+import SyntheticData as SyntheticData
+
+
+class BenchmarkTest(unittest.TestCase):
+
+    def setUp(self):
+        self.className = "Benchmark."
+        self.tempDir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def stage(self, throughput):
+        return {"seconds": 1.0, "items": throughput, "throughput": throughput, "peakMemory": None}
+
+    def result(self, throughput):
+        return {"stages": {name: self.stage(throughput) for name in Benchmark.STAGES},
+                "total": self.stage(throughput)}
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 100
+#        Analysis - SyntheticData.generate
+#            inputs
+#                directory, sightings, years, seed
+#            outputs
+#                sight.xml, stars.txt and aries.txt
+#
+#            Happy path
+#                same seed gives the same files
+#                one aries line per hour plus the first hour of the next year
+#
+#    Happy path
+    def test100_010_ShouldGenerateSameFilesForSameSeed(self):
+        first = os.path.join(self.tempDir, "first")
+        second = os.path.join(self.tempDir, "second")
+        os.mkdir(first)
+        os.mkdir(second)
+        SyntheticData.generate(first, 50, seed=7)
+        SyntheticData.generate(second, 50, seed=7)
+        for name in ("sight.xml", "stars.txt", "aries.txt"):
+            with open(os.path.join(first, name)) as a, open(os.path.join(second, name)) as b:
+                self.assertEqual(a.read(), b.read())
+
+    def test100_020_ShouldListEveryHour(self):
+        files = SyntheticData.generate(self.tempDir, 10)
+        with open(files["ariesFile"]) as ariesData:
+            self.assertEqual(365 * 24 + 1, len(ariesData.readlines()))
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 200
+#        Analysis - runBenchmark and compare
+#            inputs
+#                scale, baseline
+#            outputs
+#                timings of every stage, regressions
+#
+#            Happy path
+#                every stage is timed
+#                no regression within tolerance
+#            Sad path
+#                throughput drop beyond tolerance is a regression
+#
+#    Happy path
+    def test200_010_ShouldTimeEveryStage(self):
+        result = Benchmark.runBenchmark(20, repeat=1)
+        self.assertEqual(set(Benchmark.STAGES), set(result["stages"]))
+        self.assertEqual(20, result["stages"]["parse"]["items"])
+        self.assertEqual(20, result["total"]["items"])
+
+    def test200_020_ShouldAcceptWithinTolerance(self):
+        self.assertEqual([], Benchmark.compare(self.result(80.0), self.result(100.0), 0.25))
+
+#    Sad path
+    def test200_910_ShouldReportRegression(self):
+        regressions = Benchmark.compare(self.result(50.0), self.result(100.0), 0.25)
+        self.assertEqual(len(Benchmark.STAGES) + 1, len(regressions))
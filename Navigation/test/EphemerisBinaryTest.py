@@ -0,0 +1,94 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+prodDirectory = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "prod")
+if prodDirectory not in sys.path:
+    sys.path.insert(0, prodDirectory)
+
+import Ephemeris as Ephemeris
+import EphemerisBinary as EphemerisBinary
+
+
+class EphemerisBinaryTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.starCatalog = Ephemeris.StarCatalog(os.path.join(prodDirectory, "stars.txt"))
+        cls.ariesEphemeris = Ephemeris.AriesEphemeris(os.path.join(prodDirectory, "aries.txt"))
+
+    def setUp(self):
+        self.className = "BinaryEphemeris."
+        self.tempDir = tempfile.mkdtemp()
+        self.binaryFile = os.path.join(self.tempDir, "ephemeris.bin")
+        EphemerisBinary.compileEphemeris(os.path.join(prodDirectory, "stars.txt"),
+                                         os.path.join(prodDirectory, "aries.txt"), self.binaryFile)
+        self.ephemeris = EphemerisBinary.BinaryEphemeris(self.binaryFile)
+
+    def tearDown(self):
+        self.ephemeris.close()
+        shutil.rmtree(self.tempDir)
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 100
+#        Analysis - compileEphemeris / BinaryEphemeris
+#            inputs
+#                star and aries text files
+#            outputs
+#                the same lookups as StarCatalog and AriesEphemeris
+#
+#            Happy path
+#                every star of the text catalog
+#                every hour of the text table
+#            Sad path
+#                unlisted star and hour return None
+#                file that is not a compiled ephemeris
+#                name longer than the key matches no star sharing its first NAME_SIZE bytes
+#                star name or declination that does not fit is not compiled
+#
+#    Happy path
+    def test100_010_ShouldMatchEveryStar(self):
+        for (body, date), star in self.starCatalog.stars.items():
+            self.assertEqual(star, self.ephemeris.getStar(body, date))
+
+    def test100_020_ShouldMatchEveryHour(self):
+        for (date, hour), entry in self.ariesEphemeris.hours.items():
+            if date != "02/29/17":
+                self.assertEqual(entry, self.ephemeris.getHour(date, hour))
+
+#    Sad path
+    def test100_910_ShouldReturnNoneWhenNotListed(self):
+        self.assertIsNone(self.ephemeris.getStar("Unknown", "04/17/17"))
+        self.assertIsNone(self.ephemeris.getHour("01/01/30", 0))
+
+    def test100_920_ShouldRaiseExceptionOnTextFile(self):
+        expectedDiag = self.className + "__init__:"
+        with self.assertRaises(ValueError) as context:
+            EphemerisBinary.BinaryEphemeris(os.path.join(prodDirectory, "stars.txt"))
+        self.assertEqual(expectedDiag, context.exception.args[0][0:len(expectedDiag)])
+
+    def test100_930_ShouldNotMatchLongerName(self):
+        starFile = os.path.join(self.tempDir, "stars.txt")
+        with open(starFile, "w") as starData:
+            starData.write("Alpha Centauri Rigil Ken\t01/01/17\t140d05.2\t-60d47.3\n")
+        binaryFile = os.path.join(self.tempDir, "long.bin")
+        EphemerisBinary.compileEphemeris(starFile, os.path.join(prodDirectory, "aries.txt"), binaryFile)
+        ephemeris = EphemerisBinary.BinaryEphemeris(binaryFile)
+        self.addCleanup(ephemeris.close)
+        self.assertIsNotNone(ephemeris.getStar("Alpha Centauri Rigil Ken", "01/01/17"))
+        self.assertIsNone(ephemeris.getStar("Alpha Centauri Rigil Kentaurus", "01/01/17"))
+        self.assertIsNone(ephemeris.getStar("Alpha Centauri Rigil Ken\0", "01/01/17"))
+
+    def test100_940_ShouldRaiseExceptionOnNameThatDoesNotFit(self):
+        expectedDiag = "EphemerisBinary.compileEphemeris:"
+        starFile = os.path.join(self.tempDir, "stars.txt")
+        for line in ("Alpha Centauri Rigil Kentaurus A\t01/01/17\t140d05.2\t-60d47.3\n",
+                     "Sirius\t01/01/17\t258d38.8\t-16d44.0000001\n"):
+            with open(starFile, "w") as starData:
+                starData.write(line)
+            with self.assertRaises(ValueError) as context:
+                EphemerisBinary.compileEphemeris(starFile, os.path.join(prodDirectory, "aries.txt"),
+                                                 os.path.join(self.tempDir, "long.bin"))
+            self.assertEqual(expectedDiag, context.exception.args[0][0:len(expectedDiag)])
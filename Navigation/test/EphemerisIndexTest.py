@@ -0,0 +1,72 @@
+import os
+import shutil
+import tempfile
+import unittest
+import Navigation.prod.EphemerisIndex as EphemerisIndex
+
+
+class EphemerisIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.className = "DateIndex."
+        self.tempDir = tempfile.mkdtemp()
+        self.ariesFile = os.path.join(self.tempDir, "aries.txt")
+        with open(self.ariesFile, "w") as ariesData:
+            ariesData.write("04/09/17\t22\t318d27.8\n")
+            ariesData.write("04/09/17\t23\t333d30.3\n")
+            ariesData.write("04/10/17\t0\t348d32.7\n")
+            ariesData.write("04/09/17\t12\t198d02.8\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 100
+#        Analysis - DateIndex
+#            inputs
+#                text file, date column
+#            outputs
+#                lines of a date, one run per range
+#            state change
+#                sidecar "<text file>.idx" is written and reused while the text file is unchanged
+#
+#            Happy path
+#                lines of a date in file order, one run per range
+#                following line is added to each run
+#                sidecar is reused
+#            Sad path
+#                changed text file rebuilds the index
+#                missing file
+#
+#    Happy path
+    def test100_010_ShouldReadRunsOfDate(self):
+        index = EphemerisIndex.DateIndex(self.ariesFile, 0)
+        self.assertEqual([["04/09/17\t22\t318d27.8\n", "04/09/17\t23\t333d30.3\n"], ["04/09/17\t12\t198d02.8\n"]],
+                         index.readRuns("04/09/17"))
+
+    def test100_020_ShouldAddFollowingLine(self):
+        index = EphemerisIndex.DateIndex(self.ariesFile, 0)
+        self.assertEqual("04/10/17\t0\t348d32.7\n", index.readRuns("04/09/17", following=True)[0][-1])
+        self.assertEqual(1, len(index.readRuns("04/09/17", following=True)[1]))
+
+    def test100_030_ShouldReuseSidecar(self):
+        EphemerisIndex.DateIndex(self.ariesFile, 0)
+        self.assertTrue(os.path.exists(self.ariesFile + ".idx"))
+        index = EphemerisIndex.DateIndex(self.ariesFile, 0)
+        self.assertTrue(index.load())
+        self.assertEqual(["04/09/17", "04/10/17"], sorted(index.getDates()))
+
+#    Sad path
+    def test100_910_ShouldRebuildChangedFile(self):
+        EphemerisIndex.DateIndex(self.ariesFile, 0)
+        with open(self.ariesFile, "a") as ariesData:
+            ariesData.write("04/11/17\t0\t349d31.7\n")
+        index = EphemerisIndex.DateIndex(self.ariesFile, 0)
+        self.assertEqual([["04/11/17\t0\t349d31.7\n"]], index.readRuns("04/11/17"))
+
+    def test100_920_ShouldRaiseExceptionOnMissingFile(self):
+        expectedDiag = self.className + "__init__:"
+        with self.assertRaises(ValueError) as context:
+            EphemerisIndex.DateIndex(os.path.join(self.tempDir, "missing.txt"), 0)
+        self.assertEqual(expectedDiag, context.exception.args[0][0:len(expectedDiag)])
+
@@ -0,0 +1,121 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+prodDirectory = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "prod")
+if prodDirectory not in sys.path:
+    sys.path.insert(0, prodDirectory)
+
+import Ephemeris as Ephemeris
+import EphemerisStore as EphemerisStore
+
+
+class EphemerisStoreTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.starCatalog = Ephemeris.StarCatalog(os.path.join(prodDirectory, "stars.txt"))
+        cls.ariesEphemeris = Ephemeris.AriesEphemeris(os.path.join(prodDirectory, "aries.txt"))
+
+    def setUp(self):
+        self.className = "EphemerisStore."
+        self.tempDir = tempfile.mkdtemp()
+        self.storeFile = os.path.join(self.tempDir, "ephemeris.db")
+        self.store = EphemerisStore.EphemerisStore(self.storeFile)
+        self.counts = self.store.importText(os.path.join(prodDirectory, "stars.txt"),
+                                            os.path.join(prodDirectory, "aries.txt"))
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tempDir)
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 100
+#        Analysis - EphemerisStore
+#            inputs
+#                star and aries text files
+#            outputs
+#                the same entries as StarCatalog and AriesEphemeris, by date
+#            state change
+#                entries are written to the SQLite store
+#
+#            Happy path
+#                every star and hour of the text tables
+#                import again replaces entries
+#                date range of the aries table
+#            Sad path
+#                read-only store that does not exist
+#
+#    Happy path
+    def test100_010_ShouldMatchTextTables(self):
+        dates = set(date for body, date in self.starCatalog.stars) | set(date for date, hour in self.ariesEphemeris.hours)
+        self.assertEqual(dict((key, star) for key, star in self.starCatalog.stars.items() if key[1] != "02/29/17"),
+                         dict(self.store.getStars(dates)))
+        self.assertEqual(dict((key, entry) for key, entry in self.ariesEphemeris.hours.items() if key[0] != "02/29/17"),
+                         dict(self.store.getHours(dates)))
+        self.assertEqual(len(self.store.getHours(dates)), self.counts[1])
+
+    def test100_020_ShouldReplaceOnImport(self):
+        self.assertEqual(self.counts, self.store.importText(os.path.join(prodDirectory, "stars.txt"),
+                                                            os.path.join(prodDirectory, "aries.txt")))
+        self.assertEqual(self.counts[0], len(self.store.getStars(set(date for body, date in self.starCatalog.stars))))
+
+    def test100_030_ShouldReturnDateRange(self):
+        self.assertEqual(("01/01/17", "12/31/17"), self.store.getDateRange())
+
+#    Sad path
+    def test100_910_ShouldRaiseExceptionOnMissingStore(self):
+        expectedDiag = self.className + "__init__:"
+        with self.assertRaises(ValueError) as context:
+            EphemerisStore.EphemerisStore(os.path.join(self.tempDir, "missing.db"), readOnly=True)
+        self.assertEqual(expectedDiag, context.exception.args[0][0:len(expectedDiag)])
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 200
+#        Analysis - StoreStarCatalog and StoreAriesEphemeris
+#            inputs
+#                EphemerisStore, dates to prefetch
+#            outputs
+#                same lookups as StarCatalog and AriesEphemeris
+#            state change
+#                dates are fetched once, together when prefetched
+#
+#            Happy path
+#                prefetched dates are fetched with one query each table
+#                dates not prefetched are fetched on lookup
+#                readers share the store
+#            Sad path
+#                unlisted star and hour return None
+#
+#    Happy path
+    def test200_010_ShouldPrefetchDates(self):
+        queries = []
+        self.store.connection.set_trace_callback(queries.append)
+        starCatalog = EphemerisStore.StoreStarCatalog(self.store)
+        ariesEphemeris = EphemerisStore.StoreAriesEphemeris(self.store)
+        starCatalog.prefetch(["04/09/17", "04/15/17"])
+        ariesEphemeris.prefetch(["04/09/17", "04/15/17"])
+        self.assertEqual(2, len(queries))
+        self.assertEqual(self.starCatalog.get("Pollux", "04/15/17"), starCatalog.get("Pollux", "04/15/17"))
+        self.assertEqual(self.ariesEphemeris.getGHA("04/09/17", 9, 1830), ariesEphemeris.getGHA("04/09/17", 9, 1830))
+        self.assertEqual(2, len(queries))
+
+    def test200_020_ShouldFetchDateOnLookup(self):
+        starCatalog = EphemerisStore.StoreStarCatalog(self.store)
+        self.assertEqual(self.starCatalog.get("Sirius", "04/10/17"), starCatalog.get("Sirius", "04/10/17"))
+        self.assertEqual(set(["04/10/17"]), starCatalog.loaded)
+
+    def test200_030_ShouldShareStore(self):
+        reader = EphemerisStore.EphemerisStore(self.storeFile, readOnly=True)
+        try:
+            ariesEphemeris = EphemerisStore.StoreAriesEphemeris(reader)
+            self.assertEqual(self.ariesEphemeris.get("12/31/17", 22), ariesEphemeris.get("12/31/17", 22))
+        finally:
+            reader.close()
+
+#    Sad path
+    def test200_910_ShouldReturnNoneWhenNotListed(self):
+        self.assertIsNone(EphemerisStore.StoreStarCatalog(self.store).get("Unknown", "04/17/17"))
+        self.assertIsNone(EphemerisStore.StoreAriesEphemeris(self.store).get("01/01/30", 0))
@@ -0,0 +1,296 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+prodDirectory = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "prod")
+if prodDirectory not in sys.path:
+    sys.path.insert(0, prodDirectory)
+
+import Ephemeris as Ephemeris
+
+
+class EphemerisTest(unittest.TestCase):
+
+    def setUp(self):
+        self.delta = 0.002      # accuracy within 1/10 minute
+        self.className = "StarCatalog."
+        self.tempDir = tempfile.mkdtemp()
+        self.starFile = os.path.join(self.tempDir, "stars.txt")
+        with open(self.starFile, "w") as starData:
+            starData.write("Sirius\t04/09/17\t258d33.7\t-16d44.5\n")
+            starData.write("Pollux\t04/09/17\t243d25.0\t27d59.1\n")
+            starData.write("Sirius\t04/10/17\t258d33.8\t-16d44.6\n")
+        self.ariesFile = os.path.join(self.tempDir, "aries.txt")
+        with open(self.ariesFile, "w") as ariesData:
+            ariesData.write("04/09/17\t9\t333d32.7\n")
+            ariesData.write("04/09/17\t10\t348d35.2\n")
+            ariesData.write("04/09/17\t11\t3d37.6\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 100
+#        Analysis - parseDegreesAndMinutes
+#            inputs
+#                angleString in "XdY.Y" format, degrees may be negative
+#            outputs
+#                signed decimal degrees
+#
+#            Happy path
+#                nominal case:  "258d33.7"
+#                negative case:  "-16d44.5"
+#            Sad path
+#                missing separator:  "258"
+#
+#    Happy path
+    def test100_010_ShouldParsePositiveAngle(self):
+        self.assertAlmostEqual(258 + 33.7 / 60, Ephemeris.parseDegreesAndMinutes("258d33.7"), delta=self.delta)
+
+    def test100_020_ShouldApplySignToMinutes(self):
+        self.assertAlmostEqual(-(16 + 44.5 / 60), Ephemeris.parseDegreesAndMinutes("-16d44.5"), delta=self.delta)
+
+#    Sad path
+    def test100_910_ShouldRaiseExceptionOnMissingSeparator(self):
+        expectedDiag = "Ephemeris.parseDegreesAndMinutes:"
+        with self.assertRaises(ValueError) as context:
+            Ephemeris.parseDegreesAndMinutes("258")
+        self.assertEqual(expectedDiag, context.exception.args[0][0:len(expectedDiag)])
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 200
+#        Analysis - StarCatalog
+#            inputs
+#                star file name
+#            outputs
+#                (SHA, declination, declinationString) keyed by (body, date)
+#
+#            Happy path
+#                nominal lookup of a listed star
+#                lookup of a star on a different date
+#            Sad path
+#                unlisted star returns None
+#                missing file
+#
+#    Happy path
+    def test200_010_ShouldIndexEveryLine(self):
+        self.assertEqual(3, len(Ephemeris.StarCatalog(self.starFile)))
+
+    def test200_020_ShouldReturnDecodedStar(self):
+        sha, declination, declinationString = Ephemeris.StarCatalog(self.starFile).get("Sirius", "04/09/17")
+        self.assertAlmostEqual(258 + 33.7 / 60, sha, delta=self.delta)
+        self.assertAlmostEqual(-(16 + 44.5 / 60), declination, delta=self.delta)
+        self.assertEqual("-16d44.5", declinationString)
+
+    def test200_030_ShouldKeyByDate(self):
+        star = Ephemeris.StarCatalog(self.starFile).get("Sirius", "04/10/17")
+        self.assertEqual("-16d44.6", star[2])
+
+#    Sad path
+    def test200_910_ShouldReturnNoneForUnlistedStar(self):
+        self.assertIsNone(Ephemeris.StarCatalog(self.starFile).get("Vega", "04/09/17"))
+
+    def test200_920_ShouldRaiseExceptionOnMissingFile(self):
+        expectedDiag = self.className + "load:"
+        with self.assertRaises(ValueError) as context:
+            Ephemeris.StarCatalog(os.path.join(self.tempDir, "missing.txt"))
+        self.assertEqual(expectedDiag, context.exception.args[0][0:len(expectedDiag)])
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 300
+#        Analysis - AriesEphemeris
+#            inputs
+#                aries file name
+#            outputs
+#                (GHA, delta to next hour) keyed by (date, hour)
+#                interpolated GHA for seconds past the hour
+#
+#            Happy path
+#                nominal lookup of an hour
+#                interpolation half way through the hour
+#                hour in which the GHA passes 360 interpolates forward
+#            Sad path
+#                last line has no following hour
+#                unlisted hour returns None
+#
+#    Happy path
+    def test300_010_ShouldStoreDeltaToNextHour(self):
+        gha, delta = Ephemeris.AriesEphemeris(self.ariesFile).get("04/09/17", 9)
+        self.assertAlmostEqual(333 + 32.7 / 60, gha, delta=self.delta)
+        self.assertAlmostEqual((348 + 35.2 / 60) - (333 + 32.7 / 60), delta, delta=self.delta)
+
+    def test300_020_ShouldInterpolateWithinHour(self):
+        gha1 = 333 + 32.7 / 60
+        gha2 = 348 + 35.2 / 60
+        self.assertAlmostEqual(gha1 + (gha2 - gha1) * 0.5,
+                               Ephemeris.AriesEphemeris(self.ariesFile).getGHA("04/09/17", 9, 1800), delta=self.delta)
+
+    def test300_030_ShouldInterpolateAcross360(self):
+        gha, delta = Ephemeris.AriesEphemeris(self.ariesFile).get("04/09/17", 10)
+        self.assertAlmostEqual((360 + 3 + 37.6 / 60) - (348 + 35.2 / 60), delta, delta=self.delta)
+        self.assertAlmostEqual(356 + 6.4 / 60, Ephemeris.AriesEphemeris(self.ariesFile).getGHA("04/09/17", 10, 1800),
+                               delta=self.delta)
+
+#    Sad path
+    def test300_910_ShouldNotIndexLastLine(self):
+        self.assertIsNone(Ephemeris.AriesEphemeris(self.ariesFile).get("04/09/17", 11))
+
+    def test300_920_ShouldReturnNoneForUnlistedHour(self):
+        self.assertIsNone(Ephemeris.AriesEphemeris(self.ariesFile).getGHA("04/10/17", 9, 0))
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 400
+#        Analysis - EphemerisCache
+#            inputs
+#                star or aries file name
+#            outputs
+#                parsed table, shared between calls
+#            state change
+#                tables are cached by absolute path and evicted least recently used first
+#
+#            Happy path
+#                second request for an unchanged file is a hit
+#                changed file is parsed again
+#                memory cap evicts the least recently used table
+#            Sad path
+#                missing file
+#
+#    Happy path
+    def test400_010_ShouldReturnCachedTable(self):
+        aCache = Ephemeris.EphemerisCache()
+        starCatalog = aCache.getStarCatalog(self.starFile)
+        self.assertIs(starCatalog, aCache.getStarCatalog(self.starFile))
+        self.assertEqual(1, aCache.hits)
+
+    def test400_020_ShouldReloadChangedFile(self):
+        aCache = Ephemeris.EphemerisCache()
+        starCatalog = aCache.getStarCatalog(self.starFile)
+        with open(self.starFile, "a") as starData:
+            starData.write("Vega\t04/09/17\t80d40.0\t38d48.1\n")
+        reloaded = aCache.getStarCatalog(self.starFile)
+        self.assertIsNot(starCatalog, reloaded)
+        self.assertEqual(4, len(reloaded))
+
+    def test400_030_ShouldEvictLeastRecentlyUsed(self):
+        aCache = Ephemeris.EphemerisCache(memoryLimit=Ephemeris.StarCatalog.ENTRY_SIZE * 3)
+        aCache.getStarCatalog(self.starFile)
+        aCache.getAriesEphemeris(self.ariesFile)
+        self.assertEqual(1, len(aCache.tables))
+        aCache.getAriesEphemeris(self.ariesFile)
+        self.assertEqual(1, aCache.hits)
+
+#    Sad path
+    def test400_910_ShouldRaiseExceptionOnMissingFile(self):
+        expectedDiag = "EphemerisCache.get:"
+        with self.assertRaises(ValueError) as context:
+            Ephemeris.EphemerisCache().getStarCatalog(os.path.join(self.tempDir, "missing.txt"))
+        self.assertEqual(expectedDiag, context.exception.args[0][0:len(expectedDiag)])
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 500
+#        Analysis - PartitionedStarCatalog and PartitionedAriesEphemeris
+#            inputs
+#                star or aries file name, date looked up
+#            outputs
+#                same entries as StarCatalog and AriesEphemeris
+#            state change
+#                only the dates looked up are parsed
+#
+#            Happy path
+#                only the date looked up is parsed
+#                last hour of a date has the delta to the next date
+#                shipped catalogs give the same entries as the full tables
+#            Sad path
+#                unlisted date
+#
+#    Happy path
+    def test500_010_ShouldParseOnlyDateLookedUp(self):
+        starCatalog = Ephemeris.PartitionedStarCatalog(self.starFile)
+        self.assertEqual(0, len(starCatalog))
+        self.assertAlmostEqual(258.5617, starCatalog.get("Sirius", "04/10/17")[0], delta=self.delta)
+        self.assertEqual(1, len(starCatalog))
+
+    def test500_020_ShouldStoreDeltaToNextDate(self):
+        with open(self.ariesFile, "a") as ariesData:
+            ariesData.write("04/10/17\t0\t18d40.0\n")
+            ariesData.write("04/10/17\t1\t33d42.5\n")
+        ariesEphemeris = Ephemeris.PartitionedAriesEphemeris(self.ariesFile)
+        self.assertAlmostEqual(18.6667, ariesEphemeris.getGHA("04/09/17", 11, 3600), delta=self.delta)
+        self.assertEqual(3, len(ariesEphemeris))
+
+    def test500_030_ShouldMatchFullTables(self):
+        prodDirectory = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "prod")
+        starFile = os.path.join(self.tempDir, "shipped-stars.txt")
+        ariesFile = os.path.join(self.tempDir, "shipped-aries.txt")
+        shutil.copyfile(os.path.join(prodDirectory, "stars.txt"), starFile)
+        shutil.copyfile(os.path.join(prodDirectory, "aries.txt"), ariesFile)
+        starCatalog = Ephemeris.StarCatalog(starFile)
+        partitionedStars = Ephemeris.PartitionedStarCatalog(starFile)
+        self.assertTrue(all(partitionedStars.get(body, date) == star for (body, date), star in starCatalog.stars.items()))
+        ariesEphemeris = Ephemeris.AriesEphemeris(ariesFile)
+        partitionedAries = Ephemeris.PartitionedAriesEphemeris(ariesFile)
+        self.assertTrue(all(partitionedAries.get(date, hour) == entry
+                            for (date, hour), entry in ariesEphemeris.hours.items()))
+        self.assertEqual(len(ariesEphemeris), len(partitionedAries))
+
+#    Sad path
+    def test500_910_ShouldReturnNoneForUnlistedDate(self):
+        self.assertIsNone(Ephemeris.PartitionedAriesEphemeris(self.ariesFile).get("04/11/17", 0))
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 600
+#        Analysis - IndexedStarCatalog and IndexedAriesEphemeris
+#            inputs
+#                star or aries file name, star and date or date and hour looked up
+#            outputs
+#                same entries as StarCatalog and AriesEphemeris
+#            state change
+#                nothing is kept parsed, only the lines of the last date looked up;
+#                the index is rebuilt when the file changes
+#
+#            Happy path
+#                lookup keeps nothing parsed, only the lines of its date
+#                shipped catalogs give the same entries as the full tables
+#                changed file is looked up again
+#            Sad path
+#                unlisted star, last line of the aries file
+#
+#    Happy path
+    def test600_010_ShouldKeepNothingParsed(self):
+        starCatalog = Ephemeris.IndexedStarCatalog(self.starFile)
+        self.assertAlmostEqual(-16.7433, starCatalog.get("Sirius", "04/10/17")[1], delta=self.delta)
+        self.assertEqual(0, len(starCatalog))
+        ariesEphemeris = Ephemeris.IndexedAriesEphemeris(self.ariesFile)
+        self.assertAlmostEqual(333.545 + 15.0417 * 0.5, ariesEphemeris.getGHA("04/09/17", 9, 1800), delta=self.delta)
+        self.assertEqual(0, len(ariesEphemeris))
+        self.assertEqual([9, 10], sorted(ariesEphemeris.dateLines))
+        self.assertIsNone(ariesEphemeris.get("04/10/17", 0))
+        self.assertEqual({}, ariesEphemeris.dateLines)
+
+    def test600_020_ShouldMatchFullTables(self):
+        prodDirectory = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "prod")
+        starFile = os.path.join(self.tempDir, "shipped-stars.txt")
+        ariesFile = os.path.join(self.tempDir, "shipped-aries.txt")
+        shutil.copyfile(os.path.join(prodDirectory, "stars.txt"), starFile)
+        shutil.copyfile(os.path.join(prodDirectory, "aries.txt"), ariesFile)
+        starCatalog = Ephemeris.StarCatalog(starFile)
+        indexedStars = Ephemeris.IndexedStarCatalog(starFile)
+        self.assertTrue(all(indexedStars.get(body, date) == star for (body, date), star in starCatalog.stars.items()))
+        ariesEphemeris = Ephemeris.AriesEphemeris(ariesFile)
+        indexedAries = Ephemeris.IndexedAriesEphemeris(ariesFile)
+        self.assertTrue(all(indexedAries.get(date, hour) == entry
+                            for (date, hour), entry in ariesEphemeris.hours.items()))
+
+    def test600_030_ShouldLookUpChangedFile(self):
+        ariesEphemeris = Ephemeris.IndexedAriesEphemeris(self.ariesFile)
+        self.assertIsNone(ariesEphemeris.get("04/09/17", 11))
+        with open(self.ariesFile, "a") as ariesData:
+            ariesData.write("04/09/17\t12\t18d40.1\n")
+        self.assertAlmostEqual(3.6267, ariesEphemeris.get("04/09/17", 11)[0], delta=self.delta)
+
+#    Sad path
+    def test600_910_ShouldReturnNoneForUnlisted(self):
+        self.assertIsNone(Ephemeris.IndexedStarCatalog(self.starFile).get("Pollux", "04/10/17"))
+        self.assertIsNone(Ephemeris.IndexedAriesEphemeris(self.ariesFile).get("04/09/17", 11))
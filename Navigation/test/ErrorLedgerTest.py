@@ -0,0 +1,64 @@
+import unittest
+import Navigation.prod.ErrorLedger as ErrorLedger
+
+
+class ErrorLedgerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.className = "ErrorLedger."
+        self.ledger = ErrorLedger.ErrorLedger()
+
+    def tearDown(self):
+        pass
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 100
+#        Analysis - add and iteration
+#            inputs
+#                code, sighting index, field
+#            outputs
+#                entries with index, field, code and message in the order recorded
+#
+#            Happy path
+#                entries are read back with their messages
+#                messages join into the former error string
+#                carried errors are counted without entries
+#            Sad path
+#                entries past the limit are only counted
+#                unknown code
+#
+#    Happy path
+    def test100_010_ShouldIterateEntries(self):
+        self.ledger.add(ErrorLedger.ErrorLedger.MISSING_TAG, 3, "body")
+        self.ledger.add(ErrorLedger.ErrorLedger.STAR_NOT_FOUND)
+        self.assertEqual([{"index": 3, "field": "body", "code": "missing-tag",
+                           "message": "Fix.getSightings:  body tag is missing"},
+                          {"index": None, "field": None, "code": "star-not-found",
+                           "message": "Sighting file : Some data not match"}], list(self.ledger))
+
+    def test100_020_ShouldJoinMessages(self):
+        self.ledger.add(ErrorLedger.ErrorLedger.MISSING_TAG, 0, "time")
+        self.ledger.add(ErrorLedger.ErrorLedger.ARIES_NOT_FOUND, 1, "date")
+        self.assertEqual("Fix.getSightings:  time tag is missingSighting file : Aries data not match",
+                         self.ledger.getString())
+
+    def test100_030_ShouldCountCarriedErrors(self):
+        self.ledger.add(ErrorLedger.ErrorLedger.MISSING_TAG, 0, "time")
+        self.ledger.carry(2)
+        self.assertEqual(3, self.ledger.count)
+        self.assertEqual(1, len(self.ledger))
+
+#    Sad path
+    def test100_910_ShouldCountEntriesPastLimit(self):
+        ledger = ErrorLedger.ErrorLedger(limit=2)
+        for index in range(5):
+            ledger.add(ErrorLedger.ErrorLedger.STAR_NOT_FOUND, index, "body")
+        self.assertEqual(2, len(ledger))
+        self.assertEqual(3, ledger.overflow)
+        self.assertEqual(5, ledger.count)
+        self.assertEqual([0, 1], [entry["index"] for entry in ledger])
+        self.assertEqual(5, ledger.getCounts()[ErrorLedger.ErrorLedger.STAR_NOT_FOUND])
+
+    def test100_920_ShouldRaiseExceptionOnUnknownCode(self):
+        with self.assertRaises(ValueError):
+            self.ledger.add("unknown", 0)
@@ -0,0 +1,115 @@
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+
+prodDirectory = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "prod")
+if prodDirectory not in sys.path:
+    sys.path.insert(0, prodDirectory)
+
+import ExternalSort as ExternalSort
+import ReducedSighting as ReducedSighting
+
+
+class ExternalSortTest(unittest.TestCase):
+
+    def setUp(self):
+        self.className = "ExternalSorter."
+        self.tempDir = tempfile.mkdtemp()
+        generator = random.Random(23)
+        # Few times and bodies, so that many sightings tie; declination tells them apart.
+        self.sightings = [ReducedSighting.ReducedSighting(generator.choice(("Sirius", "Pollux", "Vega")),
+                                                          1491730230 + generator.randrange(50), 45.0, float(index),
+                                                          239.0, "0d0.0")
+                          for index in range(5000)]
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def newSorter(self, memoryBudget):
+        sorter = ExternalSort.ExternalSorter(memoryBudget, self.tempDir)
+        self.addCleanup(sorter.close)
+        return sorter
+
+    def assertSorted(self, actual):
+        expected = sorted(self.sightings, key=ReducedSighting.sortKey)
+        self.assertEqual([sighting.getState() for sighting in expected], [sighting.getState() for sighting in actual])
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 100
+#        Analysis - ExternalSorter
+#            inputs
+#                reduced sightings, memory budget
+#            outputs
+#                the sightings in log order
+#
+#            Happy path
+#                sightings within the budget are not spilled
+#                sightings beyond the budget are spilled and merged in the order of a stable sort
+#                runs beyond the fan-in are merged in several passes
+#                close removes the run files
+#            Sad path
+#                any other sort key is rejected
+#
+#    Happy path
+    def test100_010_ShouldSortInMemory(self):
+        sorter = self.newSorter(64 << 20)
+        for sighting in self.sightings:
+            sorter.append(sighting)
+        sorter.sort(key=ReducedSighting.sortKey)
+        self.assertEqual(0, len(sorter.runs))
+        self.assertEqual(5000, len(sorter))
+        self.assertSorted(sorter)
+
+    def test100_020_ShouldSpillAndMerge(self):
+        sorter = self.newSorter(ExternalSort.ENTRY_SIZE * ExternalSort.CHUNK_SIZE * 4)
+        for sighting in self.sightings:
+            sorter.append(sighting)
+        self.assertEqual(1, len(sorter.runs))
+        self.assertSorted(sorter)
+        self.assertSorted(sorter)
+
+    def test100_030_ShouldMergeInPasses(self):
+        sorter = self.newSorter(0)
+        for sighting in self.sightings:
+            sorter.append(sighting)
+        self.assertEqual(5, len(sorter.runs))
+        self.assertEqual(2, sorter.fanIn)
+        self.assertSorted(sorter)
+        self.assertEqual(1, len(sorter.runs))
+
+    def test100_040_ShouldRemoveRuns(self):
+        sorter = self.newSorter(0)
+        for sighting in self.sightings:
+            sorter.append(sighting)
+        sorter.close()
+        self.assertEqual([], os.listdir(self.tempDir))
+        self.assertEqual(5000, len(sorter))
+
+#    Sad path
+    def test100_910_ShouldRejectOtherKeys(self):
+        expectedDiag = self.className + "sort:"
+        sorter = self.newSorter(0)
+        with self.assertRaises(ValueError) as context:
+            sorter.sort(key=lambda sighting: sighting.body)
+        self.assertEqual(expectedDiag, context.exception.args[0][0:len(expectedDiag)])
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 200
+#        Analysis - mergeSorted
+#            inputs
+#                sorted streams of reduced sightings, e.g. the results of several files
+#            outputs
+#                one stream in log order
+#
+#            Happy path
+#                streams are merged in log order, ties in the order of the streams
+#
+#    Happy path
+    def test200_010_ShouldMergeStreams(self):
+        streams = [sorted(self.sightings[first::3], key=ReducedSighting.sortKey) for first in range(3)]
+        merged = list(ExternalSort.mergeSorted(streams))
+        expected = sorted(streams[0] + streams[1] + streams[2], key=ReducedSighting.sortKey)
+        self.assertEqual([sighting.getState() for sighting in expected], [sighting.getState() for sighting in merged])
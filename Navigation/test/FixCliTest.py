@@ -0,0 +1,127 @@
+import contextlib
+import io
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import unittest
+
+prodDirectory = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "prod")
+if prodDirectory not in sys.path:
+    sys.path.insert(0, prodDirectory)
+
+import Ephemeris as Ephemeris
+import Fix as Fix
+import FixCli as FixCli
+
+
+# CountingOutput counts the flushes of a text stream.
+class CountingOutput(io.StringIO):
+    def __init__(self):
+        io.StringIO.__init__(self)
+        self.flushes = 0
+
+    def flush(self):
+        self.flushes += 1
+        io.StringIO.flush(self)
+
+
+class FixCliTest(unittest.TestCase):
+
+    def setUp(self):
+        self.className = "FixCli."
+        self.tempDir = tempfile.mkdtemp()
+        self.fix = Fix.Fix(os.path.join(self.tempDir, "log.txt"))
+        self.fix.starCatalog = Ephemeris.cache.getStarCatalog(os.path.join(prodDirectory, "stars.txt"))
+        self.fix.ariesEphemeris = Ephemeris.cache.getAriesEphemeris(os.path.join(prodDirectory, "aries.txt"))
+        with open(os.path.join(prodDirectory, "sight.xml"), "rb") as sightingData:
+            self.document = sightingData.read()
+
+    def tearDown(self):
+        self.fix.logger.close()
+        shutil.rmtree(self.tempDir)
+
+    def stream(self, documents, batchSize=100):
+        output = CountingOutput()
+        written = FixCli.streamSightings(self.fix, [io.BytesIO(document) for document in documents],
+                                         output, batchSize)
+        return (written, output)
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 100
+#        Analysis - streamSightings
+#            inputs
+#                binary streams holding sighting documents
+#            outputs
+#                one JSON line per reduced sighting, in document order
+#
+#            Happy path
+#                nominal case:  sight.xml
+#                several streams
+#                output flushed every batchSize lines
+#            Sad path
+#                invalid sightings are counted as errors
+#                lines reduced before a malformed document are written
+#
+#    Happy path
+    def test100_010_ShouldWriteOneLinePerSighting(self):
+        written, output = self.stream([self.document])
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(2, written)
+        self.assertEqual(["Pollux", "Sirius"], [line["body"] for line in lines])
+        self.assertEqual("2017-04-09", lines[1]["date"])
+        self.assertEqual("09:30:30", lines[1]["time"])
+        self.assertEqual("45d11.9", lines[1]["altitude"])
+        self.assertEqual("-16d44.5", lines[1]["latitude"])
+        self.assertEqual("239d13.1", lines[1]["longitude"])
+
+    def test100_020_ShouldReadSeveralStreams(self):
+        written, output = self.stream([self.document, self.document])
+        self.assertEqual(4, written)
+        self.assertEqual(4, len(output.getvalue().splitlines()))
+
+    def test100_030_ShouldFlushEveryBatch(self):
+        written, output = self.stream([self.document, self.document], batchSize=1)
+        self.assertEqual(4, output.flushes)
+
+#    Sad path
+    def test100_910_ShouldCountInvalidSightings(self):
+        self.stream([self.document])
+        self.assertEqual(1, self.fix.err)
+
+    def test100_920_ShouldWriteLinesBeforeMalformedDocument(self):
+        output = CountingOutput()
+        with self.assertRaises(Exception):
+            FixCli.streamSightings(self.fix, [io.BytesIO(self.document), io.BytesIO(b"<fix><sighting>")], output)
+        self.assertEqual(2, len(output.getvalue().splitlines()))
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 200
+#        Analysis - main
+#            inputs
+#                command line with sighting files and --log
+#            outputs
+#                exit status
+#            state change
+#                the log holds one line per sighting written, then the error count
+#
+#            Happy path
+#                --log logs the reduced sightings and the error count
+#
+#    Happy path
+    def test200_010_ShouldLogSightingsAndErrors(self):
+        logFile = os.path.join(self.tempDir, "cli.txt")
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(io.StringIO()):
+            status = FixCli.main([os.path.join(prodDirectory, "sight.xml"),
+                                  "--stars", os.path.join(prodDirectory, "stars.txt"),
+                                  "--aries", os.path.join(prodDirectory, "aries.txt"), "--log", logFile])
+        self.assertEqual(0, status)
+        with open(logFile, "r") as logData:
+            logged = [re.sub(r"^LOG: \S+ \S+?(:\t| )", "", line.rstrip("\n")) for line in logData]
+        self.assertEqual(["Pollux\t2017-04-15\t23:50:14\t15d1.5\t27d59.1\t85d22.9",
+                          "Sirius\t2017-04-09\t09:30:30\t45d11.9\t-16d44.5\t239d13.1",
+                          "Sighting errors:\t1"], logged[1:])
+        self.assertEqual(2, len(output.getvalue().splitlines()))
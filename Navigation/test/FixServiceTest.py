@@ -0,0 +1,120 @@
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+prodDirectory = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "prod")
+if prodDirectory not in sys.path:
+    sys.path.insert(0, prodDirectory)
+
+import FixService as FixService
+
+
+class FixServiceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.className = "FixService."
+        self.tempDir = tempfile.mkdtemp()
+        self.service = FixService.FixService(os.path.join(prodDirectory, "stars.txt"),
+                                             os.path.join(prodDirectory, "aries.txt"),
+                                             os.path.join(self.tempDir, "log.txt"))
+        with open(os.path.join(prodDirectory, "sight.xml"), "r") as sightingData:
+            self.document = sightingData.read()
+
+    def tearDown(self):
+        self.service.close()
+        shutil.rmtree(self.tempDir)
+
+    # exchange starts the service on a free port, sends every request on one connection
+    # and returns the decoded responses.
+    def exchange(self, requests):
+        async def run():
+            server = await self.service.start("127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            responses = []
+            for request in requests:
+                writer.write((request + "\n").encode("utf-8"))
+                await writer.drain()
+                responses.append(json.loads(await reader.readline()))
+            writer.close()
+            server.close()
+            await server.wait_closed()
+            return responses
+        return asyncio.run(run())
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 100
+#        Analysis - handleRequest over the socket
+#            inputs
+#                one JSON request per line
+#            outputs
+#                one JSON response per line
+#
+#            Happy path
+#                sighting document payload
+#                list of sightings payload with defaults
+#                request longer than the default stream limit of asyncio
+#                every request logged under one log file header
+#            Sad path
+#                request without sightings
+#                line that is not JSON
+#                line longer than the line limit
+#
+#    Happy path
+    def test100_010_ShouldReduceSightingDocument(self):
+        response = self.exchange([json.dumps({"id": 1, "sightings": self.document})])[0]
+        self.assertEqual(1, response["id"])
+        self.assertEqual(["Sirius", "Pollux"], [sighting["body"] for sighting in response["sightings"]])
+        self.assertEqual("45d11.9", response["sightings"][0]["altitude"])
+        self.assertEqual(1, response["errors"])
+
+    def test100_020_ShouldReduceSightingList(self):
+        request = {"id": "a", "sightings": [{"body": "Sirius", "date": "2017-04-09", "time": "09:30:30",
+                                             "observation": "045d15.2", "height": 6.0, "temperature": 71}]}
+        response = self.exchange([json.dumps(request)])[0]
+        self.assertEqual("239d13.1", response["sightings"][0]["longitude"])
+        self.assertEqual(0, response["errors"])
+
+    def test100_030_ShouldReduceLongRequest(self):
+        sighting = self.document[self.document.index("<sighting>"):self.document.rindex("</fix>")]
+        document = "<fix>" + sighting * 200 + "</fix>"
+        self.assertGreater(len(document), 80000)
+        response = self.exchange([json.dumps({"id": 4, "sightings": document})])[0]
+        self.assertEqual(400, len(response["sightings"]))
+        self.assertEqual(200, response["errors"])
+
+    def test100_040_ShouldLogRequestsUnderOneHeader(self):
+        self.exchange([json.dumps({"id": 5, "sightings": self.document})] * 2)
+        with open(os.path.join(self.tempDir, "log.txt"), "r") as logData:
+            lines = logData.read().splitlines()
+        self.assertEqual(1, len([line for line in lines if "Log file:" in line]))
+        self.assertEqual(2, len([line for line in lines if line.endswith("Sighting errors:\t1")]))
+        self.assertEqual(4, len([line for line in lines if "Sirius" in line or "Pollux" in line]))
+
+#    Sad path
+    def test100_910_ShouldAnswerErrorOnMissingSightings(self):
+        expectedDiag = self.className + "handleRequest:"
+        response = self.exchange([json.dumps({"id": 2})])[0]
+        self.assertEqual(2, response["id"])
+        self.assertEqual(expectedDiag, response["error"][0:len(expectedDiag)])
+
+    def test100_920_ShouldKeepConnectionAfterBadLine(self):
+        responses = self.exchange(["not json", json.dumps({"id": 3, "sightings": self.document})])
+        self.assertIn("error", responses[0])
+        self.assertEqual(3, responses[1]["id"])
+
+    def test100_930_ShouldAnswerErrorOnOverlongLine(self):
+        expectedDiag = self.className + "handleClient:"
+        self.service.close()
+        self.service = FixService.FixService(os.path.join(prodDirectory, "stars.txt"),
+                                             os.path.join(prodDirectory, "aries.txt"),
+                                             os.path.join(self.tempDir, "log.txt"), lineLimit=1024)
+        responses = self.exchange([json.dumps({"id": 6, "sightings": "x" * 5000}),
+                                   json.dumps({"id": 7, "sightings": []})])
+        self.assertIsNone(responses[0]["id"])
+        self.assertEqual(expectedDiag, responses[0]["error"][0:len(expectedDiag)])
+        self.assertEqual(7, responses[1]["id"])
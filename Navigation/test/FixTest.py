@@ -0,0 +1,460 @@
+import os
+import re
+import shutil
+import sys
+import tempfile
+import unittest
+
+prodDirectory = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "prod")
+if prodDirectory not in sys.path:
+    sys.path.insert(0, prodDirectory)
+
+import Navigation.prod.Fix as Fix
+import EphemerisBinary as EphemerisBinary
+import EphemerisStore as EphemerisStore
+import Instrumentation as Instrumentation
+import ReductionCache as ReductionCache
+
+
+class FixTest(unittest.TestCase):
+
+    def setUp(self):
+        self.className = "Fix."
+        self.delta = 0.002
+        self.workingDirectory = os.getcwd()
+        self.tempDir = tempfile.mkdtemp()
+        self.logFile = os.path.join(self.tempDir, "log.txt")
+        os.chdir(prodDirectory)
+
+    def tearDown(self):
+        os.chdir(self.workingDirectory)
+        shutil.rmtree(self.tempDir)
+
+    # readLog returns the log lines with the "LOG: <timestamp>" prefix removed.
+    def readLog(self):
+        with open(self.logFile, "r") as logData:
+            return [re.sub(r"^LOG: \S+ \S+?(:\t| )", "", line.rstrip("\n")) for line in logData]
+
+    def newFix(self):
+        aFix = Fix.Fix(self.logFile)
+        aFix.setSightingFile("sight.xml")
+        aFix.setAriesFile("aries.txt")
+        aFix.setStarFile("stars.txt")
+        return aFix
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 100
+#        Analysis - getSightings
+#            inputs
+#                sighting, aries and star files set on the instance
+#            outputs
+#                approximate latitude and longitude
+#            state change
+#                one log line per valid sighting in chronological order, then the error count
+#
+#            Happy path
+#                nominal case:  sight.xml with the shipped catalogs
+#                sight.xml with the catalogs imported into a SQLite ephemeris store
+#                store dates are prefetched one batch of sightings at a time
+#                sightings reduced in batches of columns match those reduced one at a time
+#            Sad path
+#                unknown body is counted as a sighting error
+#                unknown body is recorded in the error ledger with its index
+#                errors past the error limit are only counted
+#                star and aries files not set
+#
+#    Happy path
+    def test100_010_ShouldLogSightingsInChronologicalOrder(self):
+        self.newFix().getSightings()
+        self.assertEqual(["Sirius\t2017-04-09\t09:30:30\t45d11.9\t-16d44.5\t239d13.1",
+                          "Pollux\t2017-04-15\t23:50:14\t15d1.5\t27d59.1\t85d22.9",
+                          "Sighting errors:\t1"], self.readLog()[4:])
+
+    def test100_020_ShouldLogSameSightingsFromBinaryEphemeris(self):
+        binaryFile = os.path.join(self.tempDir, "ephemeris.bin")
+        EphemerisBinary.compileEphemeris("stars.txt", "aries.txt", binaryFile)
+        aFix = Fix.Fix(self.logFile)
+        aFix.setSightingFile("sight.xml")
+        aFix.setEphemerisFile(binaryFile)
+        aFix.getSightings()
+        self.assertEqual(["Sirius\t2017-04-09\t09:30:30\t45d11.9\t-16d44.5\t239d13.1",
+                          "Pollux\t2017-04-15\t23:50:14\t15d1.5\t27d59.1\t85d22.9",
+                          "Sighting errors:\t1"], self.readLog()[3:])
+
+    def test100_030_ShouldLogSameSightingsFromEphemerisStore(self):
+        storeFile = os.path.join(self.tempDir, "ephemeris.db")
+        store = EphemerisStore.EphemerisStore(storeFile)
+        store.importText("stars.txt", "aries.txt")
+        store.close()
+        aFix = Fix.Fix(self.logFile)
+        aFix.setSightingFile("sight.xml")
+        aFix.setEphemerisStore(storeFile)
+        aFix.getSightings()
+        self.assertEqual(["Sirius\t2017-04-09\t09:30:30\t45d11.9\t-16d44.5\t239d13.1",
+                          "Pollux\t2017-04-15\t23:50:14\t15d1.5\t27d59.1\t85d22.9",
+                          "Sighting errors:\t1"], self.readLog()[3:])
+
+    def test100_040_ShouldPrefetchStoreDatesPerBatch(self):
+        storeFile = os.path.join(self.tempDir, "ephemeris.db")
+        store = EphemerisStore.EphemerisStore(storeFile)
+        store.importText("stars.txt", "aries.txt")
+        store.close()
+        aFix = Fix.Fix(self.logFile)
+        aFix.PREFETCH_BATCH = 2
+        aFix.setSightingFile("sight.xml")
+        aFix.setEphemerisStore(storeFile)
+        prefetched = []
+        prefetch = aFix.starCatalog.prefetch
+        aFix.starCatalog.prefetch = lambda dates: prefetched.append(sorted(dates)) or prefetch(dates)
+        aFix.getSightings()
+        self.assertEqual([["04/15/17", "04/17/17"], ["04/09/17"]], prefetched)
+        self.assertEqual(["Sirius\t2017-04-09\t09:30:30\t45d11.9\t-16d44.5\t239d13.1",
+                          "Pollux\t2017-04-15\t23:50:14\t15d1.5\t27d59.1\t85d22.9",
+                          "Sighting errors:\t1"], self.readLog()[3:])
+
+    def test100_050_ShouldReduceBatchesLikeSingleSightings(self):
+        aFix = self.newFix()
+        aFix.PREFETCH_BATCH = 2
+        batchResults = aFix.getResults()
+        singleFix = Fix.Fix(os.path.join(self.tempDir, "single.txt"), stats=Instrumentation.Stats())
+        singleFix.setSightingFile("sight.xml")
+        singleFix.setAriesFile("aries.txt")
+        singleFix.setStarFile("stars.txt")
+        singleResults = singleFix.getResults()
+        self.assertEqual(list(singleResults.sightings), list(batchResults.sightings))
+        self.assertEqual(list(singleFix.errors), list(aFix.errors))
+        self.assertEqual(singleResults.position, batchResults.position)
+
+#    Sad path
+    def test100_910_ShouldCountUnknownBodyAsError(self):
+        aFix = self.newFix()
+        aFix.getSightings()
+        self.assertEqual(1, aFix.err)
+
+    def test100_920_ShouldRecordUnknownBodyInLedger(self):
+        aFix = self.newFix()
+        aFix.getSightings()
+        self.assertEqual([{"index": 0, "field": "body", "code": "star-not-found",
+                           "message": "Sighting file : Some data not match"}], list(aFix.errors))
+        self.assertEqual("Sighting file : Some data not match", aFix.errString)
+
+    def test100_930_ShouldOnlyCountErrorsPastLimit(self):
+        aFix = Fix.Fix(self.logFile, errorLimit=0)
+        aFix.setSightingFile("sight.xml")
+        aFix.setAriesFile("aries.txt")
+        aFix.setStarFile("stars.txt")
+        aFix.getSightings()
+        self.assertEqual(1, aFix.err)
+        self.assertEqual([], list(aFix.errors))
+        self.assertEqual("Sighting errors:\t1", self.readLog()[-1])
+
+    def test100_940_ShouldRaiseExceptionWithoutStarAndAriesFiles(self):
+        expectedDiag = self.className + "getSightings:"
+        aFix = Fix.Fix(self.logFile)
+        aFix.setSightingFile("sight.xml")
+        with self.assertRaises(ValueError) as context:
+            aFix.getSightings()
+        self.assertEqual(expectedDiag, context.exception.args[0][0:len(expectedDiag)])
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 200
+#        Analysis - getSightings(incremental=True)
+#            inputs
+#                sighting file that grows by appended <sighting> elements
+#            outputs
+#                approximate latitude and longitude
+#            state change
+#                only new sightings are logged; Fix.sightings holds the merged, sorted sightings
+#                checkpoint next to the log records how far the file was processed
+#
+#            Happy path
+#                first run is a full run
+#                second run after an append reduces only the new sighting
+#                earlier sightings are kept as they were written, new ones appended
+#            Sad path
+#                earlier content changed falls back to a full run
+#                what a failed run appended to the checkpoint is cut off
+#                content changed far before the checkpoint, in place, falls back to a full run
+#
+    def copySightingFile(self):
+        sightingFile = os.path.join(self.tempDir, "sight.xml")
+        shutil.copyfile("sight.xml", sightingFile)
+        return sightingFile
+
+    def appendSighting(self, sightingFile, body, time):
+        with open(sightingFile, "rb") as sightingData:
+            content = sightingData.read()
+        sighting = ("<sighting><body>" + body + "</body><date>2017-04-09</date><time>" + time +
+                    "</time><observation>030d00.0</observation></sighting>").encode("utf-8")
+        content = content.replace(b"</fix>", sighting + b"</fix>")
+        with open(sightingFile, "wb") as sightingData:
+            sightingData.write(content)
+
+    def runIncremental(self, sightingFile):
+        aFix = Fix.Fix(self.logFile)
+        aFix.setSightingFile(sightingFile)
+        aFix.setAriesFile("aries.txt")
+        aFix.setStarFile("stars.txt")
+        aFix.getSightings(incremental=True)
+        return aFix
+
+#    Happy path
+    def test200_010_ShouldReduceOnlyAppendedSightings(self):
+        sightingFile = self.copySightingFile()
+        self.runIncremental(sightingFile)
+        self.appendSighting(sightingFile, "Canopus", "08:00:00")
+        aFix = self.runIncremental(sightingFile)
+        self.assertEqual(["Canopus", "Sirius", "Pollux"], [sighting["body"] for sighting in aFix.sightings])
+        self.assertEqual(1, aFix.err)
+        logged = [line for line in self.readLog() if line.startswith(("Sirius", "Pollux", "Canopus"))]
+        self.assertEqual(["Sirius", "Pollux", "Canopus"], [line.split("\t")[0] for line in logged])
+
+    def test200_020_ShouldAppendNewSightingsToCheckpoint(self):
+        sightingFile = self.copySightingFile()
+        self.runIncremental(sightingFile)
+        with open(self.logFile + ".checkpoint.sightings", "rb") as sightingsData:
+            earlier = sightingsData.read()
+        self.appendSighting(sightingFile, "Canopus", "08:00:00")
+        aFix = self.runIncremental(sightingFile)
+        with open(self.logFile + ".checkpoint.sightings", "rb") as sightingsData:
+            sightings = sightingsData.read()
+        self.assertEqual(earlier, sightings[0:len(earlier)])
+        self.assertEqual(b"Canopus", sightings[len(earlier):].split(b"\"")[1])
+        fullFix = Fix.Fix(os.path.join(self.tempDir, "full.txt"))
+        fullFix.setSightingFile(sightingFile)
+        fullFix.setAriesFile("aries.txt")
+        fullFix.setStarFile("stars.txt")
+        self.assertEqual(fullFix.getSightings(), aFix.getSightings(incremental=True))
+
+#    Sad path
+    def test200_910_ShouldRunInFullWhenEarlierContentChanged(self):
+        sightingFile = self.copySightingFile()
+        self.runIncremental(sightingFile)
+        with open(sightingFile, "rb") as sightingData:
+            content = sightingData.read()
+        with open(sightingFile, "wb") as sightingData:
+            sightingData.write(content.replace(b"09:30:30", b"09:31:30"))
+        aFix = self.runIncremental(sightingFile)
+        self.assertEqual(["Sirius", "Pollux"], [sighting["body"] for sighting in aFix.sightings])
+        self.assertEqual("09:31:30", aFix.sightings[0]["tm"])
+        self.assertEqual(4, len([line for line in self.readLog() if line.startswith(("Sirius", "Pollux"))]))
+
+    def test200_920_ShouldCutOffWhatFailedRunAppended(self):
+        sightingFile = self.copySightingFile()
+        self.runIncremental(sightingFile)
+        for suffix in (".checkpoint.sightings", ".checkpoint.columns"):
+            with open(self.logFile + suffix, "ab") as checkpointData:
+                checkpointData.write(b"[\"Vega\", 0, 0.0, 0.0, 0.0, \"0d0.0\"]\n")
+        aFix = self.runIncremental(sightingFile)
+        self.assertEqual(["Sirius", "Pollux"], [sighting["body"] for sighting in aFix.sightings])
+        with open(self.logFile + ".checkpoint.sightings", "rb") as sightingsData:
+            self.assertEqual(2, len(sightingsData.read().splitlines()))
+        self.assertEqual(2 * 3 * 8, os.path.getsize(self.logFile + ".checkpoint.columns"))
+
+    def test200_930_ShouldRunInFullWhenContentChangedFarBeforeCheckpoint(self):
+        sightingFile = self.copySightingFile()
+        with open(sightingFile, "rb") as sightingData:
+            content = sightingData.read()
+        with open(sightingFile, "wb") as sightingData:
+            sightingData.write(content.replace(b"</sighting>", b"</sighting>" + b" " * 100000, 2))
+        self.runIncremental(sightingFile)
+        with open(sightingFile, "r+b") as sightingData:
+            content = sightingData.read()
+            sightingData.seek(content.index(b"015d04.9"))
+            sightingData.write(b"016d04.9")
+        self.appendSighting(sightingFile, "Canopus", "08:00:00")
+        aFix = self.runIncremental(sightingFile)
+        fullFix = Fix.Fix(os.path.join(self.tempDir, "full.txt"))
+        fullFix.setSightingFile(sightingFile)
+        fullFix.setAriesFile("aries.txt")
+        fullFix.setStarFile("stars.txt")
+        fullFix.getSightings()
+        self.assertEqual(list(fullFix.sightings), list(aFix.sightings))
+        self.assertEqual(4, len([line for line in self.readLog() if line.startswith(("Sirius", "Pollux"))]))
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 300
+#        Analysis - getSightings with stats
+#            inputs
+#                Instrumentation.Stats passed to the constructor
+#            outputs
+#                approximate latitude and longitude, unchanged
+#            state change
+#                stats hold the time and calls of every stage and the sighting and error counts
+#
+#            Happy path
+#                every stage is timed
+#                callback is called at the end of every stage
+#                memory peaks are recorded on request
+#
+#    Happy path
+    def test300_010_ShouldTimeEveryStage(self):
+        stats = Instrumentation.Stats()
+        aFix = Fix.Fix(self.logFile, stats=stats)
+        aFix.setSightingFile("sight.xml")
+        aFix.setAriesFile("aries.txt")
+        aFix.setStarFile("stars.txt")
+        self.assertEqual(self.newFix().getSightings(), aFix.getSightings())
+        report = stats.report()
+        self.assertEqual({"load", "parse", "reduce", "lookup", "sort", "log", "fix"}, set(report["stages"]))
+        self.assertEqual(4, report["stages"]["parse"]["calls"])
+        self.assertEqual(3, report["stages"]["reduce"]["calls"])
+        self.assertEqual({"sightings": 2, "errors": 1}, report["counters"])
+
+    def test300_020_ShouldCallCallbackPerStage(self):
+        stages = []
+        aFix = Fix.Fix(self.logFile, stats=Instrumentation.Stats(callback=lambda name, seconds, peak: stages.append(name)))
+        aFix.setSightingFile("sight.xml")
+        aFix.setAriesFile("aries.txt")
+        aFix.setStarFile("stars.txt")
+        aFix.getSightings()
+        self.assertEqual("load", stages[0])
+        self.assertEqual(["sort", "log", "fix", "log"], stages[-4:])
+
+    def test300_030_ShouldRecordMemoryPeaks(self):
+        stats = Instrumentation.Stats(memory=True)
+        aFix = Fix.Fix(self.logFile, stats=stats)
+        aFix.setSightingFile("sight.xml")
+        aFix.setAriesFile("aries.txt")
+        aFix.setStarFile("stars.txt")
+        aFix.getSightings()
+        self.assertTrue(all(stage["peakMemory"] is not None for stage in stats.report()["stages"].values()))
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 400
+#        Analysis - setAnalyticAries
+#            inputs
+#                sighting and star files, no aries file
+#            outputs
+#                approximate latitude and longitude
+#            state change
+#                GHA of Aries computed from the sighting time
+#
+#            Happy path
+#                GHA of the true 2017 sky; aries.txt lists the 2016 GHAs under 2017 dates
+#
+#    Happy path
+    def test400_010_ShouldComputeGHAOfAries(self):
+        aFix = Fix.Fix(self.logFile)
+        aFix.setSightingFile("sight.xml")
+        aFix.setStarFile("stars.txt")
+        aFix.setAnalyticAries()
+        aFix.getSightings()
+        self.assertEqual(["Aries file:\tanalytic ",
+                          "Sirius\t2017-04-09\t09:30:30\t45d11.9\t-16d44.5\t238d58.7",
+                          "Pollux\t2017-04-15\t23:50:14\t15d1.5\t27d59.1\t85d18.1",
+                          "Sighting errors:\t1"], self.readLog()[3:])
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 500
+#        Analysis - getSightings with a reduction cache
+#            inputs
+#                sighting, aries and star files, ReductionCache
+#            outputs
+#                approximate latitude and longitude
+#            state change
+#                reduced sightings are kept in the cache and read back in later runs
+#
+#            Happy path
+#                second run reads every reduced sighting from the cache and logs the same lines;
+#                the sighting in error is not cached
+#            Sad path
+#                sightings are reduced again against another ephemeris
+#
+#    Happy path
+    def test500_010_ShouldReadSightingsFromCache(self):
+        cache = ReductionCache.ReductionCache(os.path.join(self.tempDir, "reductions.db"))
+        self.addCleanup(cache.close)
+        for run in range(2):
+            aFix = Fix.Fix(self.logFile, reductionCache=cache)
+            aFix.setSightingFile("sight.xml")
+            aFix.setAriesFile("aries.txt")
+            aFix.setStarFile("stars.txt")
+            aFix.getSightings()
+        self.assertEqual((2, 4), (cache.hits, cache.misses))
+        self.assertEqual(self.readLog()[4:7], self.readLog()[11:14])
+
+#    Sad path
+    def test500_910_ShouldReduceAgainAgainstOtherEphemeris(self):
+        cache = ReductionCache.ReductionCache(os.path.join(self.tempDir, "reductions.db"))
+        self.addCleanup(cache.close)
+        aFix = Fix.Fix(self.logFile, reductionCache=cache)
+        aFix.setSightingFile("sight.xml")
+        aFix.setAriesFile("aries.txt")
+        aFix.setStarFile("stars.txt")
+        aFix.getSightings()
+        aFix = Fix.Fix(self.logFile, reductionCache=cache)
+        aFix.setSightingFile("sight.xml")
+        aFix.setStarFile("stars.txt")
+        aFix.setAnalyticAries()
+        aFix.getSightings()
+        self.assertEqual((0, 6), (cache.hits, cache.misses))
+        self.assertEqual("Sirius\t2017-04-09\t09:30:30\t45d11.9\t-16d44.5\t238d58.7", self.readLog()[-3])
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 600
+#        Analysis - getSightings with a sort budget
+#            inputs
+#                sighting, aries and star files, memory budget of the sort in bytes
+#            outputs
+#                approximate latitude and longitude
+#            state change
+#                reduced sightings are sorted through ExternalSort and logged in chronological order
+#
+#            Happy path
+#                the smallest budget logs the same lines and gives the same fix as an in-memory sort
+#
+#    Happy path
+    def test600_010_ShouldLogSameSightingsWithSortBudget(self):
+        expected = self.newFix().getSightings()
+        aFix = Fix.Fix(self.logFile, sortBudget=0)
+        aFix.setSightingFile("sight.xml")
+        aFix.setAriesFile("aries.txt")
+        aFix.setStarFile("stars.txt")
+        self.assertEqual(expected, aFix.getSightings())
+        self.assertEqual(2, len(aFix.sightings))
+        self.assertEqual(["Sirius\t2017-04-09\t09:30:30\t45d11.9\t-16d44.5\t239d13.1",
+                          "Pollux\t2017-04-15\t23:50:14\t15d1.5\t27d59.1\t85d22.9",
+                          "Sighting errors:\t1"], self.readLog()[-3:])
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 700
+#        Analysis - getResults
+#            inputs
+#                sighting, aries and star files set on the instance
+#            outputs
+#                FixResults: reduced sightings in chronological order, errors, position in degrees
+#
+#            Happy path
+#                results hold the numbers and strings of the logged lines
+#                without a log file no log is written
+#            Sad path
+#                incremental run without a log file
+#
+#    Happy path
+    def test700_010_ShouldReturnStructuredResults(self):
+        with self.newFix().getResults() as results:
+            self.assertEqual(["Sirius", "Pollux"], [sighting.body for sighting in results])
+            sirius = list(results)[0]
+            self.assertAlmostEqual(239 + 13.1 / 60, sirius.ghaObservation, delta=self.delta)
+            self.assertEqual("45d11.9", sirius.altitude)
+            self.assertEqual(1, results.err)
+            self.assertEqual(self.newFix().getSightings(), (results.approximateLatitude, results.approximateLongitude))
+
+    def test700_020_ShouldSkipLogWithoutLogFile(self):
+        aFix = Fix.Fix(None)
+        aFix.setSightingFile("sight.xml")
+        aFix.setAriesFile("aries.txt")
+        aFix.setStarFile("stars.txt")
+        with aFix.getResults() as results:
+            self.assertEqual(2, len(results))
+        self.assertEqual([], os.listdir(self.tempDir))
+
+#    Sad path
+    def test700_910_ShouldRejectIncrementalRunWithoutLogFile(self):
+        expectedDiag = self.className + "getResults:"
+        aFix = Fix.Fix(None)
+        aFix.setSightingFile("sight.xml")
+        with self.assertRaises(ValueError) as context:
+            aFix.getResults(incremental=True)
+        self.assertEqual(expectedDiag, context.exception.args[0][0:len(expectedDiag)])
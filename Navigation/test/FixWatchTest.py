@@ -0,0 +1,144 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+prodDirectory = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "prod")
+if prodDirectory not in sys.path:
+    sys.path.insert(0, prodDirectory)
+
+import FixWatch as FixWatch
+
+
+class FixWatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.className = "DirectoryWatch."
+        self.tempDir = tempfile.mkdtemp()
+        self.spoolDirectory = os.path.join(self.tempDir, "spool")
+        os.mkdir(self.spoolDirectory)
+        self.logFile = os.path.join(self.tempDir, "log.txt")
+        with open(os.path.join(prodDirectory, "sight.xml"), "r") as sightingData:
+            self.document = sightingData.read()
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def newWatch(self, **options):
+        watch = FixWatch.DirectoryWatch(self.spoolDirectory, os.path.join(prodDirectory, "stars.txt"),
+                                        os.path.join(prodDirectory, "aries.txt"), self.logFile, debounce=0.05, **options)
+        self.addCleanup(watch.close)
+        return watch
+
+    def drop(self, name, document=None):
+        with open(os.path.join(self.spoolDirectory, name), "w") as sightingData:
+            sightingData.write(self.document if document is None else document)
+
+    # stepUntil method steps the watch until it has reduced files or the deadline passes.
+    def stepUntil(self, watch, seconds=2.0):
+        deadline = time.monotonic() + seconds
+        results = []
+        while len(results) == 0 and time.monotonic() < deadline:
+            results = watch.step(0.1)
+        return results
+
+    def readLog(self):
+        with open(self.logFile, "r") as logData:
+            return [line.split(":\t", 1)[1].rstrip("\n") if ":\t" in line else line for line in logData]
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 100
+#        Analysis - DirectoryWatch
+#            inputs
+#                spool directory, star and aries files, log file
+#            outputs
+#                summary of every sighting file reduced
+#            state change
+#                reduced sightings are appended to the log file
+#
+#            Happy path
+#                dropped file is reduced within a second, with inotify and with polling
+#                changed file is reduced again, unchanged file is not
+#                files already in the directory are reduced with existing=True
+#                dots in the directory and file names
+#                only the sightings appended to a file already reduced are logged
+#            Sad path
+#                malformed file is reported and retried once it changes
+#                missing directory
+#
+#    Happy path
+    def test100_010_ShouldReduceDroppedFile(self):
+        watch = self.newWatch()
+        if sys.platform.startswith("linux"):
+            self.assertIsInstance(watch.watcher, FixWatch.InotifyWatcher)
+        started = time.monotonic()
+        self.drop("day1.xml")
+        results = self.stepUntil(watch)
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(1, len(results))
+        self.assertEqual(os.path.join(self.spoolDirectory, "day1.xml"), results[0]["sightingFile"])
+        self.assertEqual(1, results[0]["errors"])
+        self.assertIn("Sirius\t2017-04-09\t09:30:30\t45d11.9\t-16d44.5\t239d13.1", self.readLog())
+
+    def test100_020_ShouldReduceDroppedFileByPolling(self):
+        watch = self.newWatch(polling=True)
+        self.assertIsInstance(watch.watcher, FixWatch.PollingWatcher)
+        started = time.monotonic()
+        self.drop("day1.xml")
+        self.assertEqual(1, len(self.stepUntil(watch)))
+        self.assertLess(time.monotonic() - started, 1.0)
+
+    def test100_030_ShouldReduceOnlyChangedFiles(self):
+        watch = self.newWatch()
+        self.drop("day1.xml")
+        self.stepUntil(watch)
+        open(os.path.join(self.spoolDirectory, "day1.xml"), "a").close()
+        self.assertEqual([], self.stepUntil(watch, 0.3))
+        self.drop("day1.xml", self.document.replace("</fix>", "<sighting><body>Sirius</body></sighting></fix>"))
+        self.assertEqual(2, self.stepUntil(watch)[0]["errors"])
+
+    def test100_040_ShouldReduceExistingFiles(self):
+        self.drop("day1.xml")
+        self.drop("notes.txt")
+        self.assertEqual([], self.stepUntil(self.newWatch(), 0.3))
+        results = self.stepUntil(self.newWatch(existing=True))
+        self.assertEqual([os.path.join(self.spoolDirectory, "day1.xml")], [result["sightingFile"] for result in results])
+
+    def test100_050_ShouldReduceDottedNames(self):
+        self.spoolDirectory = os.path.join(self.tempDir, "spool.d")
+        os.mkdir(self.spoolDirectory)
+        self.drop("day1.part1.xml")
+        results = self.newWatch(existing=True).step(0.1)
+        self.assertEqual(1, len(results))
+        self.assertIsNone(results[0]["failure"])
+        self.assertEqual(1, results[0]["errors"])
+
+    def test100_060_ShouldLogOnlyAppendedSightings(self):
+        watch = self.newWatch()
+        self.drop("day1.xml")
+        self.stepUntil(watch)
+        self.drop("day1.xml", self.document.replace("</fix>", "<sighting><body>Canopus</body><date>2017-04-09</date>"
+                                                    "<time>08:00:00</time><observation>030d00.0</observation>"
+                                                    "</sighting></fix>"))
+        results = self.stepUntil(watch)
+        self.assertIsNone(results[0]["failure"])
+        self.assertEqual(3, results[0]["sightings"])
+        logged = [line.split("\t")[0] for line in self.readLog() if line.startswith(("Sirius", "Pollux", "Canopus"))]
+        self.assertEqual(["Sirius", "Pollux", "Canopus"], logged)
+        self.assertTrue(os.path.exists(os.path.join(self.logFile + ".checkpoints", "day1.xml.checkpoint")))
+
+#    Sad path
+    def test100_910_ShouldRetryMalformedFile(self):
+        watch = self.newWatch()
+        self.drop("day1.xml", self.document[0:len(self.document) // 2])
+        self.assertIsNotNone(self.stepUntil(watch)[0]["failure"])
+        self.drop("day1.xml")
+        self.assertIsNone(self.stepUntil(watch)[0]["failure"])
+
+    def test100_920_ShouldRaiseExceptionOnMissingDirectory(self):
+        expectedDiag = self.className + "__init__:"
+        with self.assertRaises(ValueError) as context:
+            FixWatch.DirectoryWatch(os.path.join(self.tempDir, "missing"), "stars.txt", "aries.txt")
+        self.assertEqual(expectedDiag, context.exception.args[0][0:len(expectedDiag)])
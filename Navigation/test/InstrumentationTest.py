@@ -0,0 +1,76 @@
+import time
+import tracemalloc
+import unittest
+import Navigation.prod.Instrumentation as Instrumentation
+
+
+class InstrumentationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.className = "Instrumentation."
+
+    def tearDown(self):
+        pass
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 100
+#        Analysis - Stats
+#            inputs
+#                stages entered through stage, iterate and wrap
+#            outputs
+#                report with seconds, calls and peaks per stage and the counters
+#
+#            Happy path
+#                stage accumulates time and calls
+#                iterate times every step including the last
+#                wrap returns the function result
+#                nested stage peak is part of the enclosing stage peak
+#                counters add up
+#            Sad path
+#                stage that raises is still timed
+#
+#    Happy path
+    def test100_010_ShouldAccumulateStage(self):
+        stats = Instrumentation.Stats()
+        for index in range(2):
+            with stats.stage("sleep"):
+                time.sleep(0.01)
+        stage = stats.report()["stages"]["sleep"]
+        self.assertEqual(2, stage["calls"])
+        self.assertTrue(stage["seconds"] >= 0.02)
+        self.assertIsNone(stage["peakMemory"])
+
+    def test100_020_ShouldTimeEveryStep(self):
+        stats = Instrumentation.Stats()
+        self.assertEqual([1, 2, 3], list(stats.iterate("read", [1, 2, 3])))
+        self.assertEqual(4, stats.report()["stages"]["read"]["calls"])
+
+    def test100_030_ShouldReturnWrappedResult(self):
+        stats = Instrumentation.Stats()
+        self.assertEqual(5, stats.wrap("add", lambda a, b: a + b)(2, 3))
+        self.assertEqual(1, stats.report()["stages"]["add"]["calls"])
+
+    def test100_040_ShouldIncludeNestedPeak(self):
+        stats = Instrumentation.Stats(memory=True)
+        with stats.stage("outer"):
+            with stats.stage("inner"):
+                block = bytearray(1000000)
+                del block
+        peaks = stats.report()["stages"]
+        self.assertTrue(peaks["inner"]["peakMemory"] >= 1000000)
+        self.assertTrue(peaks["outer"]["peakMemory"] >= peaks["inner"]["peakMemory"])
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test100_050_ShouldAddCounters(self):
+        stats = Instrumentation.Stats()
+        stats.count("errors")
+        stats.count("errors", 2)
+        self.assertEqual({"errors": 3}, stats.report()["counters"])
+
+#    Sad path
+    def test100_910_ShouldTimeRaisingStage(self):
+        stats = Instrumentation.Stats()
+        with self.assertRaises(ValueError):
+            with stats.stage("fail"):
+                raise ValueError("fail")
+        self.assertEqual(1, stats.report()["stages"]["fail"]["calls"])
@@ -0,0 +1,67 @@
+import os
+import re
+import shutil
+import tempfile
+import unittest
+import Navigation.prod.LogWriter as LogWriter
+
+
+class LogWriterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.className = "LogWriter."
+        self.tempDir = tempfile.mkdtemp()
+        self.logFile = os.path.join(self.tempDir, "log.txt")
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def readLog(self):
+        with open(self.logFile, "r") as logData:
+            return logData.read()
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 100
+#        Analysis - log
+#            inputs
+#                text following the timestamp
+#            outputs
+#                none
+#            state change
+#                "LOG: <local time to the second><text>" line appended to the log file
+#
+#            Happy path
+#                nominal case:  one line, written on close
+#                small buffer flushes before close
+#                background writer produces the same lines
+#            Sad path
+#                log file in a missing directory
+#
+#    Happy path
+    def test100_010_ShouldWriteTimestampedLine(self):
+        aLog = LogWriter.LogWriter(self.logFile)
+        aLog.log(" Sighting errors:\t0")
+        aLog.close()
+        self.assertRegex(self.readLog(), r"^LOG: \d{4}-\d\d-\d\d \d\d:\d\d:\d\d[+-]\d\d:\d\d Sighting errors:\t0\n$")
+
+    def test100_020_ShouldFlushFullBuffer(self):
+        aLog = LogWriter.LogWriter(self.logFile, bufferSize=10)
+        aLog.log(":\tSirius")
+        aLog.logFile.flush()
+        self.assertEqual(1, len(self.readLog().splitlines()))
+        aLog.close()
+
+    def test100_030_ShouldWriteSameLinesInBackground(self):
+        aLog = LogWriter.LogWriter(self.logFile, bufferSize=64, background=True)
+        for index in range(100):
+            aLog.log(":\t" + str(index))
+        aLog.close()
+        lines = [re.sub(r"^LOG: \S+ \S+?:\t", "", line) for line in self.readLog().splitlines()]
+        self.assertEqual([str(index) for index in range(100)], lines)
+
+#    Sad path
+    def test100_910_ShouldRaiseExceptionOnMissingDirectory(self):
+        expectedDiag = self.className + "__init__:"
+        with self.assertRaises(ValueError) as context:
+            LogWriter.LogWriter(os.path.join(self.tempDir, "missing", "log.txt"))
+        self.assertEqual(expectedDiag, context.exception.args[0][0:len(expectedDiag)])
@@ -0,0 +1,128 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+prodDirectory = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "prod")
+if prodDirectory not in sys.path:
+    sys.path.insert(0, prodDirectory)
+
+import Fix as Fix
+import Metrics as Metrics
+
+
+class MetricsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.className = "Metrics."
+        self.workingDirectory = os.getcwd()
+        self.tempDir = tempfile.mkdtemp()
+        os.chdir(prodDirectory)
+
+    def tearDown(self):
+        os.chdir(self.workingDirectory)
+        shutil.rmtree(self.tempDir)
+
+    def runFix(self, metrics):
+        aFix = Fix.Fix(os.path.join(self.tempDir, "log.txt"), metrics=metrics)
+        aFix.setSightingFile("sight.xml")
+        aFix.setAriesFile("aries.txt")
+        aFix.setStarFile("stars.txt")
+        return aFix.getSightings()
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 100
+#        Analysis - Histogram
+#            inputs
+#                seconds observed
+#            outputs
+#                cumulated bucket counts, sum and count
+#
+#            Happy path
+#                an observation on a bound is counted in that bucket
+#                observations above every bound are counted in +inf only
+#
+#    Happy path
+    def test100_010_ShouldCumulateBuckets(self):
+        histogram = Metrics.Histogram()
+        for seconds in (0.001, 0.002, 60.0):
+            histogram.observe(seconds)
+        buckets = dict(histogram.getBuckets())
+        self.assertEqual(1, buckets[0.001])
+        self.assertEqual(2, buckets[0.005])
+        self.assertEqual(2, buckets[10.0])
+        self.assertEqual(3, buckets[float("inf")])
+        self.assertEqual(3, histogram.count)
+        self.assertAlmostEqual(60.003, histogram.sum)
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 200
+#        Analysis - Metrics of Fix runs
+#            inputs
+#                Fix runs on sight.xml with the shipped catalogs
+#            outputs
+#                snapshot, Prometheus text and exported files
+#
+#            Happy path
+#                runs, sightings, rejections per reason, stage latencies and bytes read are counted
+#                Prometheus text holds counters and histograms
+#                export after every run, as JSON for a .json file
+#                export on an interval
+#            Sad path
+#                export file cannot be written
+#
+#    Happy path
+    def test200_010_ShouldCountRuns(self):
+        metrics = Metrics.Metrics()
+        self.runFix(metrics)
+        self.runFix(metrics)
+        snapshot = metrics.getSnapshot()
+        self.assertEqual(2, snapshot["runs"])
+        self.assertEqual(6, snapshot["sightings"])
+        self.assertEqual(2, snapshot["rejections"]["star-not-found"])
+        self.assertEqual(0, snapshot["rejections"]["missing-tag"])
+        self.assertEqual(6, snapshot["stages"]["reduce"]["count"])
+        self.assertEqual(2 * os.path.getsize("sight.xml"), snapshot["bytesRead"]["sightings"])
+        self.assertEqual(4, snapshot["ephemerisCache"]["hits"] + snapshot["ephemerisCache"]["misses"])
+
+    def test200_020_ShouldWritePrometheusText(self):
+        metrics = Metrics.Metrics()
+        self.runFix(metrics)
+        lines = metrics.getPrometheus().splitlines()
+        self.assertIn("# TYPE fix_stage_latency_seconds histogram", lines)
+        self.assertIn("fix_runs_total 1", lines)
+        self.assertIn("fix_sightings_rejected_total{reason=\"star-not-found\"} 1", lines)
+        self.assertIn("fix_stage_latency_seconds_bucket{stage=\"reduce\",le=\"+Inf\"} 3", lines)
+        self.assertIn("fix_stage_latency_seconds_count{stage=\"reduce\"} 3", lines)
+
+    def test200_030_ShouldExportAfterEveryRun(self):
+        textFile = os.path.join(self.tempDir, "fix.prom")
+        jsonFile = os.path.join(self.tempDir, "fix.json")
+        self.runFix(Metrics.Metrics(textFile))
+        metrics = Metrics.Metrics(jsonFile)
+        self.runFix(metrics)
+        with open(textFile, "r") as textData:
+            self.assertIn("fix_sightings_processed_total 3\n", textData.read())
+        with open(jsonFile, "r") as jsonData:
+            self.assertEqual(1, json.load(jsonData)["runs"])
+        self.assertFalse(os.path.exists(jsonFile + ".tmp"))
+
+    def test200_040_ShouldExportOnInterval(self):
+        textFile = os.path.join(self.tempDir, "fix.prom")
+        metrics = Metrics.Metrics(textFile, interval=0.01)
+        self.runFix(metrics)
+        self.assertIsNotNone(metrics.exporter)
+        metrics.close()
+        self.assertIsNone(metrics.exporter)
+        with open(textFile, "r") as textData:
+            self.assertIn("fix_runs_total 1\n", textData.read())
+
+#    Sad path
+    def test200_910_ShouldRaiseExceptionOnUnwritableFile(self):
+        expectedDiag = self.className + "export:"
+        metrics = Metrics.Metrics()
+        with self.assertRaises(ValueError) as context:
+            metrics.export(os.path.join(self.tempDir, "missing", "fix.prom"))
+        self.assertEqual(expectedDiag, context.exception.args[0][0:len(expectedDiag)])
@@ -0,0 +1,98 @@
+from math import asin, cos, degrees, radians, sin
+import unittest
+import Navigation.prod.PositionSolver as PositionSolver
+
+
+class PositionSolverTest(unittest.TestCase):
+
+    def setUp(self):
+        self.delta = 0.002      # accuracy within 1/10 minute
+        self.declinations = [-16.7, 27.9, 45.0, 10.0]
+        self.ghas = [100.0, 170.0, 40.0, 80.0]
+
+    def tearDown(self):
+        pass
+
+    # altitudesAt returns the exact altitudes of the test bodies seen from the received position.
+    def altitudesAt(self, latitude, longitude):
+        altitudes = []
+        for declination, gha in zip(self.declinations, self.ghas):
+            lha = radians(gha + longitude)
+            altitudes.append(degrees(asin(sin(radians(latitude)) * sin(radians(declination)) +
+                                          cos(radians(latitude)) * cos(radians(declination)) * cos(lha))))
+        return altitudes
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 100
+#        Analysis - solvePosition
+#            inputs
+#                declinations, GHAs and observed altitudes in degrees
+#            outputs
+#                (latitude, longitude) or None
+#
+#            Happy path
+#                exact altitudes give back the observer's position
+#            Sad path
+#                a single sighting cannot be fixed
+#
+#    Happy path
+    def test100_010_ShouldRecoverPosition(self):
+        latitude, longitude = PositionSolver.solvePosition(self.declinations, self.ghas, self.altitudesAt(30.0, -60.0))
+        self.assertAlmostEqual(30.0, latitude, delta=self.delta)
+        self.assertAlmostEqual(-60.0, longitude, delta=self.delta)
+
+#    Sad path
+    def test100_910_ShouldReturnNoneForSingleSighting(self):
+        self.assertIsNone(PositionSolver.solvePosition([10.0], [80.0], [45.0]))
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 200
+#        Analysis - solvePositions
+#            inputs
+#                flat columns of declinations, GHAs, altitudes and set indexes
+#            outputs
+#                latitudes, longitudes and converged flags, one per set
+#
+#            Happy path
+#                two sets solved together
+#                sets solved from assumed positions
+#            Sad path
+#                set with one sighting does not converge
+#
+#    Happy path
+    def test200_010_ShouldSolveEverySet(self):
+        latitudes, longitudes, converged = PositionSolver.solvePositions(
+            self.declinations * 2, self.ghas * 2,
+            self.altitudesAt(30.0, -60.0) + self.altitudesAt(-12.5, 20.0), [0] * 4 + [1] * 4)
+        self.assertEqual([True, True], list(converged))
+        self.assertAlmostEqual(-12.5, latitudes[1], delta=self.delta)
+        self.assertAlmostEqual(20.0, longitudes[1], delta=self.delta)
+
+    def test200_020_ShouldStartFromAssumedPositions(self):
+        latitudes, longitudes, converged = PositionSolver.solvePositions(
+            self.declinations * 2, self.ghas * 2,
+            self.altitudesAt(30.0, -60.0) + self.altitudesAt(-12.5, 20.0), [0] * 4 + [1] * 4,
+            latitudes=[30.1, -12.4], longitudes=[-60.1, 20.1])
+        self.assertEqual([True, True], list(converged))
+        self.assertAlmostEqual(30.0, latitudes[0], delta=self.delta)
+        self.assertAlmostEqual(20.0, longitudes[1], delta=self.delta)
+
+#    Sad path
+    def test200_910_ShouldNotConvergeOnSingleSighting(self):
+        latitudes, longitudes, converged = PositionSolver.solvePositions(
+            self.declinations + [10.0], self.ghas + [80.0], self.altitudesAt(30.0, -60.0) + [45.0], [0] * 4 + [1])
+        self.assertEqual([True, False], list(converged))
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 300
+#        Analysis - formatDegreesAndMinutes
+#            Happy path
+#                negative value keeps the sign in front
+#                minutes rounding up to 60 carry into the degrees
+#
+#    Happy path
+    def test300_010_ShouldFormatNegativeValue(self):
+        self.assertEqual("-16d44.5", PositionSolver.formatDegreesAndMinutes(-(16 + 44.5 / 60)))
+
+    def test300_020_ShouldCarryRoundedMinutes(self):
+        self.assertEqual("17d0.0", PositionSolver.formatDegreesAndMinutes(16 + 59.99 / 60))
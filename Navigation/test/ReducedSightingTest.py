@@ -0,0 +1,71 @@
+import os
+import sys
+import unittest
+from datetime import datetime
+
+prodDirectory = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "prod")
+if prodDirectory not in sys.path:
+    sys.path.insert(0, prodDirectory)
+
+import ReducedSighting as ReducedSighting
+
+
+class ReducedSightingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.className = "ReducedSighting."
+        # Sirius, 2017-04-09 09:30:30
+        self.sighting = ReducedSighting.ReducedSighting("Sirius", 1491730230, 45.19837688927438,
+                                                        -16.741666666666667, 239.2178472222222, "-16d44.5")
+
+    def tearDown(self):
+        pass
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 100
+#        Analysis - ReducedSighting
+#            inputs
+#                body, timestamp and numeric results
+#            outputs
+#                log strings, sort key, state
+#
+#            Happy path
+#                log strings are computed from the numbers
+#                fields can be read by name
+#                sort key orders by time, then body
+#                state round trip
+#                dictionary of log strings and degrees
+#            Sad path
+#                unknown field name
+#
+#    Happy path
+    def test100_010_ShouldFormatLogStrings(self):
+        self.assertEqual("2017-04-09", self.sighting.dt)
+        self.assertEqual("09:30:30", self.sighting.tm)
+        self.assertEqual(datetime(2017, 4, 9, 9, 30, 30), self.sighting.datetime)
+        self.assertEqual("45d11.9", self.sighting.altitude)
+        self.assertEqual("-16d44.5", self.sighting.latitude)
+        self.assertEqual("239d13.1", self.sighting.longitude)
+
+    def test100_020_ShouldReadFieldsByName(self):
+        self.assertEqual("Sirius", self.sighting["body"])
+        self.assertEqual("09:30:30", self.sighting["tm"])
+
+    def test100_030_ShouldSortByTimeThenBody(self):
+        first = ReducedSighting.ReducedSighting("Vega", 100, 30.0, 38.8, 10.0, "38d48.0")
+        second = ReducedSighting.ReducedSighting("Altair", 200, 30.0, 8.9, 10.0, "8d54.0")
+        third = ReducedSighting.ReducedSighting("Deneb", 200, 30.0, 45.3, 10.0, "45d18.0")
+        self.assertEqual([first, second, third], sorted([third, second, first], key=ReducedSighting.sortKey))
+
+    def test100_040_ShouldRoundTripState(self):
+        self.assertEqual(self.sighting, ReducedSighting.ReducedSighting.fromState(self.sighting.getState()))
+
+    def test100_050_ShouldReturnDictionary(self):
+        values = self.sighting.asDict()
+        self.assertEqual("239d13.1", values["longitude"])
+        self.assertEqual(self.sighting.ghaObservation, values["ghaObservation"])
+
+#    Sad path
+    def test100_910_ShouldRaiseKeyErrorOnUnknownField(self):
+        with self.assertRaises(KeyError):
+            self.sighting["observation"]
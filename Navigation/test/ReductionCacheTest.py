@@ -0,0 +1,149 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+prodDirectory = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "prod")
+if prodDirectory not in sys.path:
+    sys.path.insert(0, prodDirectory)
+
+import EphemerisStore as EphemerisStore
+import ReducedSighting as ReducedSighting
+import ReductionCache as ReductionCache
+
+
+class ReductionCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.className = "ReductionCache."
+        self.tempDir = tempfile.mkdtemp()
+        self.cacheFile = os.path.join(self.tempDir, "reductions.db")
+        self.sighting = {"body": "Sirius", "date": "2017-04-09", "time": "09:30:30", "observation": "45d15.2",
+                         "height": "6", "temperature": 71.0, "pressure": "1010", "horizon": "natural"}
+        self.reduced = ReducedSighting.ReducedSighting("Sirius", 1491730230, 45.1984, -16.7417, 239.2178, "-16d44.5")
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def newCache(self, maxEntries=1000000):
+        cache = ReductionCache.ReductionCache(self.cacheFile, maxEntries)
+        self.addCleanup(cache.close)
+        return cache
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 100
+#        Analysis - makeKey and fingerprint
+#            inputs
+#                ephemeris sources, sighting record
+#            outputs
+#                content address of the reduction
+#
+#            Happy path
+#                equal numbers and angles written differently give one key
+#                fingerprint follows the content of the ephemeris files
+#                fingerprint follows every import into an ephemeris store
+#            Sad path
+#                any other input gives another key
+#                missing ephemeris source gives no fingerprint
+#                ephemeris store without a version gives no fingerprint
+#
+#    Happy path
+    def test100_010_ShouldNormalizeInputs(self):
+        rewritten = dict(self.sighting, observation="45d15.20", height="6.0", pressure=" 1010 ")
+        self.assertEqual(ReductionCache.makeKey("e", self.sighting), ReductionCache.makeKey("e", rewritten))
+
+    def test100_020_ShouldFingerprintContent(self):
+        starFile = os.path.join(self.tempDir, "stars.txt")
+        copyFile = os.path.join(self.tempDir, "copy.txt")
+        for fileName in (starFile, copyFile):
+            with open(fileName, "w") as starData:
+                starData.write("Sirius\t04/09/17\t258d33.7\t-16d44.5\n")
+        first = ReductionCache.fingerprint({"stars": starFile, "aries": "analytic"})
+        self.assertEqual(first, ReductionCache.fingerprint({"stars": copyFile, "aries": "analytic"}))
+        with open(starFile, "a") as starData:
+            starData.write("Pollux\t04/09/17\t243d25.0\t27d59.1\n")
+        self.assertNotEqual(first, ReductionCache.fingerprint({"stars": starFile, "aries": "analytic"}))
+
+    def test100_030_ShouldFingerprintStoreImports(self):
+        starFile = os.path.join(self.tempDir, "stars.txt")
+        ariesFile = os.path.join(self.tempDir, "aries.txt")
+        with open(ariesFile, "w") as ariesData:
+            ariesData.write("04/09/17\t9\t336d44.3\n")
+        with open(starFile, "w") as starData:
+            starData.write("Sirius\t04/09/17\t258d33.7\t-16d44.5\n")
+        store = EphemerisStore.EphemerisStore(os.path.join(self.tempDir, "ephemeris.db"))
+        self.addCleanup(store.close)
+        store.importText(starFile, ariesFile)
+        first = ReductionCache.fingerprint({"stars": store, "aries": store})
+        self.assertEqual(first, ReductionCache.fingerprint({"stars": store, "aries": store}))
+        with open(starFile, "w") as starData:
+            starData.write("Sirius\t04/09/17\t258d33.8\t-16d44.5\n")
+        store.importText(starFile, ariesFile)
+        self.assertNotEqual(first, ReductionCache.fingerprint({"stars": store, "aries": store}))
+
+#    Sad path
+    def test100_910_ShouldDistinguishInputs(self):
+        key = ReductionCache.makeKey("e", self.sighting)
+        for name, value in (("body", "Pollux"), ("time", "09:30:31"), ("horizon", "artificial"), ("temperature", 72.0)):
+            self.assertNotEqual(key, ReductionCache.makeKey("e", dict(self.sighting, **{name: value})))
+        self.assertNotEqual(key, ReductionCache.makeKey("f", self.sighting))
+
+    def test100_920_ShouldNotFingerprintMissingSource(self):
+        self.assertIsNone(ReductionCache.fingerprint({"stars": "stars.txt"}))
+
+    def test100_930_ShouldNotFingerprintStoreWithoutVersion(self):
+        store = EphemerisStore.EphemerisStore(os.path.join(self.tempDir, "ephemeris.db"))
+        self.addCleanup(store.close)
+        self.assertIsNone(ReductionCache.fingerprint({"stars": store, "aries": store}))
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 200
+#        Analysis - ReductionCache
+#            inputs
+#                cache file, keys and reduced sightings
+#            outputs
+#                cached reduced sightings
+#            state change
+#                entries are written on flush, least recently used ones evicted beyond maxEntries
+#
+#            Happy path
+#                entries are kept across instances
+#                least recently used entries are evicted
+#            Sad path
+#                unknown key is a miss
+#                cache file that cannot be opened
+#
+#    Happy path
+    def test200_010_ShouldKeepEntriesAcrossInstances(self):
+        cache = self.newCache()
+        cache.put(b"k", self.reduced)
+        self.assertEqual(self.reduced, cache.get(b"k"))
+        cache.flush()
+        self.assertEqual(self.reduced, self.newCache().get(b"k"))
+        self.assertEqual(1, len(self.newCache()))
+
+    def test200_020_ShouldEvictLeastRecentlyUsed(self):
+        cache = self.newCache(maxEntries=2)
+        cache.put(b"a", self.reduced)
+        cache.put(b"b", self.reduced)
+        cache.flush()
+        cache.get(b"a")
+        cache.put(b"c", self.reduced)
+        cache.flush()
+        self.assertEqual(2, len(cache))
+        self.assertIsNone(cache.get(b"b"))
+        self.assertIsNotNone(cache.get(b"a"))
+        self.assertIsNotNone(cache.get(b"c"))
+
+#    Sad path
+    def test200_910_ShouldMissUnknownKey(self):
+        cache = self.newCache()
+        self.assertIsNone(cache.get(b"unknown"))
+        self.assertEqual((0, 1), (cache.hits, cache.misses))
+
+    def test200_920_ShouldRaiseExceptionOnDirectory(self):
+        expectedDiag = self.className + "__init__:"
+        with self.assertRaises(ValueError) as context:
+            ReductionCache.ReductionCache(self.tempDir)
+        self.assertEqual(expectedDiag, context.exception.args[0][0:len(expectedDiag)])
@@ -0,0 +1,147 @@
+import math
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+prodDirectory = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "prod")
+if prodDirectory not in sys.path:
+    sys.path.insert(0, prodDirectory)
+
+import Ephemeris as Ephemeris
+import EphemerisBinary as EphemerisBinary
+import EphemerisStore as EphemerisStore
+import Reduction as Reduction
+
+
+class ReductionTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.starCatalog = Ephemeris.StarCatalog(os.path.join(prodDirectory, "stars.txt"))
+        cls.ariesEphemeris = Ephemeris.AriesEphemeris(os.path.join(prodDirectory, "aries.txt"))
+
+    def setUp(self):
+        self.delta = 0.002      # accuracy within 1/10 minute
+        self.tempDir = tempfile.mkdtemp()
+        self.columns = (["Sirius", "Pollux", "Sirius", "Vega"],
+                        [45 + 15.2 / 60, 15 + 4.9 / 60, 30.0, 20.0],
+                        [6.0, 6.0, 0.0, 3.0],
+                        [71.0, 72.0, 50.0, 72.0],
+                        [1010.0, 1010.0, 1000.0, 1010.0],
+                        ["natural", "artificial", "artificial", "natural"],
+                        [Reduction.toTimestamp("2017-04-09", "09:30:30"), Reduction.toTimestamp("2017-04-15", "23:50:14"),
+                         Reduction.toTimestamp("2017-03-20", "23:59:59"), Reduction.toTimestamp("2030-01-01", "00:00:00")])
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    # assertSameColumns method checks that two reductions agree, NaN included.
+    def assertSameColumns(self, expected, actual):
+        for expectedColumn, actualColumn in zip(expected, actual):
+            self.assertEqual(len(expectedColumn), len(actualColumn))
+            for expectedValue, actualValue in zip(expectedColumn, actualColumn):
+                if math.isnan(expectedValue):
+                    self.assertTrue(math.isnan(actualValue))
+                else:
+                    self.assertAlmostEqual(expectedValue, actualValue, delta=1e-9)
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 100
+#        Analysis - adjustAltitude
+#            inputs
+#                observed altitude in degrees, height, temperature, pressure, horizon
+#            outputs
+#                altitude corrected for dip and refraction
+#
+#            Happy path
+#                natural horizon applies dip
+#                artificial horizon applies refraction only
+#
+#    Happy path
+    def test100_010_ShouldApplyDipOnNaturalHorizon(self):
+        self.assertAlmostEqual(45 + 11.9 / 60,
+                               Reduction.adjustAltitude(45 + 15.2 / 60, "6.0", 71.0, "1010", "natural"), delta=self.delta)
+
+    def test100_020_ShouldSkipDipOnArtificialHorizon(self):
+        self.assertAlmostEqual(15 + 1.5 / 60,
+                               Reduction.adjustAltitude(15 + 4.9 / 60, "6.0", 72.0, "1010", "artificial"), delta=self.delta)
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 200
+#        Analysis - BatchReduction.reduce
+#            inputs
+#                columns of bodies, observations, heights, temperatures, pressures, horizons, timestamps
+#            outputs
+#                columns of adjusted altitude, GHA of Aries and GHA of the observation
+#
+#            Happy path
+#                batch matches the scalar results logged by Fix
+#                partitioned, indexed, binary and store tables give the results of the text tables
+#                NumPy columns match the pure Python fallback
+#                every date is prefetched once across batches
+#            Sad path
+#                sighting outside the ephemeris is NaN
+#
+#    Happy path
+    def test200_010_ShouldMatchScalarPath(self):
+        batch = Reduction.BatchReduction(self.starCatalog, self.ariesEphemeris)
+        adjustedAltitude, ghaAries, ghaObservation = batch.reduce(
+            ["Sirius", "Pollux"],
+            [45 + 15.2 / 60, 15 + 4.9 / 60],
+            [6.0, 6.0],
+            [71.0, 72.0],
+            [1010.0, 1010.0],
+            ["natural", "artificial"],
+            [Reduction.toTimestamp("2017-04-09", "09:30:30"), Reduction.toTimestamp("2017-04-15", "23:50:14")])
+        self.assertAlmostEqual(45 + 11.9 / 60, adjustedAltitude[0], delta=self.delta)
+        self.assertAlmostEqual(15 + 1.5 / 60, adjustedAltitude[1], delta=self.delta)
+        self.assertAlmostEqual(239 + 13.1 / 60, ghaObservation[0], delta=self.delta)
+        self.assertAlmostEqual(85 + 22.9 / 60, ghaObservation[1], delta=self.delta)
+        self.assertAlmostEqual(self.ariesEphemeris.getGHA("04/09/17", 9, 1830), ghaAries[0], delta=1e-9)
+
+    def test200_020_ShouldLookUpEveryTableKind(self):
+        starFile = os.path.join(self.tempDir, "stars.txt")
+        ariesFile = os.path.join(self.tempDir, "aries.txt")
+        shutil.copyfile(os.path.join(prodDirectory, "stars.txt"), starFile)
+        shutil.copyfile(os.path.join(prodDirectory, "aries.txt"), ariesFile)
+        binaryFile = os.path.join(self.tempDir, "ephemeris.bin")
+        EphemerisBinary.compileEphemeris(starFile, ariesFile, binaryFile)
+        binary = EphemerisBinary.BinaryEphemeris(binaryFile)
+        self.addCleanup(binary.close)
+        store = EphemerisStore.EphemerisStore(os.path.join(self.tempDir, "ephemeris.db"))
+        self.addCleanup(store.close)
+        store.importText(starFile, ariesFile)
+        expected = Reduction.BatchReduction(self.starCatalog, self.ariesEphemeris).reduce(*self.columns)
+        for starCatalog, ariesEphemeris in (
+                (Ephemeris.PartitionedStarCatalog(starFile), Ephemeris.PartitionedAriesEphemeris(ariesFile)),
+                (Ephemeris.IndexedStarCatalog(starFile), Ephemeris.IndexedAriesEphemeris(ariesFile)),
+                (EphemerisBinary.BinaryStarCatalog(binary), EphemerisBinary.BinaryAriesEphemeris(binary)),
+                (EphemerisStore.StoreStarCatalog(store), EphemerisStore.StoreAriesEphemeris(store))):
+            self.assertSameColumns(expected, Reduction.BatchReduction(starCatalog, ariesEphemeris).reduce(*self.columns))
+
+    @unittest.skipUnless(Reduction.numpy, "NumPy is not installed")
+    def test200_030_ShouldMatchPurePythonFallback(self):
+        batch = Reduction.BatchReduction(Ephemeris.PartitionedStarCatalog(os.path.join(prodDirectory, "stars.txt")),
+                                         Ephemeris.PartitionedAriesEphemeris(os.path.join(prodDirectory, "aries.txt")))
+        self.assertSameColumns(batch.reduceScalar(*self.columns), batch.reduce(*self.columns))
+
+    def test200_040_ShouldPrefetchEveryDateOnce(self):
+        prefetched = []
+        starCatalog = Ephemeris.PartitionedStarCatalog(os.path.join(prodDirectory, "stars.txt"))
+        starCatalog.prefetch = lambda dates: prefetched.append(sorted(dates))
+        batch = Reduction.BatchReduction(starCatalog, self.ariesEphemeris)
+        batch.reduce(*self.columns)
+        batch.reduce(*[column[0:2] for column in self.columns])
+        self.assertEqual([["01/01/30", "03/20/17", "04/09/17", "04/15/17"]], prefetched)
+        self.assertEqual(self.starCatalog.get("Sirius", "04/09/17"), batch.getStar("Sirius", 17265))
+
+#    Sad path
+    def test200_910_ShouldReturnNaNOutsideEphemeris(self):
+        batch = Reduction.BatchReduction(self.starCatalog, self.ariesEphemeris)
+        adjustedAltitude, ghaAries, ghaObservation = batch.reduce(
+            ["Sirius"], [45.0], [0.0], [72.0], [1010.0], ["natural"],
+            [Reduction.toTimestamp("2030-01-01", "00:00:00")])
+        self.assertTrue(math.isnan(ghaAries[0]))
+        self.assertTrue(math.isnan(ghaObservation[0]))
@@ -0,0 +1,74 @@
+import io
+import unittest
+import Navigation.prod.SightingReader as SightingReader
+
+
+class SightingReaderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.className = "SightingReader."
+        self.document = (b"<fix>"
+                         b"<sighting><body>Sirius</body><date>2017-04-09</date><time>09:30:30</time>"
+                         b"<observation>045d15.2</observation><height>6.0</height><temperature>71</temperature>"
+                         b"<pressure>1010</pressure><horizon>Natural</horizon></sighting>"
+                         b"<sighting><body>Pollux</body><date>2017-04-15</date><time>23:50:14</time>"
+                         b"<observation>015d04.9</observation></sighting>"
+                         b"<sighting><date>2017-04-17</date><time>10:30:30</time>"
+                         b"<observation>00d0.2</observation><temperature>warm</temperature></sighting>"
+                         b"</fix>")
+
+    def tearDown(self):
+        pass
+
+    def readAll(self):
+        return list(SightingReader.SightingReader().readSightings(io.BytesIO(self.document)))
+
+#-----------------------------------------------------------------
+#    Acceptance Test: 100
+#        Analysis - readSightings
+#            inputs
+#                binary stream holding a <fix> document
+#            outputs
+#                one record per <sighting>, in document order
+#
+#            Happy path
+#                nominal case:  every tag present
+#                defaults for missing height, temperature, pressure and horizon
+#            Sad path
+#                missing required tag is None
+#                unparseable temperature falls back to the default
+#                missing file
+#
+#    Happy path
+    def test100_010_ShouldYieldOneRecordPerSighting(self):
+        self.assertEqual(["Sirius", "Pollux", None], [record["body"] for record in self.readAll()])
+
+    def test100_020_ShouldReadEveryTag(self):
+        record = self.readAll()[0]
+        self.assertEqual("2017-04-09", record["date"])
+        self.assertEqual("09:30:30", record["time"])
+        self.assertEqual("045d15.2", record["observation"])
+        self.assertEqual("6.0", record["height"])
+        self.assertEqual(71.0, record["temperature"])
+        self.assertEqual("1010", record["pressure"])
+        self.assertEqual("natural", record["horizon"])
+
+    def test100_030_ShouldApplyDefaults(self):
+        record = self.readAll()[1]
+        self.assertEqual("0", record["height"])
+        self.assertEqual(72.0, record["temperature"])
+        self.assertEqual("1010", record["pressure"])
+        self.assertEqual("natural", record["horizon"])
+
+#    Sad path
+    def test100_910_ShouldReturnNoneForMissingRequiredTag(self):
+        self.assertIsNone(self.readAll()[2]["body"])
+
+    def test100_920_ShouldDefaultUnparseableTemperature(self):
+        self.assertEqual(72.0, self.readAll()[2]["temperature"])
+
+    def test100_930_ShouldRaiseExceptionOnMissingFile(self):
+        expectedDiag = self.className + "__init__:"
+        with self.assertRaises(ValueError) as context:
+            SightingReader.SightingReader("missing.xml")
+        self.assertEqual(expectedDiag, context.exception.args[0][0:len(expectedDiag)])